@@ -2,7 +2,7 @@
 from datetime import datetime
 import os.path
 
-from flask import Flask, render_template, request, url_for as flask_url_for
+from flask import Flask, render_template, request, jsonify, abort, url_for as flask_url_for
 from flask.ext.restful import Api, Resource, reqparse
 
 from web.api import get_summary_function
@@ -19,6 +19,8 @@ from web.api import get_lobbyists_function
 from web.api import get_lobby_agency_function
 from web.api import find_entity_function
 from web.api import get_summary_data
+from data_models.core import BaseDataModel, profiler
+from data_interfaces.query_cache import QueryCache
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -28,6 +30,7 @@ static_dir = os.path.join(current_dir, 'web/static')
 app = Flask(__name__, template_folder=template_dir, static_folder=static_dir)
 app.config.from_object(__name__)
 api = Api(app)
+BaseDataModel.query_cache = QueryCache(shared=True)
 
 def url_for(endpoint, **kwargs):
     kwargs.setdefault('_external', True)
@@ -43,6 +46,14 @@ def format_date(date):
 
 app.jinja_env.filters['date'] = format_date
 
+@app.before_request
+def begin_unit():
+    BaseDataModel.begin_unit()
+
+@app.teardown_request
+def end_unit(exception=None):
+    BaseDataModel.end_unit()
+
 def _convert_to_currency(number):
     if isinstance(number, int):
         return u'£{:20,}'.format(number)
@@ -69,6 +80,13 @@ def show_search_result():
     )
 
 
+@app.route('/debug/cypher-profile')
+def show_cypher_profile():
+    if not profiler.enabled:
+        abort(404)
+    return jsonify(results=profiler.report())
+
+
 @app.route('/about')
 def show_about():
     return render_template('page/about.html')
@@ -1,28 +1,190 @@
 # -*- coding: utf-8 -*-
 import logging
+import time
+from itertools import izip
 from utils import mongo
+from utils import config
 from data_models.influencers_models import Influencer
 from data_models.influencers_models import Influencers
 from data_models.influencers_models import LobbyAgency
 from data_models.influencers_models import LobbyAgencies
 from data_models import government_models
+from data_models.core import BaseDataModel, pages, templates
+from data_interfaces import api_workers
 
 
-class PopulateInfluencersApi():
+templates.register("change_dependants", u"""
+    MATCH (x:`{0}`) WHERE x.`{1}` IN {{values}} AND NOT x:`Named Entity`
+    MATCH (x)--(d:`Named Entity`)
+    RETURN DISTINCT d.name
+""")
+
+
+class PopulateApi():
+    # builds one api_* collection from a stream of graph records, a page
+    # at a time; run(workers=N) spreads the pages over worker processes.
+    # The build goes to <collection>_staging and only replaces the live
+    # collection once it is complete, keeping the old one as
+    # <collection>_previous. run(names=...) upserts just the documents for
+    # those names into the live collection
+    collection = None
+    indexes = ["name", "labels"]
+    page_size = 100
+
     def __init__(self):
         self._logger = logging.getLogger('spud')
         self.db = mongo.MongoInterface()
+        self.sink = None
+        self.target = self.collection
+        self.names = None
+        self.written = 0
+        self.bulk_size = config.api_bulk_size
+        self.write_concern = config.api_write_concern
+        self._pending = []
+
+    @property
+    def staging(self):
+        return "%s_staging" % self.collection
+
+    @property
+    def previous(self):
+        return "%s_previous" % self.collection
+
+    def run(self, workers=1, names=None):
+        if not self.begin(names):
+            return
+        if workers > 1:
+            api_workers.run_parallel(self, workers)
+        else:
+            for docs in pages(self.stream(), self.page_size):
+                self.build(docs)
+        self.finish()
+
+    def begin(self, names=None):
+        # False when an incremental run has nothing to rebuild
+        self.names = names
+        self.written = 0
+        self._started = time.time()
+        if names is None:
+            self.target = self.staging
+            self.db.drop(self.staging)
+        return names is None or bool(names)
+
+    def finish(self):
+        self.flush()
+        self.target = self.collection
+        elapsed = max(time.time() - self._started, 0.001)
+        self._logger.debug(
+            "%s: %s documents in %.1fs, %.1f docs/s" %
+            (self.collection, self.written, elapsed, self.written / elapsed)
+        )
+        if self.names is None and self.validate():
+            self.publish()
+
+    def stream(self):
+        # the listing is cheap to scan; only building a document is not
+        for record in self.records():
+            if self.names is None or record[0] in self.names:
+                yield record
+
+    def validate(self):
+        built = self.db.count(self.staging)
+        live = self.db.count(self.collection)
+        if built != self.written:
+            self._logger.error(
+                "%s: %s documents written, %s in staging" %
+                (self.collection, self.written, built)
+            )
+            return False
+        if built == 0 or built < live * config.api_min_ratio:
+            self._logger.error(
+                "%s: %s documents built against %s live, keeping live" %
+                (self.collection, built, live)
+            )
+            return False
+        return True
+
+    def publish(self):
+        for key in self.indexes:
+            self.db.create_index(self.staging, key)
+        # the live collection is copied aside, then replaced in one rename
+        if self.db.exists(self.collection):
+            self.db.copy(self.collection, self.previous)
+        self.db.rename(self.staging, self.collection)
+        self._logger.debug(
+            "%s: published %s documents" % (self.collection, self.written)
+        )
+
+    def rollback(self):
+        # swaps <collection>_previous back in; rolling back twice restores
+        # the newer build
+        if not self.db.exists(self.previous):
+            self._logger.error("%s: nothing to roll back to" % self.collection)
+            return False
+        if self.db.exists(self.collection):
+            self.db.copy(self.collection, self.staging)
+        self.db.rename(self.previous, self.collection)
+        if self.db.exists(self.staging):
+            self.db.rename(self.staging, self.previous)
+        for key in self.indexes:
+            self.db.create_index(self.collection, key)
+        self._logger.debug("%s: rolled back" % self.collection)
+        return True
+
+    def build(self, docs):
+        for doc in docs:
+            self._get_stats(doc)
+
+    def save(self, document):
+        # in a worker the document goes back to the parent to be written
+        if self.sink is not None:
+            self.sink(document)
+        else:
+            self.write(document)
+
+    def write(self, document):
+        # documents go out in unordered bulk writes of bulk_size
+        self._pending.append(document)
+        self.written += 1
+        if len(self._pending) >= self.bulk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        if self.names is None:
+            self.db.insert_many(
+                self.target, self._pending, self.write_concern
+            )
+        else:
+            self.db.upsert_many(
+                self.target, "name", self._pending, self.write_concern
+            )
+        self._pending = []
+
 
-    def run(self):
-        self.db.drop("api_influencers")
-        all_influencers = Influencers().get_all()
+class PopulateInfluencersApi(PopulateApi):
+    collection = "api_influencers"
+    indexes = ["name", "labels", "donor_type"]
+
+    def records(self):
+        all_influencers = Influencers()
         self._logger.debug("\nPopulating Influencers Api")
-        self._logger.debug("Total: %s" % len(all_influencers))
-        for doc in all_influencers:
+        self._logger.debug("Total: %s" % all_influencers.count)
+        return all_influencers.stream_all()
+
+    def build(self, docs):
+        influencers = Influencer.load_many(
+            [doc[0] for doc in docs], sections=[
+                "interest_relationships", "remunerations",
+                "donation_amounts", "lobbyists", "meetings"
+            ]
+        )
+        for doc, influencer in izip(docs, influencers):
             self._logger.debug(" %-35s\t%-15s" % (doc[0], doc[2]))
-            self._get_stats(doc)
+            self._get_stats(doc, influencer)
 
-    def _get_stats(self, record):
+    def _get_stats(self, record, influencer):
         name = record[0]
         donor_type = record[1]
         labels = record[2]
@@ -30,7 +192,6 @@ class PopulateInfluencersApi():
         if labels and "Named Entity" in labels:
             labels.remove("Named Entity")
 
-        influencer = Influencer(name)
         register = influencer.interests_summary
         ec = influencer.donations_summary
         lobby = influencer.lobbyists_summary
@@ -53,24 +214,24 @@ class PopulateInfluencersApi():
             "donor_type": donor_type,
             "influences": data_sources
         }
-        self.db.save("api_influencers", influencer_data)
+        self.save(influencer_data)
 
 
-class PopulateLobbyAgenciesApi():
-    def __init__(self):
-        self._logger = logging.getLogger('spud')
-        self.db = mongo.MongoInterface()
+class PopulateLobbyAgenciesApi(PopulateApi):
+    collection = "api_lobbyists"
 
-    def run(self):
-        self.db.drop("api_lobbyists")
-        all_agencies = LobbyAgencies().get_all()
+    def records(self):
         self._logger.debug("Populating Lobby Agencies Api")
-        for doc in all_agencies:
+        return LobbyAgencies().stream_all()
+
+    def build(self, docs):
+        agencies = LobbyAgency.load_many([doc[0] for doc in docs])
+        for doc, agency in izip(docs, agencies):
             name = doc[0]
             self._logger.debug(name)
-            self._get_stats(doc)
+            self._get_stats(doc, agency)
 
-    def _get_stats(self, record):
+    def _get_stats(self, record, agency):
         name = record[0]
         client_count = record[1]
         employee_count = record[2]
@@ -78,7 +239,6 @@ class PopulateLobbyAgenciesApi():
         if labels and "Named Entity" in labels:
             labels.remove("Named Entity")
 
-        agency = LobbyAgency(name)
         data_sources = {
             "lobbying_registers": {
                 "client_count": client_count,
@@ -95,24 +255,28 @@ class PopulateLobbyAgenciesApi():
             "labels": labels,
             "contact_details": agency.contact_details,
         }
-        self.db.save("api_lobbyists", agency_data)
+        self.save(agency_data)
 
 
-class PopulatePoliticiansApi():
-    def __init__(self):
-        self._logger = logging.getLogger('spud')
-        self.db = mongo.MongoInterface()
+class PopulatePoliticiansApi(PopulateApi):
+    collection = "api_politicians"
+    indexes = ["name", "labels", "party"]
 
-    def run(self):
-        self.db.drop("api_politicians")
-        all_politicians = government_models.Politicians().get_all()
+    def records(self):
         self._logger.debug("Populating Politicians Api")
-        for doc in all_politicians:
+        return government_models.Politicians().stream_all()
+
+    def build(self, docs):
+        for doc in docs:
             name = doc[0]
             self._logger.debug(name)
-            self._get_stats(doc)
+            BaseDataModel.begin_unit()
+            try:
+                self._get_stats(doc)
+            finally:
+                BaseDataModel.end_unit()
 
-    def _get_stats(self, record):
+    def _get_stats(self, record, politician=None):
         name = record[0]
         party = record[1]
         twfy_id = record[2]
@@ -122,13 +286,21 @@ class PopulatePoliticiansApi():
         if labels and "Named Entity" in labels:
             labels.remove("Named Entity")
 
-        politician = government_models.Politician(name)
-        if not politician.exists:
-            print ">Not found:", name
-            politician = government_models.Lord(name)
+        if isinstance(politician, government_models.MemberOfParliament):
+            role = "mp"
+        elif politician is not None:
             role = "lord"
         else:
-            role = politician.type
+            politician = government_models.Politician(name, prefetch=[
+                "interests_summary", "donations_summary", "meetings_summary",
+                "departments", "committees", "positions"
+            ])
+            if not politician.exists:
+                print ">Not found:", name
+                politician = government_models.Lord(name)
+                role = "lord"
+            else:
+                role = politician.type
         register = politician.interests_summary
         ec = politician.donations_summary
         meetings = politician.meetings_summary
@@ -158,24 +330,32 @@ class PopulatePoliticiansApi():
             politician_data["government_committees"] = None
             politician_data["government_positions"] = politician.positions
 
-        self.db.save("api_politicians", politician_data)
+        self.save(politician_data)
 
 
-class PopulateMpsApi():
-    def __init__(self):
-        self._logger = logging.getLogger('spud')
-        self.db = mongo.MongoInterface()
+class PopulateMpsApi(PopulateApi):
+    collection = "api_mps"
+    indexes = ["name", "labels", "party"]
+    sections = [
+        "offices", "departments", "meetings", "categories",
+        "interest_relationships", "remunerations", "funding",
+        "donation_amounts"
+    ]
 
-    def run(self):
-        self.db.drop("api_mps")
-        all_mps = government_models.MembersOfParliament().get_all()
+    def records(self):
         self._logger.debug("Populating MPs Api")
-        for doc in all_mps:
+        return government_models.MembersOfParliament().stream_all()
+
+    def build(self, docs):
+        mps = government_models.MemberOfParliament.load_many(
+            [doc[0] for doc in docs], sections=self.sections
+        )
+        for doc, mp in izip(docs, mps):
             name = doc[0]
             self._logger.debug(name)
-            self._get_stats(doc)
+            self._get_stats(doc, mp)
 
-    def _get_stats(self, record):
+    def _get_stats(self, record, mp):
         name = record[0]
         party = record[1]
         twfy_id = record[2]
@@ -185,7 +365,6 @@ class PopulateMpsApi():
         if labels and "Named Entity" in labels:
             labels.remove("Named Entity")
 
-        mp = government_models.MemberOfParliament(name)
         positions = mp.positions
         committees = mp.committees
         departments = mp.departments
@@ -211,24 +390,31 @@ class PopulateMpsApi():
             "government_departments": departments,
             "government_positions": positions
         }
-        self.db.save("api_mps", mp_data)
+        self.save(mp_data)
 
 
-class PopulateLordsApi():
-    def __init__(self):
-        self._logger = logging.getLogger('spud')
-        self.db = mongo.MongoInterface()
+class PopulateLordsApi(PopulateApi):
+    collection = "api_lords"
+    indexes = ["name", "labels", "party"]
+    sections = [
+        "departments", "meetings", "categories",
+        "interest_relationships", "donation_amounts"
+    ]
 
-    def run(self):
-        self.db.drop("api_lords")
-        all_lords = government_models.Lords().get_all()
+    def records(self):
         self._logger.debug("Populating  Lords Api")
-        for doc in all_lords:
+        return government_models.Lords().stream_all()
+
+    def build(self, docs):
+        lords = government_models.Lord.load_many(
+            [doc[0] for doc in docs], sections=self.sections
+        )
+        for doc, lord in izip(docs, lords):
             name = doc[0]
             self._logger.debug(name)
-            self._get_stats(doc)
+            self._get_stats(doc, lord)
 
-    def _get_stats(self, record):
+    def _get_stats(self, record, lord):
         name = record[0]
         party = record[1]
         twfy_id = record[2]
@@ -238,7 +424,6 @@ class PopulateLordsApi():
         if labels and "Named Entity" in labels:
             labels.remove("Named Entity")
 
-        lord = government_models.Lord(name)
         register = lord.interests_summary
         ec = lord.donations_summary
         meetings = lord.meetings_summary
@@ -263,19 +448,91 @@ class PopulateLordsApi():
             "government_departments": departments,
             "government_positions": positions
         }
-        self.db.save("api_lords", lord_data)
+        self.save(lord_data)
 
 
-class PopulatePoliticalPartyApi():
-    def __init__(self):
-        self._logger = logging.getLogger('spud')
-        self.db = mongo.MongoInterface()
+class PopulatePoliticianProfilesApi(PopulateApi):
+    # one pass over every politician: each MP or Lord profile is loaded
+    # once and projected into api_politicians and api_mps or api_lords,
+    # each of which is staged and published as if built on its own
+    collection = "api_politician_profiles"
 
-    def run(self):
-        self.db.drop("api_political_parties")
-        all_parties = government_models.PoliticalParties().get_all()
+    def __init__(self):
+        PopulateApi.__init__(self)
+        self.politicians = PopulatePoliticiansApi()
+        self.mps = PopulateMpsApi()
+        self.lords = PopulateLordsApi()
+        self.projections = [self.politicians, self.mps, self.lords]
+        for projection in self.projections:
+            projection.sink = self._route(projection)
+
+    def records(self):
+        return self.politicians.records()
+
+    def begin(self, names=None):
+        self.names = names
+        self.written = 0
+        started = [projection.begin(names) for projection in self.projections]
+        return all(started)
+
+    def finish(self):
+        for projection in self.projections:
+            projection.finish()
+
+    def rollback(self):
+        return all([projection.rollback() for projection in self.projections])
+
+    def build(self, docs):
+        mp_docs = [doc for doc in docs if "Member of Parliament" in doc[5]]
+        lord_docs = [
+            doc for doc in docs
+            if "Member of Parliament" not in doc[5] and "Lord" in doc[5]
+        ]
+        mps = government_models.MemberOfParliament.load_many(
+            [doc[0] for doc in mp_docs], sections=self.mps.sections
+        )
+        for doc, mp in izip(mp_docs, mps):
+            self._logger.debug(doc[0])
+            self.politicians._get_stats(doc, mp)
+            self.mps._get_stats(doc, mp)
+        lords = government_models.Lord.load_many(
+            [doc[0] for doc in lord_docs], sections=self.lords.sections
+        )
+        for doc, lord in izip(lord_docs, lords):
+            self._logger.debug(doc[0])
+            self.politicians._get_stats(doc, lord)
+            self.lords._get_stats(doc, lord)
+
+    def write(self, value):
+        # documents from a worker arrive tagged with their collection
+        collection, document = value
+        for projection in self.projections:
+            if projection.collection == collection:
+                projection.write(document)
+        self.written += 1
+
+    def flush(self):
+        for projection in self.projections:
+            projection.flush()
+
+    def _route(self, projection):
+        def save(document):
+            if self.sink is not None:
+                self.sink((projection.collection, document))
+            else:
+                projection.write(document)
+        return save
+
+
+class PopulatePoliticalPartyApi(PopulateApi):
+    collection = "api_political_parties"
+
+    def records(self):
         self._logger.debug("Populating Political Party Api")
-        for doc in all_parties:
+        return government_models.PoliticalParties().get_all()
+
+    def build(self, docs):
+        for doc in docs:
             name = doc[0]
             self._logger.debug(name)
             self._get_stats(doc)
@@ -306,20 +563,18 @@ class PopulatePoliticalPartyApi():
             "image_url": image_url,
             "labels": labels
         }
-        self.db.save("api_political_parties", party_data)
+        self.save(party_data)
 
 
-class PopulateCommitteesApi():
-    def __init__(self):
-        self._logger = logging.getLogger('spud')
-        self.db = mongo.MongoInterface()
-
-    def run(self):
-        self.db.drop("api_committees")
-        all_offices = government_models.GovernmentOffices().get_all("committee")
+class PopulateCommitteesApi(PopulateApi):
+    collection = "api_committees"
 
+    def records(self):
         self._logger.debug("\nPopulating Government Offices Api")
-        for doc in all_offices:
+        return government_models.GovernmentOffices().get_all("committee")
+
+    def build(self, docs):
+        for doc in docs:
             name = doc[0]
             self._logger.debug("%s, %s" % (name, doc[2]))
             self._get_stats(doc)
@@ -350,20 +605,18 @@ class PopulateCommitteesApi():
             "influences": data_sources,
             "members": members
         }
-        self.db.save("api_committees", office_data)
+        self.save(office_data)
 
 
-class PopulateDepartmentsApi():
-    def __init__(self):
-        self._logger = logging.getLogger('spud')
-        self.db = mongo.MongoInterface()
-
-    def run(self):
-        self.db.drop("api_departments")
-        all_offices = government_models.GovernmentOffices().get_all("department")
+class PopulateDepartmentsApi(PopulateApi):
+    collection = "api_departments"
 
+    def records(self):
         self._logger.debug("\nPopulating Government Departments Api")
-        for doc in all_offices:
+        return government_models.GovernmentOffices().get_all("department")
+
+    def build(self, docs):
+        for doc in docs:
             name = doc[0]
             self._logger.debug("%s, %s" % (name, doc[2]))
             self._get_stats(doc)
@@ -396,19 +649,18 @@ class PopulateDepartmentsApi():
             "influences": data_sources,
             "members": members
         }
-        self.db.save("api_departments", office_data)
+        self.save(office_data)
 
 
-class PopulateMeetingsApi():
-    def __init__(self):
-        self._logger = logging.getLogger('spud')
-        self.db = mongo.MongoInterface()
+class PopulateMeetingsApi(PopulateApi):
+    collection = "api_meetings"
 
-    def run(self):
-        self.db.drop("api_meetings")
-        all_agencies = LobbyAgencies().get_all()
+    def records(self):
         self._logger.debug("Populating Lobby Agencies Api")
-        for doc in all_agencies:
+        return LobbyAgencies().stream_all()
+
+    def build(self, docs):
+        for doc in docs:
             name = doc[0]
             self._logger.debug(name)
             self._get_stats(doc)
@@ -421,7 +673,9 @@ class PopulateMeetingsApi():
         if labels and "Named Entity" in labels:
             labels.remove("Named Entity")
 
-        agency = LobbyAgency(name)
+        agency = LobbyAgency(name, prefetch=[
+            "clients", "employees", "meetings"
+        ])
         data_sources = {
             "meetings": {
                 "client_count": client_count,
@@ -438,7 +692,36 @@ class PopulateMeetingsApi():
             "labels": labels,
             "contact_details": agency.contact_details,
         }
-        self.db.save("api_meetings", agency_data)
+        self.save(agency_data)
+
+
+# the builders behind each --api_gen choice, in build order
+API_GROUPS = {
+    "politicians": [PopulatePoliticianProfilesApi],
+    "influencers": [PopulateInfluencersApi],
+    "government": [PopulateCommitteesApi, PopulateDepartmentsApi],
+    "parties": [PopulatePoliticalPartyApi],
+    "lobbyists": [PopulateLobbyAgenciesApi],
+}
+
+
+def changed_names(changes):
+    # the names of every api document a set of graph changes can affect:
+    # the touched entities, plus the entities a touched donation, interest
+    # or meeting node hangs off
+    model = BaseDataModel()
+    names = set()
+    for (label, key), touched in changes.items():
+        if key == "name":
+            names.update(touched)
+        if label == model.named_label:
+            continue
+        statement = templates.statement("change_dependants", label, key)
+        output = model.query(
+            statement, "change_dependants", values=list(touched)
+        )
+        names.update(entry[0] for entry in output)
+    return names
 
 
 def _convert_to_currency(number):
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import logging
+import multiprocessing
+import threading
+import traceback
+from data_models import core
+from utils import config
+
+
+DOCUMENT, FAILED, DONE = range(3)
+
+
+def run_parallel(populator, workers, queue_size=None):
+    # the parent streams the records and writes the documents; each worker
+    # builds whole pages on its own graph and Mongo connections
+    logger = logging.getLogger('spud')
+    queue_size = queue_size or config.api_queue_size
+    tasks = multiprocessing.Queue(workers * 2)
+    results = multiprocessing.Queue(queue_size)
+    processes = [
+        multiprocessing.Process(
+            target=_work, args=(populator.__class__, tasks, results)
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.daemon = True
+        process.start()
+    errors = []
+    feeder = threading.Thread(
+        target=_feed, args=(populator, tasks, workers, errors)
+    )
+    feeder.daemon = True
+    feeder.start()
+    logger.debug(
+        "building %s on %s workers" % (populator.collection, workers)
+    )
+
+    failed, finished = 0, 0
+    while finished < workers:
+        kind, value = results.get()
+        if kind == DOCUMENT:
+            populator.write(value)
+        elif kind == FAILED:
+            logger.error(value)
+            failed += 1
+        else:
+            finished += 1
+    feeder.join()
+    for process in processes:
+        process.join()
+    logger.debug(
+        "%s: %s documents" % (populator.collection, populator.written)
+    )
+    for error in errors:
+        logger.error(error)
+    if failed or errors:
+        raise RuntimeError(
+            "%s pages of %s failed" % (failed, populator.collection)
+        )
+    return populator.written
+
+
+def _feed(populator, tasks, workers, errors):
+    # records become plain lists so they can cross the process boundary
+    try:
+        for docs in core.pages(populator.stream(), populator.page_size):
+            tasks.put([list(doc) for doc in docs])
+    except Exception:
+        errors.append(traceback.format_exc())
+    finally:
+        for _ in range(workers):
+            tasks.put(None)
+
+
+def _work(populator_class, tasks, results):
+    # state forked from the parent belongs to the parent's connections
+    core.BaseDataModel.session = None
+    core.BaseDataModel.batch = None
+    core.BaseDataModel.end_unit()
+    core.BaseDataModel.query_cache = None
+    populator = populator_class()
+    populator.sink = lambda document: results.put((DOCUMENT, document))
+    try:
+        while True:
+            docs = tasks.get()
+            if docs is None:
+                break
+            try:
+                populator.build(docs)
+            except Exception:
+                # one bad page is reported and the rest still get built
+                results.put((FAILED, traceback.format_exc()))
+    finally:
+        results.put((DONE, None))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import datetime
+from utils import mongo
+from data_models.core import VertexRef
+
+
+class ChangeLog:
+    # the vertices graphers have touched since the last incremental
+    # api_gen, one document per (label, primary attribute, value). Not
+    # every vertex has a name: donations, interest details, meetings,
+    # funding relationships and terms are keyed on their own attribute
+    COLLECTION = "graph_changes"
+
+    def __init__(self, db=None):
+        self.db = db or mongo.MongoInterface()
+        self._keys = {}
+        self._touched = set()
+
+    def record(self, vertex, label, key, value):
+        # the label and key a stored vertex was found or merged on, so
+        # touching it later never reads its labels back from the server
+        self._keys[vertex._id] = (label, key, value)
+
+    def touch(self, vertex):
+        if isinstance(vertex, VertexRef):
+            # a vertex queued in a batch carries its own key
+            entry = (vertex.label, vertex.key, vertex.value)
+        else:
+            entry = self._keys.get(vertex._id)
+        if entry and entry[2] is not None:
+            self._touched.add(entry)
+
+    def flush(self):
+        # one upsert per distinct vertex, once per grapher run
+        now = datetime.datetime.utcnow()
+        for label, key, value in self._touched:
+            self.db.update(
+                self.COLLECTION, {"_id": u"%s:%s:%s" % (label, key, value)},
+                {"$set": {
+                    "label": label, "key": key, "value": value,
+                    "touched": now
+                }},
+                upsert=True
+            )
+        self._touched = set()
+
+    def pending(self, until):
+        # {(label, key): set(values)} touched up to `until`
+        changes = {}
+        entries = self.db.find(self.COLLECTION, {"touched": {"$lte": until}})
+        for entry in entries:
+            changes.setdefault(
+                (entry["label"], entry["key"]), set()
+            ).add(entry["value"])
+        return changes
+
+    def clear(self, until):
+        self.db.remove(self.COLLECTION, {"touched": {"$lte": until}})
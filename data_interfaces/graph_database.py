@@ -1,17 +1,249 @@
+import logging
+import os
+import time
+from threading import local
 from py2neo import Graph, neo4j, rel, node
-from py2neo.ext.calendar import GregorianCalendar
+from py2neo.packages.httpstream import http
+from py2neo.cypher import CypherTransactionError, RecordList
+from utils import config
+
+
+class ConnectionPuddle(local):
+    # stands in for httpstream's per host puddle of HTTP connections: keeps
+    # up to `idle` connections per host and thread for reuse, and counts
+    # the connections it really opens
+    idle = 4
+    opened = 0
+    reused = 0
+
+    def __init__(self, scheme, host_port):
+        local.__init__(self)
+        self.scheme = scheme
+        self.host_port = host_port
+        if scheme == "https":
+            self.connection_class = http.HTTPSConnection
+        else:
+            self.connection_class = http.HTTPConnection
+        self.active = []
+        self.passive = []
+
+    def acquire(self):
+        if self.passive:
+            connection = self.passive.pop()
+            ConnectionPuddle.reused += 1
+        else:
+            connection = self.connection_class(
+                self.host_port, timeout=http.socket_timeout
+            )
+            ConnectionPuddle.opened += 1
+        self.active.append(connection)
+        return connection
+
+    def release(self, connection):
+        if connection in self.active:
+            self.active.remove(connection)
+        if len(self.passive) < self.idle:
+            self.passive.append(connection)
+        else:
+            connection.close()
+
+    @property
+    def size(self):
+        return len(self.active) + len(self.passive)
+
+
+# the httpstream attributes GraphPool replaces. httpstream ships inside
+# py2neo, which requirements.txt pins to the 2.0.1 these were checked
+# against; tests/test_graph_pool.py fails if an upgrade moves them
+PATCHED_HTTPSTREAM = [
+    (http, "ConnectionPuddle"),
+    (http.ConnectionPool, "_puddles"),
+    (http.ConnectionPool, "_get_puddle"),
+]
+
+
+def httpstream_patchable():
+    return all(hasattr(owner, name) for owner, name in PATCHED_HTTPSTREAM)
+
+
+class GraphPool:
+    # py2neo keeps one Graph per URI and the sockets behind it in
+    # httpstream's module level connection pool, so that is the pool sized
+    # and counted here. A forked child (gunicorn worker, multiprocessing
+    # shard) sees the pid change and drops the connections it inherited
+    # rather than talking over the parent's sockets
+    def __init__(self, uri, size=4, timeout=30):
+        self._logger = logging.getLogger('spud')
+        self.uri = uri
+        self.size = size
+        self.timeout = timeout
+        self._pid = None
+        self._graph = None
+
+    def acquire(self):
+        if self._pid != os.getpid():
+            self._reset()
+        return self._graph
+
+    def stats(self):
+        puddles = [
+            puddle for puddle in
+            getattr(http.ConnectionPool, "_puddles", {}).values()
+            if isinstance(puddle, ConnectionPuddle)
+        ]
+        return {
+            "pid": self._pid,
+            "connections": sum(puddle.size for puddle in puddles),
+            "opened": ConnectionPuddle.opened,
+            "reused": ConnectionPuddle.reused
+        }
+
+    def _reset(self):
+        if self._pid is not None:
+            self._logger.debug("graph pool: new process, dropping connections")
+        http.socket_timeout = self.timeout
+        self._pid = os.getpid()
+        self._graph = Graph(self.uri)
+        if not httpstream_patchable():
+            self._logger.warning(
+                "graph pool: unknown httpstream, connections are not reset"
+                " in forked processes"
+            )
+            return
+        ConnectionPuddle.idle = self.size
+        ConnectionPuddle.opened = 0
+        ConnectionPuddle.reused = 0
+        # the inherited connections are dropped, and the child opens its
+        # own on first use
+        http.ConnectionPuddle = ConnectionPuddle
+        http.ConnectionPool._puddles = {}
 
 
 class GraphInterface:
+    URI = 'http://localhost:7474/db/data/'
+    pool = GraphPool(URI, config.graph_pool_size, config.graph_timeout)
+
     def __init__(self):
-        self.URI = 'http://localhost:7474/db/data/'
         self.neo4j = neo4j
         self.rel = rel
-        self.graph = Graph(self.URI)
+        self.graph = self.pool.acquire()
         self.node = node
-        self.calendar = GregorianCalendar(self.graph)
         self.relationship = neo4j.Relationship
-        #print '\nneo4j connection established\n', self.graph
 
+    def profile(self, statement, parameters=None):
+        # runs the statement under PROFILE and returns its records with the
+        # db hits summed over the plan
+        response = self.graph.cypher.post(u"PROFILE " + statement, parameters)
+        content = response.content
+        plan = content.pop("plan", None)
+        return RecordList.hydrate(content, self.graph), self._db_hits(plan)
+
+    @classmethod
+    def _db_hits(cls, plan):
+        if not plan:
+            return 0
+        hits = plan.get("dbHits") or plan.get("args", {}).get("DbHits") or 0
+        for child in plan.get("children", []):
+            hits += cls._db_hits(child)
+        return hits
+
+    def session(self, size=100, retries=5, backoff=0.5,
+                before_commit=None, on_rollback=None):
+        return GraphSession(
+            self.graph, size, retries, backoff, before_commit, on_rollback
+        )
+
+
+class GraphSession:
+    # groups statements into one transaction per `size` statements; units of
+    # work run through run() are replayed when Neo4j reports a transient
+    # failure such as a deadlock, since everything since the last commit
+    # was rolled back with it
+    def __init__(self, graph, size=100, retries=5, backoff=0.5,
+                 before_commit=None, on_rollback=None):
+        self._logger = logging.getLogger('spud')
+        self.graph = graph
+        self.size = size
+        self.retries = retries
+        self.backoff = backoff
+        self.before_commit = before_commit
+        self.on_rollback = on_rollback
+        self.commits = 0
+        self.rollbacks = 0
+        self._tx = None
+        self._statements = 0
+        self._work = []
+
+    def execute(self, statement, parameters=None):
+        if self._tx is None:
+            self._tx = self.graph.cypher.begin()
+        self._tx.append(statement, parameters or {})
+        self._statements += 1
+        return self._tx.process()[0]
+
+    def run(self, work, *args):
+        self._work.append((work, args))
+        self._attempt(lambda: work(*args))
+        if self._statements >= self.size:
+            self.commit()
+
+    def commit(self):
+        self._attempt(self._commit)
+
+    def close(self):
+        self.commit()
+        self._logger.debug(
+            "graph session: %s commits, %s rollbacks" %
+            (self.commits, self.rollbacks)
+        )
+
+    def _commit(self):
+        if self.before_commit:
+            self.before_commit()
+        if self._tx is not None:
+            self._tx.commit()
+            self.commits += 1
+        self._tx = None
+        self._statements = 0
+        self._work = []
+
+    def _attempt(self, action):
+        attempt = 0
+        while True:
+            try:
+                return action()
+            except CypherTransactionError as e:
+                if not self._is_transient(e) or attempt >= self.retries:
+                    self._rollback()
+                    self._work = []
+                    raise
+                attempt += 1
+                self._logger.debug(
+                    "transient failure (%s), retry %s" % (e.code, attempt)
+                )
+                self._rollback()
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+                action = self._replay
+
+    def _replay(self):
+        for work, args in self._work:
+            work(*args)
+        self._commit()
 
+    def _rollback(self):
+        if self._tx is not None:
+            try:
+                self._tx.rollback()
+            except Exception:
+                # the server may already have rolled it back
+                pass
+        self.rollbacks += 1
+        self._tx = None
+        self._statements = 0
+        if self.on_rollback:
+            self.on_rollback()
 
+    @staticmethod
+    def _is_transient(error):
+        code = getattr(error, "code", None) or ""
+        return code.startswith("Neo.TransientError")
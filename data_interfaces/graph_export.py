@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+from data_models import core
+from utils import unicode_csv
+
+
+class ExportWriter(core.BatchWriter):
+    # collects everything the graphers would MERGE and writes it out as
+    # neo4j-import CSV files instead of sending it to the database
+    offline = True
+
+    def __init__(self):
+        core.BatchWriter.__init__(self, None)
+
+    def flush(self):
+        pass
+
+    def _check_size(self):
+        pass
+
+    def day(self, year, month, day):
+        # stands in for the calendar, one node per date
+        date = u"%04d-%02d-%02d" % (year, month, day)
+        return self.merge_vertex("Date", "date", date)
+
+    def write(self, directory):
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        node_files = self._write_nodes(directory)
+        relationship_files = self._write_relationships(directory)
+        command = ["neo4j-import", "--into", "graph.db"]
+        command += ["--nodes %s" % f for f in node_files]
+        command += ["--relationships %s" % f for f in relationship_files]
+        self._logger.debug(" ".join(command))
+        # the import skips the counters the graphers keep on each MERGE
+        self._logger.debug("then: task_runner.py --recompute-weights")
+        return node_files, relationship_files
+
+    def _write_nodes(self, directory):
+        groups = {}
+        for ref in self._vertices:
+            groups.setdefault(ref.label, []).append(ref)
+        files = []
+        for label, refs in sorted(groups.items()):
+            columns = sorted(set(k for ref in refs for k in ref.properties))
+            header = [u"id:ID", u":LABEL"]
+            header += [self._column(c, refs) for c in columns]
+            rows = []
+            for ref in refs:
+                row = [self.node_id(ref), u";".join(sorted(ref.labels))]
+                row += [self._cell(ref.properties.get(c)) for c in columns]
+                rows.append(row)
+            files.append(self._write(directory, "nodes", label, header, rows))
+        return files
+
+    def _write_relationships(self, directory):
+        groups = {}
+        seen = set()
+        for vertex1, relationship, vertex2, _ in self._relationships:
+            start, end = self.node_id(vertex1), self.node_id(vertex2)
+            # relationships are merged without direction
+            key = (min(start, end), max(start, end), relationship)
+            if key in seen:
+                continue
+            seen.add(key)
+            groups.setdefault(relationship, []).append(
+                (start, end, relationship)
+            )
+        files = []
+        header = [u":START_ID", u":END_ID", u":TYPE"]
+        for relationship, rows in sorted(groups.items()):
+            files.append(
+                self._write(directory, "relationships", relationship,
+                            header, rows)
+            )
+        return files
+
+    @staticmethod
+    def node_id(ref):
+        # the same entity gets the same id on every export
+        identity = u"\x1f".join(
+            [ref.label, ref.key, unicode(ref.value)]
+        ).encode("utf-8")
+        return unicode(hashlib.sha1(identity).hexdigest())
+
+    @staticmethod
+    def _write(directory, kind, name, header, rows):
+        filename = u"%s_%s.csv" % (kind, name.lower().replace(" ", "_"))
+        path = os.path.join(directory, filename)
+        with open(path, "wb") as f:
+            writer = unicode_csv.UnicodeWriter(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return path
+
+    @staticmethod
+    def _column(name, refs):
+        values = [
+            ref.properties[name] for ref in refs
+            if ref.properties.get(name) is not None
+        ]
+        if values and all(isinstance(v, bool) for v in values):
+            return u"%s:boolean" % name
+        if values and all(isinstance(v, (int, long)) and
+                          not isinstance(v, bool) for v in values):
+            return u"%s:long" % name
+        if any(isinstance(v, list) for v in values):
+            return u"%s:string[]" % name
+        return name
+
+    @staticmethod
+    def _cell(value):
+        if value is None:
+            return u""
+        if isinstance(value, list):
+            return u";".join(unicode(v) for v in value)
+        if isinstance(value, str):
+            return value.decode("utf-8")
+        return unicode(value)
+
+
+def export(graphers, directory):
+    writer = ExportWriter()
+    core.BaseDataModel.batch = writer
+    core.BaseDataModel.date_index = writer
+    try:
+        for grapher in graphers:
+            grapher().run()
+    finally:
+        core.BaseDataModel.end_session()
+        core.BaseDataModel.batch = None
+        core.BaseDataModel.date_index = None
+    return writer.write(directory)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from utils import mongo
+
+
+class GraphVersion:
+    # bumped by every grapher run; cached results from an older version
+    # are never served again
+    COLLECTION = "graph_version"
+
+    def __init__(self, db=None):
+        self.db = db or mongo.MongoInterface()
+
+    def current(self):
+        stamp = self.db.find_one(self.COLLECTION, {"_id": "graph"})
+        if stamp:
+            return stamp["version"]
+        return 0
+
+    def bump(self):
+        # results cached under the old stamp can never be served again
+        self.db.drop(QueryCache.COLLECTION)
+        self.db.update(
+            self.COLLECTION, {"_id": "graph"},
+            {"$inc": {"version": 1}}, upsert=True
+        )
+        return self.current()
+
+
+class CachedRecord:
+    # stands in for a py2neo Record rebuilt from the shared tier
+    def __init__(self, columns, values):
+        self.columns = columns
+        self.values = values
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            return self.values[item]
+        return self.values[self.columns.index(item)]
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+
+class QueryCache:
+    # read-through cache of query results keyed by template, statement and
+    # parameters: an in-process LRU tier and an optional tier in Mongo
+    # shared between processes
+    COLLECTION = "query_cache"
+
+    def __init__(self, size=2000, shared=False, refresh=5, version=None):
+        self._logger = logging.getLogger('spud')
+        self.size = size
+        self.refresh = refresh
+        self.version = version or GraphVersion()
+        self.db = self.version.db if shared else None
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._stamp = None
+        self._checked = 0
+
+    def fetch(self, template, statement, parameters, execute):
+        key = self._key(template, statement, parameters)
+        result = self._get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = execute()
+        self._put(key, result)
+        return result
+
+    def current(self):
+        # the stamp is re-read at most every `refresh` seconds
+        now = time.time()
+        if self._stamp is None or now - self._checked > self.refresh:
+            stamp = self.version.current()
+            if stamp != self._stamp:
+                self._results.clear()
+            self._stamp = stamp
+            self._checked = now
+        return self._stamp
+
+    def clear(self):
+        self._results.clear()
+        self._stamp = None
+
+    def _key(self, template, statement, parameters):
+        digest = hashlib.sha1(json.dumps(
+            [template, statement, parameters], sort_keys=True, default=repr
+        )).hexdigest()
+        return "%s:%s" % (self.current(), digest)
+
+    def _get(self, key):
+        result = self._results.pop(key, None)
+        if result is not None:
+            self._results[key] = result
+            return result
+        if self.db is not None:
+            document = self.db.find_one(self.COLLECTION, {"_id": key})
+            if document is not None:
+                result = [
+                    CachedRecord(document["columns"], values)
+                    for values in document["rows"]
+                ]
+                self._remember(key, result)
+                return result
+        return None
+
+    def _put(self, key, result):
+        self._remember(key, result)
+        if self.db is None:
+            return
+        document = self._document(key, result)
+        if document is not None:
+            self.db.save(self.COLLECTION, document)
+
+    def _remember(self, key, result):
+        self._results[key] = result
+        while len(self._results) > self.size:
+            self._results.popitem(last=False)
+
+    @staticmethod
+    def _document(key, result):
+        # only plain values go to the shared tier; nodes and relationships
+        # stay in process
+        rows = [list(record) for record in result]
+        try:
+            json.dumps(rows)
+        except TypeError:
+            return None
+        columns = list(result.columns) if rows else []
+        return {"_id": key, "columns": columns, "rows": rows}
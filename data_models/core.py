@@ -1,20 +1,677 @@
 # -*- coding: utf-8 -*-
+from collections import OrderedDict
 from data_interfaces import graph_database
 import logging
 import calendar
+import datetime
+import time
+import sys
+import os
 import re
+import threading
+
+
+class VertexRef:
+    # stands in for a vertex whose MERGE is still queued in a BatchWriter;
+    # reads and writes go to a local mirror of the queued properties
+    def __init__(self, writer, label, key, value):
+        self._writer = writer
+        self.label = label
+        self.key = key
+        self.value = value
+        self.labels = set([label])
+        self.properties = {key: value}
+
+    def __getitem__(self, item):
+        return self.properties.get(item)
+
+    def __setitem__(self, item, value):
+        self.properties[item] = value
+
+    def push(self):
+        self._writer.set_properties(self, self.properties)
+
+
+class BatchWriter:
+    offline = False
+
+    def __init__(self, graph, batch_size=500):
+        self._logger = logging.getLogger('spud')
+        self.graph = graph
+        self.batch_size = batch_size
+        self._refs = {}
+        self._vertices = []
+        self._properties = OrderedDict()
+        self._relationships = []
+
+    def lookup(self, label, key, value):
+        return self._refs.get((label, key, value))
+
+    def resolve(self, node):
+        # re-apply writes queued against a node fetched from the graph
+        if node._id in self._properties:
+            _, properties, labels = self._properties[node._id]
+            for prop in properties:
+                node.properties[prop] = properties[prop]
+            for label in labels:
+                node.labels.add(label)
+        return node
+
+    def merge_vertex(self, label, key, value):
+        ref = self.lookup(label, key, value)
+        if ref is None:
+            ref = VertexRef(self, label, key, value)
+            self._refs[(label, key, value)] = ref
+            self._vertices.append(ref)
+            self._check_size()
+        return ref
+
+    def set_properties(self, vertex, properties=None, labels=None):
+        # changes to the same vertex are merged into a single SET
+        properties = properties or {}
+        if labels and not isinstance(labels, list):
+            labels = [labels]
+        labels = labels or []
+        for prop in properties:
+            vertex.properties[prop] = properties[prop]
+        for label in labels:
+            vertex.labels.add(label)
+        if isinstance(vertex, VertexRef):
+            identity = (vertex.label, vertex.key, vertex.value)
+            for label in labels:
+                self._refs[(label, vertex.key, vertex.value)] = vertex
+        else:
+            identity = vertex._id
+        if identity not in self._properties:
+            self._properties[identity] = (vertex, {}, set())
+        _, pending_properties, pending_labels = self._properties[identity]
+        pending_properties.update(properties)
+        pending_labels.update(labels)
+        self._check_size()
+
+    def merge_relationship(self, vertex1, relationship, vertex2,
+                           counted=True):
+        self._relationships.append((vertex1, relationship, vertex2, counted))
+        self._check_size()
+
+    def pending(self):
+        return len(self._vertices) + len(self._properties) + \
+            len(self._relationships)
+
+    def flush(self):
+        if not self.pending():
+            return
+        self._logger.debug("flushing %s queued writes" % self.pending())
+        self._flush_vertices()
+        self._flush_properties()
+        self._flush_relationships()
+        self._refs = {}
+
+    def discard(self):
+        self._refs = {}
+        self._vertices = []
+        self._properties = OrderedDict()
+        self._relationships = []
+
+    def _check_size(self):
+        if self.pending() >= self.batch_size:
+            self.flush()
+
+    def _flush_vertices(self):
+        groups = {}
+        for ref in self._vertices:
+            groups.setdefault((ref.label, ref.key), []).append(
+                {"value": ref.value}
+            )
+        for (label, key), rows in groups.items():
+            statement = u"""
+                UNWIND {{rows}} AS row
+                MERGE (v:`{0}` {{`{1}`: row.value}})
+            """.format(label, key)
+            self._execute("batch_merge_vertices", statement, rows)
+        self._vertices = []
+
+    def _flush_properties(self):
+        groups = {}
+        for vertex, properties, labels in self._properties.values():
+            match, value = self._match("v", vertex)
+            label_set = tuple(sorted(labels))
+            groups.setdefault((match, label_set), []).append(
+                {"v": value, "properties": properties}
+            )
+        for (match, label_set), rows in groups.items():
+            set_labels = u""
+            if label_set:
+                set_labels = u"SET v:" + u":".join(
+                    u"`%s`" % label for label in label_set
+                )
+            statement = u"""
+                UNWIND {{rows}} AS row
+                {0}
+                SET v += row.properties
+                {1}
+            """.format(match, set_labels)
+            self._execute("batch_set_properties", statement, rows)
+        self._properties = OrderedDict()
+
+    def _flush_relationships(self):
+        groups = {}
+        for vertex1, relationship, vertex2, counted in self._relationships:
+            match1, value1 = self._match("a", vertex1)
+            match2, value2 = self._match("b", vertex2)
+            key = (match1, match2, relationship, counted)
+            groups.setdefault(key, []).append({"a": value1, "b": value2})
+        for (match1, match2, relationship, counted), rows in groups.items():
+            counters = u""
+            if counted:
+                counters = count_relationship("a", "b", relationship)
+            statement = u"""
+                UNWIND {{rows}} AS row
+                {0}
+                {1}
+                MERGE (a)-[r:`{2}`]-(b)
+                {3}
+            """.format(match1, match2, relationship, counters)
+            self._execute("batch_merge_relationships", statement, rows)
+        self._relationships = []
+
+    def _execute(self, template, statement, rows):
+        for i in range(0, len(rows), self.batch_size):
+            templates.record(template, statement)
+            parameters = {"rows": rows[i:i + self.batch_size]}
+            if BaseDataModel.session is not None:
+                BaseDataModel.session.execute(statement, parameters)
+            else:
+                self.graph.cypher.execute(statement, parameters)
+
+    @staticmethod
+    def _match(name, vertex):
+        if isinstance(vertex, VertexRef):
+            match = u"MATCH ({0}:`{1}` {{`{2}`: row.{0}}})".format(
+                name, vertex.label, vertex.key
+            )
+            return match, vertex.value
+        else:
+            match = u"MATCH ({0}) WHERE id({0}) = row.{0}".format(name)
+            return match, vertex._id
+
+
+class VertexCache:
+    # bounded LRU identity map of (label, key, value) -> vertex, so the
+    # same entity is only looked up once per run
+    def __init__(self, size=10000):
+        self.size = size
+        self._vertices = OrderedDict()
+
+    def get(self, label, key, value):
+        vertex = self._vertices.pop((label, key, value), None)
+        if vertex is not None:
+            self._vertices[(label, key, value)] = vertex
+        return vertex
+
+    def put(self, label, key, value, vertex):
+        self._vertices.pop((label, key, value), None)
+        self._vertices[(label, key, value)] = vertex
+        while len(self._vertices) > self.size:
+            self._vertices.popitem(last=False)
+
+    def invalidate(self, label, key=None, value=None):
+        for entry in list(self._vertices):
+            if entry[0] == label and key in (None, entry[1]) \
+                    and value in (None, entry[2]):
+                del self._vertices[entry]
+
+    def clear(self):
+        self._vertices.clear()
+
+    def __len__(self):
+        return len(self._vertices)
+
+
+class IdentityMap:
+    # one unit of work (a web request, an api_gen iteration): each model
+    # built through BaseDataModel.instance() for the same class, name and
+    # arguments is built once, and each vertex is fetched once
+    def __init__(self):
+        self._instances = {}
+        self._vertices = {}
+
+    def instance(self, key):
+        return self._instances.get(key)
+
+    def add(self, key, instance):
+        self._instances[key] = instance
+
+    def vertex(self, label, key, value):
+        return self._vertices.get((label, key, value))
+
+    def put_vertex(self, label, key, value, vertex):
+        self._vertices[(label, key, value)] = vertex
+
+    def clear(self):
+        self._instances.clear()
+        self._vertices.clear()
+
+
+class NodeRef:
+    # a stored vertex known only by its id, such as a calendar day
+    def __init__(self, node_id, label):
+        self._id = node_id
+        self.labels = set([label])
+
+    def __getitem__(self, item):
+        return None
+
+
+class DateIndex:
+    # (year, month, day) -> calendar day node id, so linking a record to a
+    # date does not walk the year/month/day tree every time. Days are
+    # merged into the (Calendar)-[:YEAR]->(Year)-[:MONTH]->(Month)-[:DAY]->
+    # (Day) tree one statement per year, outside any grapher transaction.
+    # Days missing from the index are merged when first asked for
+    def __init__(self, graph):
+        self._logger = logging.getLogger('spud')
+        self.graph = graph
+        self._days = {}
+
+    def preload(self, first_year, last_year):
+        self._logger.debug(
+            "preloading calendar %s-%s" % (first_year, last_year)
+        )
+        for year in range(first_year, last_year + 1):
+            day = datetime.date(year, 1, 1)
+            dates = []
+            while day.year == year:
+                dates.append(day)
+                day += datetime.timedelta(days=1)
+            self._merge(dates)
+
+    def day(self, year, month, day):
+        key = (year, month, day)
+        if key not in self._days:
+            try:
+                self._merge([datetime.date(year, month, day)])
+            except ValueError:
+                return None
+        return NodeRef(self._days[key], "Day")
+
+    def _merge(self, dates):
+        years = OrderedDict()
+        for date in dates:
+            months = years.setdefault(date.year, OrderedDict())
+            months.setdefault(date.month, []).append(date.day)
+        parameter = [
+            {"year": year, "months": [
+                {"month": month, "days": days}
+                for month, days in months.items()
+            ]}
+            for year, months in years.items()
+        ]
+        statement = templates.statement("calendar_days")
+        templates.record("calendar_days", statement)
+        output = self.graph.cypher.execute(statement, {"years": parameter})
+        for entry in output:
+            self._days[(entry["year"], entry["month"], entry["day"])] = \
+                entry["id"]
+
+    def __len__(self):
+        return len(self._days)
+
+
+class ProfileSection:
+    # one OPTIONAL MATCH ... collect() stage of a profile query; `node` is
+    # null in the collected rows when the optional pattern found nothing
+    def __init__(self, name, match, columns):
+        self.name = name
+        self.match = match
+        self.columns = columns
+
+    def matches(self):
+        # a list of patterns runs as consecutive OPTIONAL MATCHes, so a
+        # later pattern may find nothing without losing the earlier rows
+        if isinstance(self.match, list):
+            return self.match
+        return [self.match]
+
+    def projection(self):
+        fields = u", ".join(
+            u"%s: %s" % (column, expression)
+            for column, expression in self.columns
+        )
+        return u"collect({%s})" % fields
+
+    @staticmethod
+    def rows(collected):
+        return [row for row in collected if row["node"] is not None]
+
+
+def profile(*sections):
+    return OrderedDict((section.name, section) for section in sections)
+
+
+def count_relationship(start, end, relationship, name="r"):
+    # follows a relationship MERGE: bumps the endpoints' `weight` and
+    # per-type `degree_<TYPE>` only when the relationship is new, so
+    # listings can sort on a stored property instead of counting
+    # relationships at read time. Both endpoints are write locked in an
+    # earlier clause than the one reading the counters, so concurrent
+    # transactions cannot lose an increment. Sharded runs don't count
+    # (see BaseDataModel.counting): their shards would queue on the same
+    # hub nodes for every relationship
+    counters = []
+    for vertex in (start, end):
+        for prop in (u"weight", u"degree_%s" % relationship):
+            counters.append(u"{0}.`{1}` = coalesce({0}.`{1}`, 0) + 1".format(
+                vertex, prop
+            ))
+    new = u"FOREACH (new IN CASE WHEN {0}._new THEN [1] ELSE [] END |".format(
+        name
+    )
+    return u"\n".join([
+        u"ON CREATE SET {0}._new = true".format(name),
+        u"{0} SET {1}._lock = true, {2}._lock = true)".format(new, start, end),
+        u"{0} SET {1} REMOVE {2}._new, {3}._lock, {4}._lock)".format(
+            new, u", ".join(counters), name, start, end
+        )
+    ])
+
+
+def degree(vertex, *relationships):
+    # read-side counterpart of count_relationship for a subset of types
+    return u" + ".join(
+        u"coalesce({0}.`degree_{1}`, 0)".format(vertex, relationship)
+        for relationship in relationships
+    )
+
+
+def pages(iterable, size):
+    # consecutive lists of up to `size` items from any iterable
+    page = []
+    for item in iterable:
+        page.append(item)
+        if len(page) >= size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def summarise_meetings(rows):
+    # one pass over the rows of a meetings section: (meeting_id, position,
+    # host, department), with host null when no politician was matched and
+    # position null when the meeting has no government office
+    meetings, politicians, departments = set(), [], []
+    positions = OrderedDict()
+    for row in rows:
+        meetings.add(row["meeting_id"])
+        if row["host"] and row["host"] not in politicians:
+            politicians.append(row["host"])
+        if row["department"] and row["department"] not in departments:
+            departments.append(row["department"])
+        if row["position"] is None:
+            continue
+        position = positions.setdefault(row["position"], (set(), []))
+        position[0].add(row["meeting_id"])
+        if row["host"] and row["host"] not in position[1]:
+            position[1].append(row["host"])
+    return {
+        "meetings_count": len(meetings),
+        "politician_count": len(politicians),
+        "department_count": len(departments),
+        "politicians_met": politicians,
+        "departments_met": departments,
+        "meetings_per_position": [
+            {
+                "position": name,
+                "meetings_count": len(position[0]),
+                "politicians_met": position[1]
+            }
+            for name, position in positions.items()
+        ]
+    }
+
+
+class lazy(object):
+    # memoised attribute: built on first read and stored on the instance,
+    # where it shadows the descriptor; `sections` names the profile sections
+    # it is built from so prefetch() can load several in one query
+    def __init__(self, *sections):
+        self.sections = sections
+        self.method = None
+        self.name = None
+
+    def __call__(self, method):
+        self.method = method
+        self.name = method.__name__
+        return self
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self.method(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
+def profile_statement(start, sections, vertex=False):
+    # each stage aggregates back to one row per entity before the next
+    # OPTIONAL MATCH, so the sections don't multiply each other's rows
+    carried = [u"n"]
+    lines = [start]
+    for section in sections:
+        for match in section.matches():
+            lines.append(u"OPTIONAL MATCH %s" % match)
+        lines.append(u"WITH %s, %s AS %s" % (
+            u", ".join(carried), section.projection(), section.name
+        ))
+        carried.append(section.name)
+    returned = [u"n.name AS name"]
+    if vertex:
+        returned.append(u"n AS vertex")
+    lines.append(u"RETURN %s" % u", ".join(returned + carried[1:]))
+    return u"\n".join(lines)
+
+
+class QueryTemplates:
+    # values always travel as parameters, so each template keeps a stable
+    # statement text and Neo4j can reuse the plan it cached the first time
+    def __init__(self):
+        self._templates = {}
+        self._stats = {}
+
+    def register(self, name, statement):
+        self._templates[name] = statement
+
+    def statement(self, name, *structure):
+        # labels, keys and relationship types can't be parameters
+        statement = self._templates[name]
+        if structure:
+            statement = statement.format(*structure)
+        return statement
+
+    def record(self, name, statement):
+        # statement reuse: how often a template was sent with a text it had
+        # already been sent with, counted client side
+        stats = self._stats.setdefault(
+            name, {"calls": 0, "reused": 0, "statements": set()}
+        )
+        stats["calls"] += 1
+        if statement in stats["statements"]:
+            stats["reused"] += 1
+        else:
+            stats["statements"].add(statement)
+
+    def report(self):
+        results = []
+        for name in sorted(self._stats):
+            stats = self._stats[name]
+            results.append({
+                "template": name,
+                "calls": stats["calls"],
+                "reused": stats["reused"],
+                "statements": len(stats["statements"])
+            })
+        return results
+
+
+class CypherProfile:
+    # SPUD_CYPHER_PROFILE=1 runs reads under PROFILE and totals db hits,
+    # rows and elapsed time per template and calling method
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._stats = {}
+
+    def record(self, template, caller, statement, db_hits, rows, elapsed):
+        key = (template, caller)
+        stats = self._stats.setdefault(key, {
+            "template": template,
+            "caller": caller,
+            "statement": u" ".join(statement.split()),
+            "calls": 0,
+            "db_hits": 0,
+            "rows": 0,
+            "elapsed": 0.0
+        })
+        stats["calls"] += 1
+        stats["db_hits"] += db_hits
+        stats["rows"] += rows
+        stats["elapsed"] += elapsed
+
+    def report(self):
+        return sorted(
+            self._stats.values(),
+            key=lambda stats: (stats["db_hits"], stats["elapsed"]),
+            reverse=True
+        )
+
+    def write(self, path):
+        with open(path, "w") as report:
+            for stats in self.report():
+                line = u"%10s db hits %8s rows %6s calls %9.3fs  %s (%s)\n" % (
+                    stats["db_hits"], stats["rows"], stats["calls"],
+                    stats["elapsed"], stats["template"], stats["caller"]
+                )
+                report.write(line.encode("utf-8"))
+                report.write((u"    %s\n" % stats["statement"]).encode("utf-8"))
+
+    @staticmethod
+    def caller():
+        # the first frame outside this module, i.e. the model method or
+        # grapher that asked for the query
+        frame = sys._getframe(1)
+        while frame and frame.f_code.co_filename.rstrip("c") == \
+                __file__.rstrip("c"):
+            frame = frame.f_back
+        if frame is None:
+            return None
+        return "%s.%s" % (
+            os.path.basename(frame.f_code.co_filename).split(".")[0],
+            frame.f_code.co_name
+        )
+
+
+_units = threading.local()
+templates = QueryTemplates()
+profiler = CypherProfile(os.environ.get("SPUD_CYPHER_PROFILE") == "1")
+templates.register("find_vertex", u"""
+    MATCH (v:`{0}` {{`{1}`: {{value}}}})
+    RETURN v
+""")
+templates.register("find_entity", u"""
+    MATCH (entity:`Named Entity` {name: {name}})
+    RETURN entity.name, labels(entity)
+""")
+templates.register("merge_vertex", u"""
+    MERGE (v:`{0}` {{`{1}`: {{value}}}})
+    ON MATCH set v:`{0}`
+    ON CREATE set v:`{0}`
+    RETURN v
+""")
+templates.register("create_vertex", u"""
+    CREATE (v:`{0}` {{`{1}`: {{value}}}})
+    RETURN v
+""")
+templates.register("create_relationship", u"""
+    START n=node({{n}}), m=node({{m}})
+    MERGE (n)-[r:`{0}`]-(m)
+    {1}
+    RETURN r
+""")
+templates.register("set_properties", u"""
+    MATCH (v) WHERE id(v) = {{id}}
+    SET v += {{properties}}
+    {0}
+""")
+templates.register("get_all_nodes", u"""
+    MATCH (n:`{0}`) RETURN n
+""")
+# the calendar root is write locked first, so shards merging the same
+# missing day wait for each other instead of creating it twice; the root
+# itself is unique through the constraint --schema creates
+templates.register("calendar_days", u"""
+    MERGE (calendar:Calendar {name: "Gregorian"})
+    SET calendar._lock = true
+    REMOVE calendar._lock
+    WITH calendar
+    UNWIND {years} AS y
+    MERGE (calendar)-[:YEAR]->(year:Year {key: y.year})
+    WITH year, y
+    UNWIND y.months AS m
+    MERGE (year)-[:MONTH]->(month:Month {key: m.month})
+    WITH month, m, y.year AS year_key
+    UNWIND m.days AS d
+    MERGE (month)-[:DAY]->(day:Day {key: d})
+    RETURN year_key AS year, m.month AS month, d AS day, id(day) AS id
+""")
+templates.register("named_entity_export", u"""
+    MATCH (n:`Named Entity`)
+    RETURN n.name, labels(n)
+""")
+
+# never served from a query cache
+WRITE_TEMPLATES = set([
+    "merge_vertex", "create_vertex", "create_relationship", "set_properties",
+    "create_constraint", "create_index", "relationship_types",
+    "recompute_weights", "calendar_days"
+])
 
 
 class BaseDataModel:
+    # the label and key a model's vertex is merged on
+    label = None
+    primary_attribute = None
+    batch = None
+    session = None
+    vertex_cache = None
+    date_index = None
+    query_cache = None
+    change_log = None
+    # off in graph shards, whose parent recomputes the counters afterwards
+    counting = True
+
     def __init__(self):
         self.g = graph_database.GraphInterface()
         self._logger = logging.getLogger('spud')
         self.vertex = None
-        self.label = None
+        self._profile = {}
         self.document_label = 'Document'
         self.named_label = "Named Entity"
         self.category_fields = self._set_categories()
 
+    @classmethod
+    def instance(cls, *args, **kwargs):
+        # the model already built in this unit of work with the same
+        # arguments, or a new one
+        identity_map = cls.unit()
+        if identity_map is None:
+            return cls(*args, **kwargs)
+        key = (cls.__name__, repr(args), repr(sorted(kwargs.items())))
+        instance = identity_map.instance(key)
+        if instance is None:
+            instance = cls(*args, **kwargs)
+            identity_map.add(key, instance)
+        return instance
+
     def fetch(self, label, primary_attribute, search):
         exists = False
         self.vertex = self.find_vertex(
@@ -24,24 +681,116 @@ class BaseDataModel:
             exists = True
         return exists
 
+    @staticmethod
+    def begin_batch(batch_size=500):
+        if BaseDataModel.batch is None:
+            graph = graph_database.GraphInterface().graph
+            BaseDataModel.batch = BatchWriter(graph, batch_size)
+        return BaseDataModel.batch
+
+    @staticmethod
+    def begin_session(size=100):
+        if BaseDataModel.session is None:
+            BaseDataModel.session = graph_database.GraphInterface().session(
+                size,
+                before_commit=BaseDataModel._flush_batch,
+                on_rollback=BaseDataModel._discard_pending
+            )
+        return BaseDataModel.session
+
+    @staticmethod
+    def end_session():
+        if BaseDataModel.session is not None:
+            BaseDataModel.session.close()
+            BaseDataModel.session = None
+
+    @staticmethod
+    def _flush_batch():
+        if BaseDataModel.batch is not None:
+            BaseDataModel.batch.flush()
+
+    @staticmethod
+    def _discard_pending():
+        # nothing written since the last commit survived the rollback
+        if BaseDataModel.batch is not None:
+            BaseDataModel.batch.discard()
+        if BaseDataModel.vertex_cache is not None:
+            BaseDataModel.vertex_cache.clear()
+
+    @staticmethod
+    def load_calendar(first_year=None, last_year=None):
+        if BaseDataModel.date_index is None:
+            graph = graph_database.GraphInterface().graph
+            BaseDataModel.date_index = DateIndex(graph)
+        if first_year and last_year:
+            BaseDataModel.date_index.preload(first_year, last_year)
+        return BaseDataModel.date_index
+
+    @staticmethod
+    def unit():
+        # units of work are per thread, so concurrent requests in a
+        # threaded server never see each other's models
+        return getattr(_units, "identity_map", None)
+
+    @staticmethod
+    def begin_unit():
+        _units.identity_map = IdentityMap()
+        return _units.identity_map
+
+    @staticmethod
+    def end_unit():
+        identity_map = getattr(_units, "identity_map", None)
+        if identity_map is not None:
+            identity_map.clear()
+            _units.identity_map = None
+
+    @staticmethod
+    def end_batch():
+        if BaseDataModel.batch is not None:
+            BaseDataModel.batch.flush()
+            BaseDataModel.batch = None
+
     def find_vertex(self, label, node_key, value):
-        search_query = u"""
-                MATCH (v:`{0}` {{{1}:"{2}"}})
-                RETURN v
-            """.format(label, node_key, value)
-        output = self.query(search_query)
+        if self.batch:
+            pending = self.batch.lookup(label, node_key, value)
+            if pending:
+                return pending
+        preloaded = getattr(_units, "preloaded", None)
+        if preloaded is not None:
+            vertex = preloaded.get((label, node_key, value))
+            if vertex is not None:
+                return self._resolve(vertex, label, node_key, value)
+        identity_map = self.unit()
+        if identity_map is not None:
+            vertex = identity_map.vertex(label, node_key, value)
+            if vertex is not None:
+                return self._resolve(vertex, label, node_key, value)
+        if self.vertex_cache is not None:
+            vertex = self.vertex_cache.get(label, node_key, value)
+            if vertex is not None:
+                return self._resolve(vertex, label, node_key, value)
+        search_query = templates.statement("find_vertex", label, node_key)
+        output = self._execute(search_query, "find_vertex", {"value": value})
         if output:
-            return output[0][0]
+            if self.vertex_cache is not None:
+                self.vertex_cache.put(label, node_key, value, output[0][0])
+            if identity_map is not None:
+                identity_map.put_vertex(label, node_key, value, output[0][0])
+            return self._resolve(output[0][0], label, node_key, value)
         else:
             return None
 
+    def _resolve(self, vertex, label, node_key, value):
+        if self.change_log is not None:
+            self.change_log.record(vertex, label, node_key, value)
+        if self.batch:
+            return self.batch.resolve(vertex)
+        return vertex
+
     def find_entity(self, name):
         results = []
-        search_query = u"""
-                MATCH (entity:`Named Entity` {{name: "{0}"}})
-                RETURN entity.name, labels(entity)
-            """.format(name)
-        output = self.query(search_query)
+        search_query = templates.statement("find_entity")
+        output = self.query(search_query, "find_entity", name=name)
         if output:
             for entry in output:
                 detail = {
@@ -53,51 +802,254 @@ class BaseDataModel:
 
     def create_vertex(self, label, node_key, value, merge=True):
         self.vertex = None
+        if self.batch:
+            # queued rows find their vertices again by label, key and value,
+            # which a plain CREATE of a duplicate key would make ambiguous
+            if not merge:
+                raise ValueError(
+                    "batched writes can only merge %s vertices" % label
+                )
+            self.vertex = self.batch.merge_vertex(label, node_key, value)
+            return self.vertex
+        if merge and self.vertex_cache is not None:
+            # a MERGE on a key this run already merged finds the same node
+            cached = self.vertex_cache.get(label, node_key, value)
+            if cached is not None:
+                self.vertex = cached
+                if self.change_log is not None:
+                    self.change_log.record(self.vertex, label, node_key, value)
+                return self.vertex
         if merge:
-            search_query = u"""
-                    MERGE (v:`{0}` {{{1}:"{2}"}})
-                    ON MATCH set v:`{0}`
-                    ON CREATE set v:`{0}`
-                    RETURN v
-                """.format(label, node_key, value)
+            template = "merge_vertex"
         else:
-            search_query = u"""
-                    CREATE (v:`{0}` {{{1}:"{2}"}})
-                    RETURN v
-                """.format(label, node_key, value)
-            #print search_query
-        output = self.query(search_query)
+            template = "create_vertex"
+        search_query = templates.statement(template, label, node_key)
+        output = self.query(search_query, template, value=value)
         self.vertex = output[0][0]
         self.vertex.labels.add(label)
+        if self.change_log is not None:
+            self.change_log.record(self.vertex, label, node_key, value)
+        if self.vertex_cache is not None:
+            self.vertex_cache.put(label, node_key, value, self.vertex)
         return self.vertex
 
     def set_node_properties(self, properties=None, labels=None):
-        if properties:
-            node_properties = self.vertex.pull()
-            for prop in properties:
-                self.vertex.properties[prop] = properties[prop]
+        if labels and not isinstance(labels, list):
+            labels = [labels]
+        if self._is_unchanged(properties, labels):
+            return
+        self._cache_labels(labels)
+        if self.change_log is not None:
+            self.change_log.touch(self.vertex)
+        if self.batch:
+            self.batch.set_properties(self.vertex, properties, labels)
+            return
+        properties = properties or {}
+        for prop in properties:
+            self.vertex.properties[prop] = properties[prop]
+        set_labels = u""
         if labels:
-            if isinstance(labels, list):
-                for label in labels:
-                    self.vertex.labels.add(label)
-            else:
-                self.vertex.labels.add(labels)
-        self.vertex.push()
+            for label in labels:
+                self.vertex.labels.add(label)
+            set_labels = u"SET v:" + u":".join(
+                u"`%s`" % label for label in labels
+            )
+        # one round trip instead of a pull and a push
+        statement = templates.statement("set_properties", set_labels)
+        self.query(
+            statement, "set_properties",
+            id=self.vertex._id, properties=properties
+        )
+
+    def _is_unchanged(self, properties, labels):
+        # repeat set_*_details calls on a cached vertex are free
+        if self.vertex_cache is None:
+            return False
+        for prop in properties or {}:
+            if self.vertex[prop] != properties[prop]:
+                return False
+        for label in labels or []:
+            if label not in self.vertex.labels:
+                return False
+        return True
+
+    def _cache_labels(self, labels):
+        key = getattr(self, "primary_attribute", None)
+        if self.vertex_cache is None or not labels or not key:
+            return
+        if isinstance(self.vertex, VertexRef):
+            return
+        value = self.vertex[key]
+        if value is not None:
+            for label in labels:
+                self.vertex_cache.put(label, key, value, self.vertex)
+
+    def create_relationship(self, vertex1, relationship, vertex2,
+                            counted=True):
+        # calendar edges pass counted=False: day nodes would otherwise be
+        # contended counters that nothing reads
+        counted = counted and self.counting
+        if self.change_log is not None:
+            self.change_log.touch(vertex1)
+            self.change_log.touch(vertex2)
+        if self.batch:
+            self.batch.merge_relationship(
+                vertex1, relationship, vertex2, counted
+            )
+            return None
+        counters = u""
+        if counted:
+            counters = count_relationship("n", "m", relationship)
+        rel_query = templates.statement(
+            "create_relationship", relationship, counters
+        )
+        return self.query(
+            rel_query, "create_relationship", n=vertex1._id, m=vertex2._id
+        )
+
+    def query(self, query_string, template, **parameters):
+        # `template` names the statement for the reuse counts, the query
+        # cache and the cypher profile
+        if self.batch:
+            # make queued writes visible to the read
+            self.batch.flush()
+        return self._execute(query_string, template, parameters)
+
+    def _execute(self, query_string, template, parameters):
+        templates.record(template, query_string)
+        if self.batch is not None and self.batch.offline:
+            # exports never read back from the database
+            return []
+        if profiler.enabled:
+            return self._profile_execute(query_string, template, parameters)
+        if self.session is not None:
+            return self.session.execute(query_string, parameters)
+        if self.query_cache is not None and template not in WRITE_TEMPLATES:
+            return self.query_cache.fetch(
+                template, query_string, parameters,
+                lambda: self.g.graph.cypher.execute(query_string, parameters)
+            )
+        return self.g.graph.cypher.execute(query_string, parameters)
+
+    def _profile_execute(self, query_string, template, parameters):
+        # writes inside a grapher session can't be profiled on their own,
+        # so they only report rows and time
+        started = time.time()
+        db_hits = 0
+        if self.session is not None:
+            output = self.session.execute(query_string, parameters)
+        else:
+            output, db_hits = self.g.profile(query_string, parameters)
+        profiler.record(
+            template, profiler.caller(), query_string, db_hits,
+            len(output), time.time() - started
+        )
+        return output
+
+    def _load_profile(self, sections):
+        sections = [
+            section for section in sections
+            if section.name not in self._profile
+        ]
+        if not sections:
+            return
+        statement = profile_statement(u"START n=node({id})", sections)
+        template = "%s.profile" % self.__class__.__name__
+        output = self.query(statement, template, id=self.vertex._id)
+        for section in sections:
+            rows = []
+            if output:
+                rows = ProfileSection.rows(output[0][section.name])
+            self._profile[section.name] = rows
 
-    def create_relationship(self, vertex1, relationship, vertex2):
-        rel_query = u"""
-            START n=node({0}), m=node({1})
-            MERGE (n)-[r:{2}]-(m)
-            RETURN r
-        """.format(vertex1._id, vertex2._id, relationship)
-        return self.query(rel_query)
+    @classmethod
+    def load_many(cls, names, sections=None, chunk_size=100):
+        # one profile query per chunk of names instead of one per entity
+        # and section; the instances come back in the order of `names`.
+        # Vertices are matched on the model's own label and handed to the
+        # constructors through this thread's preloaded map
+        if sections is None:
+            sections = cls.PROFILE.keys()
+        sections = [cls.PROFILE[name] for name in sections]
+        start = u"""
+            UNWIND {names} AS name
+            MATCH (n:`%s` {name: name})
+        """ % cls.label
+        statement = profile_statement(start, sections, vertex=True)
+        template = "%s.load_many" % cls.__name__
+        fetch_label = getattr(cls, "fetch_label", None) or cls.label
+        loader = BaseDataModel()
+        for first in range(0, len(names), chunk_size):
+            chunk = names[first:first + chunk_size]
+            try:
+                output = loader.query(statement, template, names=chunk)
+                rows = {}
+                for entry in output:
+                    if entry["name"] in rows:
+                        raise ValueError(
+                            "%s %r is not unique" % (cls.label, entry["name"])
+                        )
+                    rows[entry["name"]] = entry
+                _units.preloaded = dict(
+                    ((fetch_label, cls.primary_attribute, name), entry["vertex"])
+                    for name, entry in rows.items()
+                )
+                instances = [cls(name) for name in chunk]
+            finally:
+                _units.preloaded = None
+            for instance in instances:
+                entry = rows.get(instance.name)
+                if entry is not None:
+                    for section in sections:
+                        instance._profile[section.name] = \
+                            ProfileSection.rows(entry[section.name])
+                yield instance
 
-    def query(self, query_string):
-        return self.g.graph.cypher.execute(query_string)
+    def prefetch(self, attributes):
+        sections = []
+        for attribute in attributes:
+            attr = getattr(self.__class__, attribute, None)
+            for name in getattr(attr, "sections", ()):
+                if self.PROFILE[name] not in sections:
+                    sections.append(self.PROFILE[name])
+        self._load_profile(sections)
+
+    def _rows(self, name):
+        if name not in self._profile:
+            self._load_profile([self.PROFILE[name]])
+        return self._profile[name]
+
+    @staticmethod
+    def _order_by(rows, key, descending=False):
+        # same order as Cypher ORDER BY: nulls last ascending, first descending
+        present = [row for row in rows if row[key] is not None]
+        missing = [row for row in rows if row[key] is None]
+        present = sorted(present, key=lambda row: row[key], reverse=descending)
+        if descending:
+            return missing + present
+        return present + missing
+
+    @staticmethod
+    def _sum(rows, key):
+        return sum(row[key] for row in rows if row[key] is not None)
+
+    def _paged(self, statement, template, page_size, **parameters):
+        # keyset paging on internal id: the statement returns one row per
+        # node, ordered by an `id` column, for ids after {after}
+        after = -1
+        while True:
+            output = self.query(
+                statement, template, after=after, size=page_size, **parameters
+            )
+            for entry in output:
+                yield entry
+            if len(output) < page_size:
+                return
+            after = output[len(output) - 1]["id"]
 
     def get_all_nodes(self, node_type):
-        search_string = u"MATCH (n:`{0}`) RETURN n".format(node_type)
-        output = self.query(search_string)
+        search_string = templates.statement("get_all_nodes", node_type)
+        output = self.query(search_string, "get_all_nodes")
         for result in output:
             yield result[0]
 
@@ -137,11 +1089,11 @@ class BaseDataModel:
     def set_date(self, date, relationship):
         converted = self._convert_date(date)
         if converted:
-            self.create_relationship(
-                self.vertex,
-                relationship,
-                self.g.calendar.date(converted[0], converted[1], converted[2]).day
-            )
+            day = self.load_calendar().day(*converted)
+            if day is not None:
+                self.create_relationship(
+                    self.vertex, relationship, day, counted=False
+                )
 
     def _convert_date(self, date):
         year_month_day = None
@@ -169,11 +1121,8 @@ class BaseDataModel:
             return None
 
     def named_entity_export(self):
-        search_query = u"""
-                MATCH (n:`Named Entity`)
-                RETURN n.name, labels(n)
-            """
-        output = self.query(search_query)
+        search_query = templates.statement("named_entity_export")
+        output = self.query(search_query, "named_entity_export")
         if output:
             for result in output:
                 try:
@@ -212,11 +1161,12 @@ class BaseDataModel:
 
 
 class NamedEntity(BaseDataModel):
+    label = "Named Entity"
+    primary_attribute = "name"
+
     def __init__(self, name=None):
         BaseDataModel.__init__(self)
         self.exists = False
-        self.label = "Named Entity"
-        self.primary_attribute = "name"
         self.name = name
 
     def create(self):
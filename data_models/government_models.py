@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
+from collections import OrderedDict
 from data_models.core import BaseDataModel
 from data_models.core import NamedEntity
+from data_models.core import ProfileSection
+from data_models.core import profile
+from data_models.core import lazy
 from utils import config
 
 
@@ -11,37 +15,54 @@ class Politicians(BaseDataModel):
 
     def get_all(self):
         search_string = u"""
-            MATCH (p) where p:Lord OR p:`Member of Parliament` with p
-            MATCH (p)-[r]-() with p,  r
-            RETURN DISTINCT p.name, p.party, p.twfy_id, p.image,
-                count(r) as weight, labels(p)
+            MATCH (p) where (p:Lord OR p:`Member of Parliament`)
+                AND p.weight > 0
+            RETURN p.name, p.party, p.twfy_id, p.image,
+                p.weight as weight, labels(p)
             ORDER BY weight DESC
         """
-        search_result = self.query(search_string)
+        search_result = self.query(search_string, "Politicians.get_all")
         return search_result
 
+    def stream_all(self, page_size=500):
+        # unordered, one page at a time; politicians with no relationships
+        # are skipped as get_all() skips them
+        search_string = u"""
+            MATCH (p) WHERE (p:Lord OR p:`Member of Parliament`)
+                AND id(p) > {after}
+            WITH p ORDER BY id(p) LIMIT {size}
+            RETURN p.name, p.party, p.twfy_id, p.image,
+                coalesce(p.weight, 0) as weight, labels(p), id(p) as id
+            ORDER BY id
+        """
+        output = self._paged(search_string, "Politicians.stream_all", page_size)
+        for entry in output:
+            if entry["weight"]:
+                yield entry
+
     def _get_count(self):
         search_string = u"""
             MATCH (p) where p:Lord OR p:`Member of Parliament` with p
             RETURN count(p)
         """
-        search_result = self.query(search_string)
+        search_result = self.query(search_string, "Politicians._get_count")
         return search_result[0][0]
 
 
 class Politician(NamedEntity):
-    def __init__(self, name=None):
+    label = "Named Entity"
+    primary_attribute = "name"
+
+    def __init__(self, name=None, prefetch=None):
         NamedEntity.__init__(self)
-        self.label = "Named Entity"
-        self.primary_attribute = "name"
         self.name = name
+        self._prefetch = prefetch
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.name
         )
         if self.exists:
-            self.labels = self._get_labels()
+            self.labels = list(self.vertex.labels)
             self.type = self._get_type()
-            self._set_properties()
 
     def _get_type(self):
         if "Member of Parliament" in self.labels:
@@ -49,29 +70,59 @@ class Politician(NamedEntity):
         elif "Lord" in self.labels:
             return "lord"
 
-    def _set_properties(self):
+    @lazy()
+    def _politician(self):
+        identity_map = self.unit()
+        if identity_map is not None:
+            # the MP or Lord fetch finds the vertex this one already has
+            for label in self.labels:
+                identity_map.put_vertex(
+                    label, self.primary_attribute, self.name, self.vertex
+                )
         if self.type == "mp":
-            politician = MemberOfParliament(self.name)
-            self.committees = politician.committees
+            return MemberOfParliament.instance(
+                self.name, prefetch=self._prefetch
+            )
         elif self.type == "lord":
-            politician = Lord(self.name)
+            return Lord.instance(self.name, prefetch=self._prefetch)
         else:
             print "something wrong with:", self.name
-        self.positions = politician.positions
-        self.departments = politician.departments
-        self.meetings = politician.meetings
-        self.meetings_summary = politician.meetings_summary
-        self.interests = politician.interests
-        self.interests_summary = politician.interests_summary
-        self.donations = politician.donations
-        self.donations_summary = politician.donations_summary
 
-    def _get_labels(self):
-        query = u"""
-            MATCH (p:`Named Entity` {{name: "{0}"}}) WITH p
-            RETURN labels(p) as labels
-        """.format(self.vertex["name"])
-        return self.query(query)[0][0]
+    @lazy()
+    def committees(self):
+        return self._politician.committees
+
+    @lazy()
+    def positions(self):
+        return self._politician.positions
+
+    @lazy()
+    def departments(self):
+        return self._politician.departments
+
+    @lazy()
+    def meetings(self):
+        return self._politician.meetings
+
+    @lazy()
+    def meetings_summary(self):
+        return self._politician.meetings_summary
+
+    @lazy()
+    def interests(self):
+        return self._politician.interests
+
+    @lazy()
+    def interests_summary(self):
+        return self._politician.interests_summary
+
+    @lazy()
+    def donations(self):
+        return self._politician.donations
+
+    @lazy()
+    def donations_summary(self):
+        return self._politician.donations_summary
 
 
 class MembersOfParliament(BaseDataModel):
@@ -81,70 +132,222 @@ class MembersOfParliament(BaseDataModel):
 
     def get_all(self):
         search_string = u"""
-            MATCH (mp:`Member of Parliament`) with mp
-            MATCH (mp)-[r]-() with mp,  r
+            MATCH (mp:`Member of Parliament`) WHERE mp.weight > 0
             RETURN mp.name, mp.party, mp.twfy_id, mp.image,
-                count(r) as weight, labels(mp) as labels
+                mp.weight as weight, labels(mp) as labels
             ORDER BY weight DESC
         """
-        search_result = self.query(search_string)
+        search_result = self.query(
+            search_string, "MembersOfParliament.get_all"
+        )
         return search_result
 
+    def stream_all(self, page_size=500):
+        search_string = u"""
+            MATCH (mp:`Member of Parliament`) WHERE id(mp) > {after}
+            WITH mp ORDER BY id(mp) LIMIT {size}
+            RETURN mp.name, mp.party, mp.twfy_id, mp.image,
+                coalesce(mp.weight, 0) as weight, labels(mp) as labels,
+                id(mp) as id
+            ORDER BY id
+        """
+        output = self._paged(
+            search_string, "MembersOfParliament.stream_all", page_size
+        )
+        for entry in output:
+            if entry["weight"]:
+                yield entry
+
     def _get_mp_count(self):
         search_string = u"""
             MATCH (mp:`Member of Parliament`)
             RETURN count(mp)
         """
-        search_result = self.query(search_string)
+        search_result = self.query(
+            search_string, "MembersOfParliament._get_mp_count"
+        )
         return search_result[0][0]
 
 
 class MemberOfParliament(NamedEntity):
-    def __init__(self, name=None, get_properties=True):
+    label = "Member of Parliament"
+    primary_attribute = "name"
+    PROFILE = profile(
+        ProfileSection("offices", u"""
+            (n)-[:ELECTED_FOR]-(const)-[:SERVED_IN]-(p)
+                WHERE (const.left_reason = "still_in_office"
+                    OR const.left_reason = "general_election")
+                AND (p:`Government Position` OR p:`Select Committee`)
+        """, [
+            ("node", "id(p)"), ("name", "p.name"), ("labels", "labels(p)")
+        ]),
+        ProfileSection("departments", u"""
+            (n)-[:SERVED_IN]-(p)-[:OFFICE_IN]-(d:`Government Department`)
+                WHERE (p)-[:ATTENDED_BY]-()
+        """, [
+            ("node", "id(d)"), ("department", "d.name"), ("position", "p.name")
+        ]),
+        ProfileSection("meetings", u"""
+            (n)-[:SERVED_IN]-(p:`Government Office`)-[:ATTENDED_BY]-(m)
+                -[:ATTENDED_BY]-(a:`Meeting Attendee`)
+                WHERE m.host_name = n.name
+        """, [
+            ("node", "id(a)"), ("position", "p.name"), ("title", "p.title"),
+            ("attendee", "a.name"), ("meeting", "m.meeting"),
+            ("purpose", "m.purpose"), ("date", "m.date"),
+            ("source_url", "m.source_url"),
+            ("source_linked_from", "m.source_linked_from"),
+            ("source_fetched", "m.source_fetched")
+        ]),
+        ProfileSection("categories", u"""
+            (n)-[:INTERESTS_REGISTERED_IN]-(cat)
+        """, [
+            ("node", "id(cat)"), ("category", "cat.category")
+        ]),
+        ProfileSection("interests", u"""
+            (n)-[:INTERESTS_REGISTERED_IN]-(cat)-[:INTEREST_RELATIONSHIP]-(rel)
+                -[:REGISTERED_CONTRIBUTOR]-(i),
+                (rel)-[:REMUNERATION_RECEIVED]-(p)
+        """, [
+            ("node", "id(p)"), ("category", "cat.category"),
+            ("labels", "labels(i)"), ("contributor", "p.contributor"),
+            ("amount", "p.amount"), ("source_url", "p.source_url"),
+            ("source_fetched", "p.source_fetched"),
+            ("source_linked_from", "p.source_linked_from"),
+            ("recipient", "p.recipient"),
+            ("recorded_date", "p.`recorded date`"),
+            ("registered", "p.registered"), ("visit_dates", "p.visit_dates"),
+            ("purpose", "p.purpose"), ("donor_status", "p.donor_status"),
+            ("nature", "p.nature")
+        ]),
+        ProfileSection("interest_relationships", u"""
+            (n)-[:INTERESTS_REGISTERED_IN]-(cat)-[:INTEREST_RELATIONSHIP]-(rel)
+        """, [
+            ("node", "id(rel)")
+        ]),
+        ProfileSection("remunerations", u"""
+            (n)-[:INTERESTS_REGISTERED_IN]-(cat)-[:INTEREST_RELATIONSHIP]-(rel)
+                -[:REMUNERATION_RECEIVED]-(x)
+        """, [
+            ("node", "id(x)"), ("amount", "x.amount")
+        ]),
+        ProfileSection("funding", u"""
+            (n)-[:FUNDING_RELATIONSHIP]-(rel)
+        """, [
+            ("node", "id(rel)"), ("donor", "rel.donor")
+        ]),
+        ProfileSection("donation_amounts", u"""
+            (n)-[:FUNDING_RELATIONSHIP]-(rel)-[:DONATION_RECEIVED]-(x)
+        """, [
+            ("node", "id(x)"), ("amount", "x.amount")
+        ]),
+        ProfileSection("donations", u"""
+            (n)-[:FUNDING_RELATIONSHIP]-(rel)-[:DONATION_RECEIVED]-(x),
+                (rel)-[:REGISTERED_CONTRIBUTOR]-(p)
+        """, [
+            ("node", "id(x)"), ("name", "p.name"),
+            ("donor_type", "p.donor_type"), ("company_reg", "p.company_reg"),
+            ("labels", "labels(p)"), ("amount", "x.amount"),
+            ("reported_date", "x.reported_date"),
+            ("received_date", "x.received_date"), ("nature", "x.nature"),
+            ("purpose", "x.purpose"), ("ec_reference", "x.ec_reference"),
+            ("accepted_date", "x.accepted_date"), ("recd_by", "x.recd_by"),
+            ("source_url", "x.source_url"),
+            ("source_linked_from", "x.source_linked_from"),
+            ("source_fetched", "x.source_fetched")
+        ])
+    )
+
+    def __init__(self, name=None, get_properties=True, prefetch=None):
         NamedEntity.__init__(self)
-        self.label = "Member of Parliament"
-        self.primary_attribute = "name"
         self.name = name
         self._fetch_properties = get_properties
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.name
         )
-        if self.exists and self._fetch_properties:
-            info = self._get_mp_info()
-            offices = self._get_offices()
-            self.party, self.image_url = info["party"], info["image"]
-            self.mp_website = info["mp_website"]
-            self.wikipedia = info["wikipedia"]
-            self.guardian = info["guardian"]
-            self.bbc = info["bbc"]
-            self.departments = offices["departments"]
-            self.positions = offices["positions"]
-            self.committees = offices["committees"]
-            self.meetings = self._get_meetings()
-            self.meetings_summary = self._get_meeting_summary()
-            self.interest_categories = self._interest_categories()
-            self.interests = self._get_interests()
-            self.interests_summary = self._get_interests_summary()
-            self.donations = self._get_donations()
-            self.donations_summary = self._get_donations_summary()
+        if self.exists and self._fetch_properties and prefetch:
+            self.prefetch(prefetch)
+
+    @lazy()
+    def _info(self):
+        return self._get_mp_info()
+
+    @lazy()
+    def party(self):
+        return self._info["party"]
+
+    @lazy()
+    def image_url(self):
+        return self._info["image"]
+
+    @lazy()
+    def mp_website(self):
+        return self._info["mp_website"]
+
+    @lazy()
+    def wikipedia(self):
+        return self._info["wikipedia"]
+
+    @lazy()
+    def guardian(self):
+        return self._info["guardian"]
+
+    @lazy()
+    def bbc(self):
+        return self._info["bbc"]
+
+    @lazy("offices", "departments")
+    def _offices(self):
+        return self._get_offices()
+
+    @lazy("offices", "departments")
+    def departments(self):
+        return self._offices["departments"]
+
+    @lazy("offices", "departments")
+    def positions(self):
+        return self._offices["positions"]
+
+    @lazy("offices", "departments")
+    def committees(self):
+        return self._offices["committees"]
+
+    @lazy("meetings")
+    def meetings(self):
+        return self._get_meetings()
+
+    @lazy("meetings")
+    def meetings_summary(self):
+        return self._get_meeting_summary()
+
+    @lazy("categories")
+    def interest_categories(self):
+        return self._interest_categories()
+
+    @lazy("categories", "interests")
+    def interests(self):
+        return self._get_interests()
+
+    @lazy("categories", "interest_relationships", "remunerations")
+    def interests_summary(self):
+        return self._get_interests_summary()
+
+    @lazy("donations")
+    def donations(self):
+        return self._get_donations()
+
+    @lazy("funding", "donation_amounts")
+    def donations_summary(self):
+        return self._get_donations_summary()
 
     def _get_mp_info(self):
-        search_string = u"""
-            MATCH (mp:`Member of Parliament` {{name:"{0}"}})
-            return mp.party as party, mp.image as image,
-                mp.wikipedia_url as wikipedia,
-                mp.guardian_mp_summary as guardian,
-                mp.bbc_profile_url as bbc,
-                mp.mp_website as mp_website
-        """.format(self.vertex["name"])
-        output = self.query(search_string)
         return {
-            "party": output[0]["party"],
-            "image": output[0]["image"],
-            "wikipedia": output[0]["wikipedia"],
-            "guardian": output[0]["guardian"],
-            "bbc": output[0]["bbc"],
-            "mp_website": output[0]["mp_website"],
+            "party": self.vertex["party"],
+            "image": self.vertex["image"],
+            "wikipedia": self.vertex["wikipedia_url"],
+            "guardian": self.vertex["guardian_mp_summary"],
+            "bbc": self.vertex["bbc_profile_url"],
+            "mp_website": self.vertex["mp_website"],
         }
 
     def _get_offices(self):
@@ -166,52 +369,32 @@ class MemberOfParliament(NamedEntity):
 
     def _get_government_positions(self, pos_type):
         results = []
-        search_string = u"""
-            MATCH (mp:`Member of Parliament` {{name:"{0}"}}) with mp
-            MATCH (mp)-[:ELECTED_FOR]-(const) with const
-                WHERE const.left_reason = "still_in_office"
-                    OR const.left_reason = "general_election"
-            MATCH (const)-[:SERVED_IN]-(p:`{1}`) with p.name AS position
-            RETURN position
-        """.format(self.vertex["name"], pos_type)
-        output = self.query(search_string)
-        for entry in output:
-            results.append(entry[0])
+        for entry in self._rows("offices"):
+            if pos_type in entry["labels"]:
+                results.append(entry["name"])
         return list(set(results))
 
     def _get_government_departments(self):
         departments, positions = [], []
-        search_string = u"""
-            MATCH (d:`Government Department`)
-            MATCH (p)-[:OFFICE_IN]-(d) with d, p
-            MATCH (p)-[:SERVED_IN]-(x:`Named Entity` {{name:"{0}"}}) with d, p, x
-            MATCH (p)-[:ATTENDED_BY]-(m) with d, p, m, x
-            RETURN DISTINCT d.name as department, p.name as position
-        """.format(self.vertex["name"])
-        output = self.query(search_string)
-        for entry in output:
-            departments.append(entry[0])
-            positions.append(entry[0])
+        for entry in self._rows("departments"):
+            departments.append(entry["department"])
+            positions.append(entry["department"])
         return list(set(departments)), list(set(positions))
 
     def _get_meeting_summary(self):
         results = []
         meetings = {"meetings_total": 0}
-        query = u"""
-            MATCH (mp:`Member of Parliament` {{name: "{0}"}})
-            MATCH (mp)-[:SERVED_IN]-(p:`Government Office`) with mp, p
-            MATCH (p)-[:ATTENDED_BY]-(m) with mp, p, m
-                WHERE m.host_name = "{0}"
-            MATCH (m)-[:ATTENDED_BY]-(a:`Meeting Attendee`) with mp, p, m, a
-            RETURN p.name, count(a), collect(a.name)
-        """.format(self.vertex["name"])
-        output = self.query(query)
-        for entry in output:
+        positions = OrderedDict()
+        for entry in self._rows("meetings"):
+            positions.setdefault(entry["position"], []).append(
+                entry["attendee"]
+            )
+        for position, attendees in positions.items():
             results.append(
                 {
-                    "position": entry[0],
-                    "meetings_count": entry[1],
-                    "influencers_met": list(set(entry[2]))
+                    "position": position,
+                    "meetings_count": len(attendees),
+                    "influencers_met": list(set(attendees))
                 }
             )
         meetings["meetings_total"] = sum(m['meetings_count'] for m in results)
@@ -220,18 +403,7 @@ class MemberOfParliament(NamedEntity):
 
     def _get_meetings(self):
         results = []
-        query = u"""
-            MATCH (mp:`Member of Parliament` {{name: "{0}"}})
-            MATCH (mp)-[:SERVED_IN]-(p:`Government Office`) with mp, p
-            MATCH (p)-[:ATTENDED_BY]-(m) with mp, p, m
-                WHERE m.host_name = "{0}"
-            MATCH (m)-[:ATTENDED_BY]-(a:`Meeting Attendee`) with mp, p, m, a
-            RETURN p.name as position, p.title as title, a.name as attendee, m.meeting as meeting,
-                m.purpose as purpose, m.date as date, m.source_url, m.source_linked_from, m.source_fetched
-            ORDER BY date
-        """.format(self.vertex["name"])
-        output = self.query(query)
-        for entry in output:
+        for entry in self._order_by(self._rows("meetings"), "date"):
             title = entry["title"]
             if not title:
                 title = entry["meeting"].split(" - ")[0]
@@ -242,9 +414,9 @@ class MemberOfParliament(NamedEntity):
                 "title": title,
                 "meeting": entry["meeting"],
                 "date": entry["date"],
-                "source_url": entry["m.source_url"],
-                "source_fetched": entry["m.source_fetched"],
-                "source_linked_from": entry["m.source_linked_from"],
+                "source_url": entry["source_url"],
+                "source_fetched": entry["source_fetched"],
+                "source_linked_from": entry["source_linked_from"],
             }
             results.append(meeting)
         return results
@@ -253,61 +425,47 @@ class MemberOfParliament(NamedEntity):
         results = []
         for category in self.interest_categories:
             interests = []
-            category_low = category.lower()
-
-            values = [
-                "p.%s" % field for field in self.category_fields[category_low]
-            ]
-
-            search_string = u"""
-                MATCH (mp:`Member of Parliament` {{name:"{0}"}}) with mp
-                MATCH (mp)-[:INTERESTS_REGISTERED_IN]-(cat) with mp, cat
-                    WHERE cat.category = "{1}"
-                MATCH (cat)-[:INTEREST_RELATIONSHIP]-(rel) with mp, cat, rel
-                MATCH (rel)-[:REGISTERED_CONTRIBUTOR]-(int) with mp, cat, rel, int
-                MATCH (rel)-[:REMUNERATION_RECEIVED]-(p) with mp, cat, rel, int, p
-                RETURN labels(int) as labels, {2}
-            """.format(self.vertex["name"], category, ", ".join(values))
-
-            output = self.query(search_string)
-            for entry in output:
-                this_category = self.category_fields[category_low]
+            this_category = self.category_fields[category.lower()]
+
+            for entry in self._rows("interests"):
+                if entry["category"] != category:
+                    continue
                 interest = {
-                    "name": entry["p.contributor"],
+                    "name": entry["contributor"],
                     "labels": entry["labels"]
                 }
                 if "donor_status" in this_category:
-                    interest["donor_status"] = entry["p.donor_status"]
+                    interest["donor_status"] = entry["donor_status"]
 
-                source_url = entry["p.source_url"]
+                source_url = entry["source_url"]
                 if not source_url or source_url == "":
                     source_url = self._build_source_url(
-                        entry["p.recipient"], entry["p.`recorded date`"]
+                        entry["recipient"], entry["recorded_date"]
                     )
 
                 detail = {
                     "interest": interest,
                     "category": category,
-                    "recipient": entry["p.recipient"],
+                    "recipient": entry["recipient"],
                     "source_url": source_url,
-                    "source_fetched": entry["p.source_fetched"],
-                    "source_linked_from": entry["p.source_linked_from"],
-                    "recorded_date": entry["p.`recorded date`"],
-                    "registered": entry["p.registered"],
+                    "source_fetched": entry["source_fetched"],
+                    "source_linked_from": entry["source_linked_from"],
+                    "recorded_date": entry["recorded_date"],
+                    "registered": entry["registered"],
                 }
 
                 if "amount" in this_category:
-                    detail["amount"] = self._convert_to_currency(entry["p.amount"])
-                    detail["amount_int"] = entry["p.amount"]
+                    detail["amount"] = self._convert_to_currency(entry["amount"])
+                    detail["amount_int"] = entry["amount"]
 
                 if "visit_dates" in this_category:
-                    detail["visit_dates"] = entry["p.visit_dates"]
+                    detail["visit_dates"] = entry["visit_dates"]
 
                 if "purpose" in this_category:
-                    detail["purpose"] = entry["p.purpose"]
+                    detail["purpose"] = entry["purpose"]
 
                 if "nature" in this_category:
-                    detail["nature"] = entry["p.nature"]
+                    detail["nature"] = entry["nature"]
 
                 interests.append(detail)
 
@@ -327,25 +485,11 @@ class MemberOfParliament(NamedEntity):
         return register
 
     def _remuneration_total(self):
-        query = u"""
-            MATCH (mp:`Member of Parliament` {{name: "{0}"}}) WITH mp
-            MATCH (mp)-[:INTERESTS_REGISTERED_IN]-(cat) with mp, cat
-            MATCH (cat)-[x:INTEREST_RELATIONSHIP]-(rel) with mp, cat, rel
-            MATCH (rel)-[y:REMUNERATION_RECEIVED]-(x)
-            RETURN sum(x.amount) as total
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["total"]
+        return self._sum(self._rows("remunerations"), "amount")
 
     def _interest_categories(self):
         results = []
 
-        query = u"""
-            MATCH (mp:`Member of Parliament` {{name: "{0}"}}) WITH mp
-            MATCH (mp)-[:INTERESTS_REGISTERED_IN]-(cat) with mp, cat
-            RETURN DISTINCT cat.category
-        """.format(self.vertex["name"])
-        output = self.query(query)
-
         # TODO include Clients once parser is fixed
         # TODO include 'Loans and... ' once parsed
         excluded_categories = [
@@ -357,8 +501,9 @@ class MemberOfParliament(NamedEntity):
             u"remunerated employment, office, profession et"
         ]
 
-        for entry in output:
-            results.append(entry[0])
+        for entry in self._rows("categories"):
+            if entry["category"] not in results:
+                results.append(entry["category"])
 
         for category in excluded_categories:
             if category in results:
@@ -368,23 +513,10 @@ class MemberOfParliament(NamedEntity):
         return results
 
     def _interest_relationships(self):
-        query = u"""
-            MATCH (mp:`Member of Parliament` {{name: "{0}"}}) WITH mp
-            MATCH (mp)-[:INTERESTS_REGISTERED_IN]-(cat) with mp, cat
-            MATCH (cat)-[:INTEREST_RELATIONSHIP]-(rel) with mp, cat, rel
-            RETURN count(rel) as relationship_count
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["relationship_count"]
+        return len(self._rows("interest_relationships"))
 
     def _remuneration_count(self):
-        query = u"""
-            MATCH (mp:`Member of Parliament` {{name: "{0}"}}) WITH mp
-            MATCH (mp)-[:INTERESTS_REGISTERED_IN]-(cat) with mp, cat
-            MATCH (cat)-[x:INTEREST_RELATIONSHIP]-(rel) with mp, cat, rel
-            MATCH (rel)-[y:REMUNERATION_RECEIVED]-(x)
-            RETURN count(x) as remuneration_count
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["remuneration_count"]
+        return len(self._rows("remunerations"))
 
     def _get_donations_summary(self):
         total = self._donation_total()
@@ -396,58 +528,41 @@ class MemberOfParliament(NamedEntity):
         return ec
 
     def _donor_count(self):
-        query = u"""
-            MATCH (mp:`Member of Parliament` {{name: "{0}"}}) WITH mp
-            MATCH (mp)-[:FUNDING_RELATIONSHIP]-(rel) with mp, rel
-            RETURN DISTINCT count(rel.donor) as donor_count
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["donor_count"]
+        return len([
+            entry for entry in self._rows("funding")
+            if entry["donor"] is not None
+        ])
 
     def _donation_total(self):
-        query = u"""
-            MATCH (mp:`Member of Parliament` {{name: "{0}"}}) WITH mp
-            MATCH (mp)-[:FUNDING_RELATIONSHIP]-(rel) with mp, rel
-            MATCH (rel)-[y:DONATION_RECEIVED]-(x)
-            RETURN sum(x.amount) as total
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["total"]
+        return self._sum(self._rows("donation_amounts"), "amount")
 
     def _get_donations(self):
         results = []
-        search_string = u"""
-            MATCH (mp:`Member of Parliament` {{name:"{0}"}}) with mp
-            MATCH (mp)-[:FUNDING_RELATIONSHIP]-(rel) with mp, rel
-            MATCH (rel)-[:DONATION_RECEIVED]-(x) with mp, rel, x
-            MATCH (rel)-[:REGISTERED_CONTRIBUTOR]-(p) with mp, rel, p, x
-            RETURN p.name, p.donor_type, p.company_reg, x.amount, x.reported_date,
-                x.received_date, x.nature, x.purpose, x.ec_reference,
-                x.accepted_date, x.recd_by, x.source_url, x.source_linked_from,
-                x.source_fetched, labels(p) as labels
-            ORDER BY x.accepted_date DESC
-        """.format(self.vertex["name"])
-        output = self.query(search_string)
+        output = self._order_by(
+            self._rows("donations"), "accepted_date", descending=True
+        )
         for entry in output:
             detail = {
                 "donor": {
-                    "name": entry["p.name"],
-                    "donor_type": entry["p.donor_type"],
-                    "company_reg": entry["p.company_reg"],
+                    "name": entry["name"],
+                    "donor_type": entry["donor_type"],
+                    "company_reg": entry["company_reg"],
                     "labels": entry["labels"],
                     "details_url": None,
                     "api_url": None
                 },
-                "amount": self._convert_to_currency(entry["x.amount"]),
-                "amount_int": entry["x.amount"],
-                "reported": entry["x.reported_date"],
-                "received": entry["x.received_date"],
-                "accepted": entry["x.accepted_date"],
-                "ec_reference": entry["x.ec_reference"],
-                "recd_by": entry["x.recd_by"],
-                "nature": entry["x.nature"],
-                "purpose": entry["x.purpose"],
-                "source_url": entry["x.source_url"],
-                "source_fetched": entry["x.source_fetched"],
-                "source_linked_from": entry["x.source_linked_from"],
+                "amount": self._convert_to_currency(entry["amount"]),
+                "amount_int": entry["amount"],
+                "reported": entry["reported_date"],
+                "received": entry["received_date"],
+                "accepted": entry["accepted_date"],
+                "ec_reference": entry["ec_reference"],
+                "recd_by": entry["recd_by"],
+                "nature": entry["nature"],
+                "purpose": entry["purpose"],
+                "source_url": entry["source_url"],
+                "source_fetched": entry["source_fetched"],
+                "source_linked_from": entry["source_linked_from"],
             }
             results.append(detail)
         return results
@@ -457,14 +572,18 @@ class MemberOfParliament(NamedEntity):
         labels = ["Named Entity", "Member of Parliament"]
         self.set_node_properties(properties, labels)
 
-    def set_membership(self):
-        query = u"""
-            MATCH (mp:`Member of Parliament` {{name: "{0}"}}) WITH mp
-            MATCH (mp)-[:ELECTED_FOR]-(t) with mp, t
-            RETURN mp.name, collect(t.left_reason) as left_reason
-        """.format(self.vertex["name"])
-        result = self.query(query)
-        left_reasons = self.query(query)[0]["left_reason"]
+    def set_membership(self, left_reasons=None):
+        if left_reasons is None:
+            query = u"""
+                MATCH (mp:`Member of Parliament` {name: {name}}) WITH mp
+                MATCH (mp)-[:ELECTED_FOR]-(t) with mp, t
+                RETURN mp.name, collect(t.left_reason) as left_reason
+            """
+            result = self.query(
+                query, "MemberOfParliament.set_membership",
+                name=self.vertex["name"]
+            )
+            left_reasons = result[0]["left_reason"]
         if not "still_in_office" in left_reasons:
             self.set_node_properties(labels="Former")
 
@@ -489,7 +608,7 @@ class MemberOfParliament(NamedEntity):
         )
 
     def link_party(self, name):
-        party = PoliticalParty(name)
+        party = PoliticalParty(name, get_properties=False)
         party.create()
         if name:
             image = config.mapped_party_images[name]
@@ -532,43 +651,152 @@ class Lords(BaseDataModel):
 
     def get_all(self):
         search_string = u"""
-            MATCH (lord:`Lord`) with lord
-            MATCH (lord)-[r]-() with lord,  r
+            MATCH (lord:`Lord`) WHERE lord.weight > 0
             RETURN lord.name, lord.party, lord.twfy_id, lord.image,
-                count(r) as weight, labels(lord) as labels
+                lord.weight as weight, labels(lord) as labels
             ORDER BY weight DESC
         """
-        search_result = self.query(search_string)
+        search_result = self.query(search_string, "Lords.get_all")
         return search_result
 
+    def stream_all(self, page_size=500):
+        search_string = u"""
+            MATCH (lord:`Lord`) WHERE id(lord) > {after}
+            WITH lord ORDER BY id(lord) LIMIT {size}
+            RETURN lord.name, lord.party, lord.twfy_id, lord.image,
+                coalesce(lord.weight, 0) as weight, labels(lord) as labels,
+                id(lord) as id
+            ORDER BY id
+        """
+        output = self._paged(search_string, "Lords.stream_all", page_size)
+        for entry in output:
+            if entry["weight"]:
+                yield entry
+
     def _get_lord_count(self):
         search_string = u"""
             MATCH (lord:`Lord`)
             RETURN count(lord)
         """
-        search_result = self.query(search_string)
+        search_result = self.query(search_string, "Lords._get_lord_count")
         return search_result[0][0]
 
 
 class Lord(NamedEntity):
-    def __init__(self, name=None):
+    label = "Lord"
+    primary_attribute = "name"
+    # lords are looked up as named entities
+    fetch_label = "Named Entity"
+    PROFILE = profile(
+        ProfileSection("departments", u"""
+            (n)-[:SERVED_IN]-(p)-[:OFFICE_IN]-(d:`Government Department`)
+                WHERE (p)-[:ATTENDED_BY]-()
+        """, [
+            ("node", "id(d)"), ("department", "d.name"), ("position", "p.name")
+        ]),
+        ProfileSection("meetings", u"""
+            (n)-[:SERVED_IN]-(p:`Government Office`)-[:ATTENDED_BY]-(m)
+                -[:ATTENDED_BY]-(a:`Meeting Attendee`)
+                WHERE m.host_name = n.name
+        """, [
+            ("node", "id(a)"), ("position", "p.name"), ("title", "m.title"),
+            ("attendee", "a.name"), ("meeting", "m.meeting"),
+            ("purpose", "m.purpose"), ("date", "m.date"),
+            ("source_url", "m.source_url"),
+            ("source_linked_from", "m.source_linked_from"),
+            ("source_fetched", "m.source_fetched")
+        ]),
+        ProfileSection("categories", u"""
+            (n)-[:INTERESTS_REGISTERED_IN]-(cat)
+        """, [
+            ("node", "id(cat)"), ("category", "cat.category")
+        ]),
+        ProfileSection("interests", u"""
+            (n)-[:INTERESTS_REGISTERED_IN]-(cat)-[:INTEREST_RELATIONSHIP]-(rel)
+                -[:REMUNERATION_RECEIVED]-(det),
+                (rel)-[:REGISTERED_CONTRIBUTOR]-(i)
+        """, [
+            ("node", "id(det)"), ("category", "cat.category"),
+            ("contributor", "det.contributor"), ("position", "det.position"),
+            ("source_url", "det.source_url"),
+            ("registered", "det.registered"), ("labels", "labels(i)")
+        ]),
+        ProfileSection("interest_relationships", u"""
+            (n)-[:INTERESTS_REGISTERED_IN]-(cat)-[:INTEREST_RELATIONSHIP]-(rel)
+        """, [
+            ("node", "id(rel)")
+        ]),
+        ProfileSection("donations", u"""
+            (n)-[:REGISTERED_CONTRIBUTOR]-(rel)-[:DONATION_RECEIVED]-(x),
+                (rel)-[:FUNDING_RELATIONSHIP]-(donr)
+        """, [
+            ("node", "id(x)"), ("name", "donr.name"),
+            ("donee_type", "donr.donee_type"),
+            ("recipient_type", "donr.recipient_type"),
+            ("labels", "labels(donr)"), ("amount", "x.amount"),
+            ("reported_date", "x.reported_date"),
+            ("received_date", "x.received_date"), ("nature", "x.nature"),
+            ("purpose", "x.purpose"), ("accepted_date", "x.accepted_date"),
+            ("ec_reference", "x.ec_reference"), ("recd_by", "x.recd_by"),
+            ("source_url", "x.source_url"),
+            ("source_linked_from", "x.source_linked_from")
+        ]),
+        ProfileSection("donation_amounts", u"""
+            (n)-[:REGISTERED_CONTRIBUTOR]-(rel)-[:DONATION_RECEIVED]-(x)
+        """, [
+            ("node", "id(x)"), ("amount", "x.amount")
+        ])
+    )
+
+    def __init__(self, name=None, get_properties=True, prefetch=None):
         NamedEntity.__init__(self)
-        self.label = "Lord"
-        self.primary_attribute = "name"
         self.name = name
+        self._fetch_properties = get_properties
         self.exists = self.fetch(
-            "Named Entity", self.primary_attribute, self.name
+            self.fetch_label, self.primary_attribute, self.name
         )
-        if self.exists:
-            self.departments, positions = self._get_government_departments()
-            self.positions = list(set(positions))
-            self.meetings = self._get_meetings()
-            self.meetings_summary = self._get_meetings_summary()
-            self.interest_categories = self._interest_categories()
-            self.interests = self._get_interests()
-            self.interests_summary = self._get_interests_summary()
-            self.donations = self._get_donations()
-            self.donations_summary = self._get_donations_summary()
+        if self.exists and self._fetch_properties and prefetch:
+            self.prefetch(prefetch)
+
+    @lazy("departments")
+    def _offices(self):
+        return self._get_government_departments()
+
+    @lazy("departments")
+    def departments(self):
+        return self._offices[0]
+
+    @lazy("departments")
+    def positions(self):
+        return list(set(self._offices[1]))
+
+    @lazy("meetings")
+    def meetings(self):
+        return self._get_meetings()
+
+    @lazy("meetings")
+    def meetings_summary(self):
+        return self._get_meetings_summary()
+
+    @lazy("categories")
+    def interest_categories(self):
+        return self._interest_categories()
+
+    @lazy("categories", "interests")
+    def interests(self):
+        return self._get_interests()
+
+    @lazy("categories", "interest_relationships")
+    def interests_summary(self):
+        return self._get_interests_summary()
+
+    @lazy("donations")
+    def donations(self):
+        return self._get_donations()
+
+    @lazy("donation_amounts")
+    def donations_summary(self):
+        return self._get_donations_summary()
 
     def set_lord_details(self, properties=None):
         properties = self._add_namedentity_properties(properties)
@@ -581,22 +809,18 @@ class Lord(NamedEntity):
         )
 
     def _get_government_departments(self):
-        departments, positions = [], []
-        search_string = u"""
-            MATCH (d:`Government Department`)
-            MATCH (p)-[:OFFICE_IN]-(d) with d, p
-            MATCH (p)-[:SERVED_IN]-(x:`Named Entity` {{name:"{0}"}}) with d, p, x
-            MATCH (p)-[:ATTENDED_BY]-(m) with d, p, m, x
-            RETURN DISTINCT d.name as department, p.name as position
-        """.format(self.vertex["name"])
-        output = self.query(search_string)
-        for entry in output:
-            departments.append(entry[0])
-            positions.append(entry[0])
+        departments, positions, seen = [], [], set()
+        for entry in self._rows("departments"):
+            pair = (entry["department"], entry["position"])
+            if pair in seen:
+                continue
+            seen.add(pair)
+            departments.append(entry["department"])
+            positions.append(entry["department"])
         return departments, positions
 
     def link_party(self, name):
-        party = PoliticalParty(name)
+        party = PoliticalParty(name, get_properties=False)
         if not party.exists:
             party.create()
         if name:
@@ -620,21 +844,17 @@ class Lord(NamedEntity):
     def _get_meetings_summary(self):
         results = []
         meetings = {"meetings_total": 0}
-        query = u"""
-            MATCH (lord:`Lord` {{name: "{0}"}}) WITH lord
-            MATCH (lord)-[:SERVED_IN]-(p:`Government Office`) with lord, p
-            MATCH (p)-[:ATTENDED_BY]-(m) with lord, p, m
-                 WHERE m.host_name = "{0}"
-            MATCH (m)-[:ATTENDED_BY]-(a:`Meeting Attendee`) with lord, p, m, a
-            RETURN p.name, count(a), collect(a.name)
-        """.format(self.vertex["name"])
-        output = self.query(query)
-        for entry in output:
+        positions = OrderedDict()
+        for entry in self._rows("meetings"):
+            positions.setdefault(entry["position"], []).append(
+                entry["attendee"]
+            )
+        for position, attendees in positions.items():
             results.append(
                 {
-                    "position": entry[0],
-                    "meetings_count": entry[1],
-                    "influencers_met": list(set(entry[2]))
+                    "position": position,
+                    "meetings_count": len(attendees),
+                    "influencers_met": list(set(attendees))
                 }
             )
         meetings["meetings_total"] = sum(m['meetings_count'] for m in results)
@@ -643,19 +863,7 @@ class Lord(NamedEntity):
 
     def _get_meetings(self):
         results = []
-        query = u"""
-            MATCH (lord:`Lord` {{name: "{0}"}}) WITH lord
-            MATCH (lord)-[:SERVED_IN]-(p:`Government Office`) with lord, p
-            MATCH (p)-[:ATTENDED_BY]-(m) with lord, p, m
-                WHERE m.host_name = "{0}"
-            MATCH (m)-[:ATTENDED_BY]-(a:`Meeting Attendee`) with lord, p, m, a
-            RETURN p.name as position, a.name as attendee, m.title as title,
-                m.meeting as meeting, m.purpose as purpose, m.date as date,
-                m.source_url, m.source_linked_from, m.source_fetched
-            ORDER BY date
-        """.format(self.vertex["name"])
-        output = self.query(query)
-        for entry in output:
+        for entry in self._order_by(self._rows("meetings"), "date"):
             title = entry["title"]
             if not title:
                 title = entry["meeting"].split(" - ")[0]
@@ -666,9 +874,9 @@ class Lord(NamedEntity):
                 "title": title,
                 "meeting": entry["meeting"],
                 "date": entry["date"],
-                "source_url": entry["m.source_url"],
-                "source_fetched": entry["m.source_fetched"],
-                "source_linked_from": entry["m.source_linked_from"],
+                "source_url": entry["source_url"],
+                "source_fetched": entry["source_fetched"],
+                "source_linked_from": entry["source_linked_from"],
             }
             results.append(meeting)
         return results
@@ -678,29 +886,20 @@ class Lord(NamedEntity):
         for category in self.interest_categories:
             interests = []
 
-            search_string = u"""
-                MATCH (lord:`Lord` {{name: "{0}"}}) WITH lord
-                MATCH (lord)-[:INTERESTS_REGISTERED_IN]-(cat) with cat
-                    WHERE cat.category = "{1}"
-                MATCH (cat)-[:INTEREST_RELATIONSHIP]-(rel) with cat, rel
-                MATCH (rel)-[:REMUNERATION_RECEIVED]-(det) with cat, rel, det
-                MATCH (rel)-[:REGISTERED_CONTRIBUTOR]-(int) with cat, rel, int, det
-                RETURN cat.category, det.contributor, det.position, det.source_url,
-                    det.registered, labels(int) as labels
-            """.format(self.vertex["name"], category)
-            output = self.query(search_string)
-            for entry in output:
+            for entry in self._rows("interests"):
+                if entry["category"] != category:
+                    continue
                 detail = {
-                    "category": entry["cat.category"],
+                    "category": entry["category"],
                     "interest": {
-                        "name": entry["det.contributor"],
+                        "name": entry["contributor"],
                         "labels": entry["labels"],
                         "details_url": None,
                         "api_url": None
                     },
-                    "position": entry["det.position"],
-                    "source_url": entry["det.source_url"],
-                    "registered": entry["det.registered"],
+                    "position": entry["position"],
+                    "source_url": entry["source_url"],
+                    "registered": entry["registered"],
                 }
 
                 interests.append(detail)
@@ -719,20 +918,14 @@ class Lord(NamedEntity):
     def _interest_categories(self):
         results = []
 
-        query = u"""
-            MATCH (lord:`Lord` {{name: "{0}"}}) WITH lord
-            MATCH (lord)-[:INTERESTS_REGISTERED_IN]-(cat) with cat
-            RETURN DISTINCT cat.category
-        """.format(self.vertex["name"])
-        output = self.query(query)
-
         excluded_categories = [
             u"Land and Property",
             u"Land and property",
         ]
 
-        for entry in output:
-            results.append(entry[0])
+        for entry in self._rows("categories"):
+            if entry["category"] not in results:
+                results.append(entry["category"])
 
         for category in excluded_categories:
             if category in results:
@@ -742,50 +935,35 @@ class Lord(NamedEntity):
         return results
 
     def _interest_relationships(self):
-        query = u"""
-            MATCH (lord:`Lord` {{name: "{0}"}}) WITH lord
-            MATCH (lord)-[:INTERESTS_REGISTERED_IN]-(cat) with lord, cat
-            MATCH (cat)-[:INTEREST_RELATIONSHIP]-(rel) with lord, cat, rel
-            RETURN count(rel) as relationship_count
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["relationship_count"]
+        return len(self._rows("interest_relationships"))
 
     def _get_donations(self):
         results = []
-        search_string = u"""
-            MATCH (lord:`Lord` {{name: "{0}"}}) WITH lord
-            MATCH (lord)-[:REGISTERED_CONTRIBUTOR]-(rel) with rel
-            MATCH (rel)-[:DONATION_RECEIVED]-(x) with rel, x
-            MATCH (rel)-[:FUNDING_RELATIONSHIP]-(donr) with rel, x, donr
-            RETURN donr.name, donr.donee_type, donr.recipient_type,
-                x.amount, x.reported_date,x.received_date, x.nature,
-                x.purpose,x.accepted_date, x.ec_reference, x.recd_by,
-                labels(donr) as labels, x.source_url, x.source_linked_from
-            ORDER by x.reported_date DESC
-        """.format(self.vertex["name"])
-        output = self.query(search_string)
+        output = self._order_by(
+            self._rows("donations"), "reported_date", descending=True
+        )
 
         for entry in output:
             detail = {
                 "recipient": {
-                    "name": entry["donr.name"],
+                    "name": entry["name"],
                     "labels": entry["labels"],
-                    "recipient_type": entry["donr.recipient_type"],
+                    "recipient_type": entry["recipient_type"],
                     "details_url": None,
                     "api_url": None
                 },
-                "amount_int": entry["x.amount"],
-                "amount": self._convert_to_currency(entry["x.amount"]),
-                "donee_type": entry["donr.donee_type"],
-                "reported": entry["x.reported_date"],
-                "received": entry["x.received_date"],
-                "accepted": entry["x.accepted_date"],
-                "ec_reference": entry["x.ec_reference"],
-                "recd_by": entry["x.recd_by"],
-                "nature": entry["x.nature"],
-                "purpose": entry["x.purpose"],
-                "source_url": entry["x.source_url"],
-                "source_linked_from": entry["x.source_linked_from"],
+                "amount_int": entry["amount"],
+                "amount": self._convert_to_currency(entry["amount"]),
+                "donee_type": entry["donee_type"],
+                "reported": entry["reported_date"],
+                "received": entry["received_date"],
+                "accepted": entry["accepted_date"],
+                "ec_reference": entry["ec_reference"],
+                "recd_by": entry["recd_by"],
+                "nature": entry["nature"],
+                "purpose": entry["purpose"],
+                "source_url": entry["source_url"],
+                "source_linked_from": entry["source_linked_from"],
             }
             results.append(detail)
         return results
@@ -800,22 +978,10 @@ class Lord(NamedEntity):
         return ec
 
     def _donation_count(self):
-        query = u"""
-            MATCH (lord:`Lord` {{name: "{0}"}})
-            MATCH (lord)-[:REGISTERED_CONTRIBUTOR]-(rel)
-            MATCH (rel)-[:DONATION_RECEIVED]-(x)
-            RETURN count(x) as donation_count
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["donation_count"]
+        return len(self._rows("donation_amounts"))
 
     def _donation_total(self):
-        query = u"""
-            MATCH (lord:`Lord` {{name: "{0}"}}) WITH lord
-            MATCH (lord)-[:REGISTERED_CONTRIBUTOR]-(rel) with lord, rel
-            MATCH (rel)-[:DONATION_RECEIVED]-(x)
-            RETURN sum(x.amount) as total
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["total"]
+        return self._sum(self._rows("donation_amounts"), "amount")
 
 
 class PoliticalParties(BaseDataModel):
@@ -830,7 +996,7 @@ class PoliticalParties(BaseDataModel):
             RETURN d.name, d.image_url, count(x) as weight, labels(d) as labels
             ORDER BY weight DESC
         """
-        search_result = self.query(search_string)
+        search_result = self.query(search_string, "PoliticalParties.get_all")
         return search_result
 
     def _get_count(self):
@@ -838,20 +1004,24 @@ class PoliticalParties(BaseDataModel):
             MATCH (d:`Political Party`)
             RETURN count(d)
         """
-        search_result = self.query(search_string)
+        search_result = self.query(
+            search_string, "PoliticalParties._get_count"
+        )
         return search_result[0][0]
 
 
 class PoliticalParty(NamedEntity):
-    def __init__(self, name):
+    label = "Political Party"
+    primary_attribute = "name"
+
+    def __init__(self, name, get_properties=True):
         NamedEntity.__init__(self)
-        self.primary_attribute = "name"
-        self.label = "Political Party"
         self.name = name
+        self._fetch_properties = get_properties
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.name
         )
-        if self.exists:
+        if self.exists and self._fetch_properties:
             self.donations = self._get_donations()
             self.donations_summary = self._get_donations_summary()
             self.mp_count = self._mp_count()
@@ -864,24 +1034,28 @@ class PoliticalParty(NamedEntity):
 
     def _mp_count(self):
         query = u"""
-            MATCH (p:`Political Party` {{name: "{0}"}})
+            MATCH (p:`Political Party` {name: {name}})
             MATCH (mp:`Member of Parliament`)-[:MEMBER_OF]-(p)
             RETURN count(mp) as mp_count
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["mp_count"]
+        """
+        return self.query(
+            query, "PoliticalParty._mp_count", name=self.vertex["name"]
+        )[0]["mp_count"]
 
     def _lord_count(self):
         query = u"""
-            MATCH (p:`Political Party` {{name: "{0}"}})
+            MATCH (p:`Political Party` {name: {name}})
             MATCH (l:`Lord`)-[:MEMBER_OF]-(p)
             RETURN count(l) as lord_count
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["lord_count"]
+        """
+        return self.query(
+            query, "PoliticalParty._lord_count", name=self.vertex["name"]
+        )[0]["lord_count"]
 
     def _get_donations(self):
         results = []
         search_string = u"""
-            MATCH (p:`Political Party` {{name: "{0}"}})
+            MATCH (p:`Political Party` {name: {name}})
             MATCH (p)-[:FUNDING_RELATIONSHIP]-(rel) with p, rel
             MATCH (rel)-[:DONATION_RECEIVED]-(x) with p, rel, x
             MATCH (rel)-[:REGISTERED_CONTRIBUTOR]-(d) with p, rel, d, x
@@ -889,8 +1063,11 @@ class PoliticalParty(NamedEntity):
                 x.reported_date, x.received_date, x.accepted_date, x.recd_by, x.ec_reference,
                 x.nature, x.purpose
             ORDER BY x.accepted_date DESC
-        """.format(self.vertex["name"])
-        output = self.query(search_string)
+        """
+        output = self.query(
+            search_string, "PoliticalParty._get_donations",
+            name=self.vertex["name"]
+        )
         for entry in output:
             detail = {
                 "donor": {
@@ -923,13 +1100,15 @@ class PoliticalParty(NamedEntity):
 
     def _donations(self):
         query = u"""
-            MATCH (p:`Political Party` {{name: "{0}"}})
+            MATCH (p:`Political Party` {name: {name}})
             MATCH (p)-[:FUNDING_RELATIONSHIP]-(x)
             MATCH (x)-[:DONATION_RECEIVED]-(f)
             RETURN p.name as Party, sum(f.amount) as total, count(f.amount) as count
             ORDER BY total DESC
-        """.format(self.vertex["name"])
-        output = self.query(query)
+        """
+        output = self.query(
+            query, "PoliticalParty._donations", name=self.vertex["name"]
+        )
         if output:
             return output[0]["total"], output[0]["count"]
         else:
@@ -957,7 +1136,9 @@ class GovernmentOffices(BaseDataModel):
             RETURN n.name, labels(n), count(p)
             ORDER BY count(p) DESC
         """
-        search_result = self.query(search_string)
+        search_result = self.query(
+            search_string, "GovernmentOffices._get_committees"
+        )
         return search_result
 
     def _get_departments(self):
@@ -968,7 +1149,9 @@ class GovernmentOffices(BaseDataModel):
             RETURN DISTINCT d.name as name, labels(d), count(x.name) as count
             ORDER BY count DESC
         """
-        search_result = self.query(search_string)
+        search_result = self.query(
+            search_string, "GovernmentOffices._get_departments"
+        )
         return search_result
 
     def _get_count(self):
@@ -976,21 +1159,25 @@ class GovernmentOffices(BaseDataModel):
             MATCH (p) where p:Lord OR p:`Member of Parliament` with p
             RETURN count(p)
         """
-        search_result = self.query(search_string)
+        search_result = self.query(
+            search_string, "GovernmentOffices._get_count"
+        )
         return search_result[0][0]
 
 
 class GovernmentOffice(NamedEntity):
-    def __init__(self, name=None):
+    label = "Government Office"
+    primary_attribute = "name"
+
+    def __init__(self, name=None, get_properties=True):
         NamedEntity.__init__(self)
         self.exists = False
-        self.label = "Government Office"
-        self.primary_attribute = "name"
         self.name = name
+        self._fetch_properties = get_properties
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.name
         )
-        if self.exists:
+        if self.exists and self._fetch_properties:
             self.mp_count = self._mp_count()
             self.labels = self._get_labels()
             self.office_type = self._get_office_type(self.labels)
@@ -1021,20 +1208,24 @@ class GovernmentOffice(NamedEntity):
 
     def _mp_count(self):
         query = u"""
-            MATCH (n:`Government Office` {{name: "{0}"}}) with n
+            MATCH (n:`Government Office` {name: {name}}) with n
             MATCH (n)-[:SERVED_IN]-(x) with n, x
                 WHERE x.left_reason = "still_in_office"
             MATCH (x)-[:ELECTED_FOR]-(p) with n, x, p
             RETURN count(p) as mp_count
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["mp_count"]
+        """
+        return self.query(
+            query, "GovernmentOffice._mp_count", name=self.vertex["name"]
+        )[0]["mp_count"]
 
     def _get_labels(self):
         query = u"""
-            MATCH (n:`Government Office` {{name: "{0}"}})
+            MATCH (n:`Government Office` {name: {name}})
             RETURN labels(n) as labels
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["labels"]
+        """
+        return self.query(
+            query, "GovernmentOffice._get_labels", name=self.vertex["name"]
+        )[0]["labels"]
 
     def _get_members(self):
         if self.office_type == "committee":
@@ -1046,39 +1237,48 @@ class GovernmentOffice(NamedEntity):
 
     def _get_department_members(self):
         search_string = u"""
-            MATCH (d:`Government Office` {{name: "{0}"}})
+            MATCH (d:`Government Office` {name: {name}})
             MATCH (p)-[:OFFICE_IN]-(d) with d, p
             MATCH (p)-[:SERVED_IN]-(x:`Member of Parliament`) with d, p, x
             MATCH (p)-[:ATTENDED_BY]-(m) with d, p, m, x
             RETURN DISTINCT x.name as name
-        """.format(self.vertex["name"])
-        result = self.query(search_string)
+        """
+        result = self.query(
+            search_string, "GovernmentOffice._get_department_members",
+            name=self.vertex["name"]
+        )
         return [r["name"] for r in result]
 
     def _get_committee_members(self):
         search_string = u"""
-            MATCH (n:`Government Office` {{name: "{0}"}}) with n
+            MATCH (n:`Government Office` {name: {name}}) with n
             MATCH (n)-[:SERVED_IN]-(t) with n, t
                 WHERE t.left_reason = "still_in_office"
                     OR t.left_reason = "general_election"
             MATCH (t)-[:ELECTED_FOR]-(p) with n, t, p
             RETURN p.name as name
-        """.format(self.vertex["name"])
-        result = self.query(search_string)
+        """
+        result = self.query(
+            search_string, "GovernmentOffice._get_committee_members",
+            name=self.vertex["name"]
+        )
         return [r["name"] for r in result]
 
     def _get_meetings_summary(self):
         results = []
         query = u"""
-            MATCH (d:`Government Office` {{name: "{0}"}})
+            MATCH (d:`Government Office` {name: {name}})
             MATCH (p)-[:OFFICE_IN]-(d) with d, p
             MATCH (p)-[:SERVED_IN]-(x:`Member of Parliament`) with d, p, x
             MATCH (p)-[:ATTENDED_BY]-(m) with d, p, m, x
                 WHERE x.name = m.host_name
             RETURN DISTINCT  p.name as position, x.name as host, count(m) as meetings
             ORDER BY count(m) DESC
-        """.format(self.vertex["name"])
-        output = self.query(query)
+        """
+        output = self.query(
+            query, "GovernmentOffice._get_meetings_summary",
+            name=self.vertex["name"]
+        )
         for entry in output:
             department_summary = {
                 "position": entry["position"],
@@ -1128,11 +1328,12 @@ class GovernmentOffice(NamedEntity):
 
 
 class GovernmentMeeting(BaseDataModel):
+    label = "Government Meeting"
+    primary_attribute = "meeting"
+
     def __init__(self, term=None):
         BaseDataModel.__init__(self)
         self.exists = False
-        self.label = "Government Meeting"
-        self.primary_attribute = "meeting"
         self.term = term
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.term
@@ -1155,11 +1356,12 @@ class GovernmentMeeting(BaseDataModel):
 
 
 class TermInParliament(BaseDataModel):
+    label = "Elected Term"
+    primary_attribute = "term"
+
     def __init__(self, term=None):
         BaseDataModel.__init__(self)
         self.exists = False
-        self.label = "Elected Term"
-        self.primary_attribute = "term"
         self.term = term
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.term
@@ -1186,11 +1388,12 @@ class TermInParliament(BaseDataModel):
 
 
 class Constituency(BaseDataModel):
+    label = "Constituency"
+    primary_attribute = "name"
+
     def __init__(self, name=None):
         BaseDataModel.__init__(self)
         self.exists = False
-        self.label = "Constituency"
-        self.primary_attribute = "name"
         self.name = name
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.name
@@ -1204,14 +1407,16 @@ class Constituency(BaseDataModel):
 
 
 class DonationRecipient(NamedEntity):
+    label = "Donation Recipient"
+    primary_attribute = "name"
+    fetch_label = "Named Entity"
+
     def __init__(self, name=None):
         NamedEntity.__init__(self)
         self.exists = False
-        self.label = "Donation Recipient"
-        self.primary_attribute = "name"
         self.name = name
         self.exists = self.fetch(
-            "Named Entity", self.primary_attribute, self.name
+            self.fetch_label, self.primary_attribute, self.name
         )
 
     def set_recipient_details(self, properties=None):
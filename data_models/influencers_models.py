@@ -1,119 +1,148 @@
 
 from datetime import datetime
 from data_models.core import NamedEntity, BaseDataModel
+from data_models.core import ProfileSection, profile, lazy
+from data_models.core import summarise_meetings, degree
+
+# relationship types an influencer's weight is counted over
+INFLUENCES = [
+    "REGISTERED_CONTRIBUTOR", "FUNDING_RELATIONSHIP", "HIRED", "ATTENDED_BY"
+]
 
 
 class Influencer(BaseDataModel):
-    def __init__(self, name):
+    label = "Named Entity"
+    primary_attribute = "name"
+    PROFILE = profile(
+        ProfileSection("lobbyists", u"""
+            (n)-[:HIRED]-(rel)-[:REGISTERED_LOBBYIST]-(lob)
+        """, [
+            ("node", "id(lob)"), ("name", "lob.name"),
+            ("from_date", "rel.from_date"), ("to_date", "rel.to_date"),
+            ("contact_details", "lob.contact_details")
+        ]),
+        ProfileSection("meetings", [u"""
+            (m)-[:ATTENDED_BY]-(n), (m)-[:ATTENDED_BY]-(g:`Government Office`)
+        """, u"""
+            (mp)-[:SERVED_IN]-(g)
+        """], [
+            ("node", "id(g)"), ("meeting_id", "id(m)"), ("position", "g.name"),
+            ("host", "mp.name"), ("party", "mp.party"),
+            ("department", "m.department"), ("meeting", "m.meeting"),
+            ("title", "m.title"), ("purpose", "m.purpose"), ("date", "m.date"),
+            ("source_url", "m.source_url"),
+            ("source_linked_from", "m.source_linked_from"),
+            ("source_fetched", "m.source_fetched")
+        ]),
+        ProfileSection("interests", u"""
+            (n)-[:REGISTERED_CONTRIBUTOR]-(rel), (cat)-[:INTEREST_RELATIONSHIP]-(rel),
+                (p)-[:INTERESTS_REGISTERED_IN]-(cat),
+                (rel)-[:REMUNERATION_RECEIVED]-(x)
+                WHERE x.contributor = n.name
+        """, [
+            ("node", "id(x)"), ("name", "p.name"), ("party", "p.party"),
+            ("labels", "labels(p)"), ("category", "cat.category"),
+            ("amount", "x.amount"), ("source_url", "x.source_url"),
+            ("registered", "x.registered")
+        ]),
+        ProfileSection("interest_relationships", u"""
+            (n)-[:REGISTERED_CONTRIBUTOR]-(rel), (cat)-[:INTEREST_RELATIONSHIP]-(rel)
+        """, [
+            ("node", "id(rel)")
+        ]),
+        ProfileSection("remunerations", u"""
+            (n)-[:REGISTERED_CONTRIBUTOR]-(rel), (cat)-[:INTEREST_RELATIONSHIP]-(rel),
+                (rel)-[:REMUNERATION_RECEIVED]-(x)
+        """, [
+            ("node", "id(x)"), ("amount", "x.amount")
+        ]),
+        ProfileSection("donations", u"""
+            (n)-[:REGISTERED_CONTRIBUTOR]-(rel)-[:DONATION_RECEIVED]-(x),
+                (rel)-[:FUNDING_RELATIONSHIP]-(donr)
+        """, [
+            ("node", "id(x)"), ("name", "donr.name"),
+            ("donee_type", "donr.donee_type"),
+            ("recipient_type", "donr.recipient_type"),
+            ("labels", "labels(donr)"), ("amount", "x.amount"),
+            ("reported_date", "x.reported_date"),
+            ("received_date", "x.received_date"), ("nature", "x.nature"),
+            ("purpose", "x.purpose"), ("accepted_date", "x.accepted_date"),
+            ("ec_reference", "x.ec_reference"), ("recd_by", "x.recd_by")
+        ]),
+        ProfileSection("donation_amounts", u"""
+            (n)-[:REGISTERED_CONTRIBUTOR]-(rel)-[:DONATION_RECEIVED]-(x)
+        """, [
+            ("node", "id(x)"), ("amount", "x.amount")
+        ])
+    )
+
+    def __init__(self, name, prefetch=None):
         BaseDataModel.__init__(self)
-        self.primary_attribute = "name"
-        self.label = "Named Entity"
         self.name = name
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.name
         )
-        if self.exists:
-            self.interests = self._get_interests()
-            self.donations = self._get_donations()
-            self.lobbyists = self._get_lobbyists()
-            self.meetings = self._get_meetings()
-            self.meetings_summary = self._get_meetings_summary()
-            self.interests_summary = self._get_interests_summary()
-            self.donations_summary = self._get_donations_summary()
-            self.lobbyists_summary = self._get_lobbyists_summary()
+        if self.exists and prefetch:
+            self.prefetch(prefetch)
+
+    @lazy("interests")
+    def interests(self):
+        return self._get_interests()
+
+    @lazy("donations")
+    def donations(self):
+        return self._get_donations()
+
+    @lazy("lobbyists")
+    def lobbyists(self):
+        return self._get_lobbyists()
+
+    @lazy("meetings")
+    def meetings(self):
+        return self._get_meetings()
+
+    @lazy("meetings")
+    def meetings_summary(self):
+        return self._get_meetings_summary()
+
+    @lazy("interest_relationships", "remunerations")
+    def interests_summary(self):
+        return self._get_interests_summary()
+
+    @lazy("donation_amounts")
+    def donations_summary(self):
+        return self._get_donations_summary()
+
+    @lazy("lobbyists")
+    def lobbyists_summary(self):
+        return self._get_lobbyists_summary()
 
     def _get_lobbyists(self):
         results = []
-        search_string = u"""
-            MATCH (n:`Named Entity` {{name: "{0}"}}) WITH n
-            MATCH (n)-[:HIRED]-(rel) with n, rel
-            MATCH (rel)-[:REGISTERED_LOBBYIST]-(lob) with n, rel, lob
-            RETURN lob.name, rel.from_date, rel.to_date,
-                lob.contact_details, lob.address
-        """.format(self.name)
-        output = self.query(search_string)
-        for entry in output:
+        for entry in self._rows("lobbyists"):
             detail = {
-                "name": entry["lob.name"],
-                "from": entry["rel.from_date"],
-                "to": entry["rel.to_date"],
-                "contact_details": entry["lob.contact_details"],
+                "name": entry["name"],
+                "from": entry["from_date"],
+                "to": entry["to_date"],
+                "contact_details": entry["contact_details"],
             }
             results.append(detail)
         return results
 
     def _get_lobbyists_summary(self):
-        search_string = u"""
-            MATCH (n:`Named Entity` {{name: "{0}"}}) WITH n
-            MATCH (n)-[:HIRED]-(rel) with n, rel
-            MATCH (rel)-[:REGISTERED_LOBBYIST]-(lob) with n, rel, lob
-            RETURN count(lob) as total
-        """.format(self.name)
-        count = self.query(search_string)[0]["total"]
+        count = len(self._rows("lobbyists"))
         return {"lobbyist_hired": count}
 
     def _get_meetings_summary(self):
-        return {
-            "meetings_count": self._meetings_total_count(),
-            "politician_count": len(set(self._politicians_met())),
-            "department_count": len(set(self._departments_met())),
-            "politicians_met": self._politicians_met(),
-            "departments_met": self._departments_met()
-        }
-
-    def _meetings_total_count(self):
-        query = u"""
-            MATCH (a:`Named Entity` {{name: "{0}"}})
-            MATCH (m)-[:ATTENDED_BY]-(a) with m, a
-            MATCH (m)-[:ATTENDED_BY]-(g:`Government Office`) with a, m, g
-            OPTIONAL MATCH (mp)-[:SERVED_IN]-(g) with a, m, g, mp
-            RETURN count(m) as total
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["total"]
-
-    def _politicians_met(self):
-        results = []
-        query = u"""
-            MATCH (a:`Named Entity` {{name: "{0}"}})
-            MATCH (m)-[:ATTENDED_BY]-(a) with m, a
-            MATCH (m)-[:ATTENDED_BY]-(g:`Government Office`) with a, m, g
-            OPTIONAL MATCH (mp)-[:SERVED_IN]-(g) with a, m, g, mp
-            RETURN DISTINCT  mp.name as host
-        """.format(self.vertex["name"])
-        output = self.query(query)
-        for entry in output:
-            if entry[0]:
-                results.append(entry[0])
-        return results
-
-    def _departments_met(self):
-        results = []
-        query = u"""
-            MATCH (a:`Named Entity` {{name: "{0}"}})
-            MATCH (m)-[:ATTENDED_BY]-(a) with m, a
-            MATCH (m)-[:ATTENDED_BY]-(g:`Government Office`) with a, m, g
-            OPTIONAL MATCH (mp)-[:SERVED_IN]-(g) with a, m, g, mp
-            RETURN DISTINCT  m.department
-        """.format(self.vertex["name"])
-        output = self.query(query)
-        for entry in output:
-            if entry[0]:
-                results.append(entry[0])
-        return results
+        return summarise_meetings(self._rows("meetings"))
 
     def _get_meetings(self):
         results = []
-        query = u"""
-            MATCH (a:`Meeting Attendee` {{name: "{0}"}})
-            MATCH (m)-[:ATTENDED_BY]-(a) with m, a
-            MATCH (m)-[:ATTENDED_BY]-(g:`Government Office`) with a, m, g
-            MATCH (mp)-[:SERVED_IN]-(g) with a, m, g, mp
-            RETURN g.name as position, mp.name as host, mp.party as party,
-                m.meeting as meeting, m.title as title, m.purpose as purpose,
-                m.date as date, m.source_url, m.source_linked_from, m.source_fetched
-        """.format(self.vertex["name"])
-        output = self.query(query)
-        for entry in output:
+        if "Meeting Attendee" not in self.vertex.labels:
+            return results
+        for entry in self._rows("meetings"):
+            if entry["host"] is None:
+                continue
             title = entry["title"]
             if not title:
                 title = entry["meeting"].split(" - ")[0]
@@ -125,41 +154,32 @@ class Influencer(BaseDataModel):
                 "purpose": entry["purpose"],
                 "meeting": entry["meeting"],
                 "date": entry["date"],
-                "source_url": entry["m.source_url"],
-                "source_fetched": entry["m.source_fetched"],
-                "source_linked_from": entry["m.source_linked_from"],
+                "source_url": entry["source_url"],
+                "source_fetched": entry["source_fetched"],
+                "source_linked_from": entry["source_linked_from"],
             }
             results.append(meeting)
         return results
 
     def _get_interests(self):
         results = []
-        search_string = u"""
-            MATCH (n:`Named Entity` {{name: "{0}"}}) WITH n
-            MATCH (n)-[:REGISTERED_CONTRIBUTOR]-(rel)
-            MATCH (cat)-[:INTEREST_RELATIONSHIP]-(rel)
-            MATCH (p)-[:INTERESTS_REGISTERED_IN]-(cat)
-            MATCH (rel)-[:REMUNERATION_RECEIVED]-(x)
-                WHERE x.contributor = "{0}"
-            RETURN p.name, p.party, cat.category, x.amount, x.source_url, x.registered,
-            labels(p) as labels
-            ORDER by x.registered DESC
-        """.format(self.name)
-        output = self.query(search_string)
+        output = self._order_by(
+            self._rows("interests"), "registered", descending=True
+        )
         for entry in output:
             detail = {
                 "interest": {
-                    "name": entry["p.name"],
-                    "party": entry["p.party"],
+                    "name": entry["name"],
+                    "party": entry["party"],
                     "labels": entry["labels"],
                     "details_url": None,
                     "api_url": None
                 },
-                "category": entry["cat.category"],
-                "amount": self._convert_to_currency(entry["x.amount"]),
-                "amount_int": entry["x.amount"],
-                "source_url": entry["x.source_url"],
-                "registered": entry["x.registered"],
+                "category": entry["category"],
+                "amount": self._convert_to_currency(entry["amount"]),
+                "amount_int": entry["amount"],
+                "source_url": entry["source_url"],
+                "registered": entry["registered"],
             }
             results.append(detail)
         return results
@@ -175,66 +195,38 @@ class Influencer(BaseDataModel):
         return register
 
     def _interest_relationships(self):
-        query = u"""
-            MATCH (inf:`Named Entity` {{name: "{0}"}})
-            MATCH (inf)-[:REGISTERED_CONTRIBUTOR]-(rel)
-            MATCH (cat)-[:INTEREST_RELATIONSHIP]-(rel)
-            RETURN count(rel) as count
-        """.format(self.name)
-        return self.query(query)[0]["count"]
+        return len(self._rows("interest_relationships"))
 
     def _remuneration_total(self):
-        query = u"""
-            MATCH (inf:`Named Entity` {{name: "{0}"}})
-            MATCH (inf)-[:REGISTERED_CONTRIBUTOR]-(rel)
-            MATCH (cat)-[:INTEREST_RELATIONSHIP]-(rel)
-            MATCH (rel)-[:REMUNERATION_RECEIVED]-(x)
-            RETURN sum(x.amount) as total
-        """.format(self.name)
-        return self.query(query)[0]["total"]
+        return self._sum(self._rows("remunerations"), "amount")
 
     def _remuneration_count(self):
-        query = u"""
-            MATCH (inf:`Named Entity` {{name: "{0}"}})
-            MATCH (inf)-[:REGISTERED_CONTRIBUTOR]-(rel)
-            MATCH (cat)-[:INTEREST_RELATIONSHIP]-(rel)
-            MATCH (rel)-[:REMUNERATION_RECEIVED]-(x)
-            RETURN count(x) as count
-        """.format(self.name)
-        return self.query(query)[0]["count"]
+        return len(self._rows("remunerations"))
 
     def _get_donations(self):
         results = []
-        search_string = u"""
-            MATCH (n:`Named Entity` {{name: "{0}"}}) WITH n
-            MATCH (n)-[:REGISTERED_CONTRIBUTOR]-(rel) with rel
-            MATCH (rel)-[:DONATION_RECEIVED]-(x) with rel, x
-            MATCH (rel)-[:FUNDING_RELATIONSHIP]-(donr) with rel, x, donr
-            RETURN donr.name, donr.donee_type, donr.recipient_type,
-            x.amount, x.reported_date,x.received_date, x.nature,
-            x.purpose, x.accepted_date, x.ec_reference, x.recd_by, labels(donr) as labels
-            ORDER by x.reported_date DESC
-        """.format(self.name)
-        output = self.query(search_string)
+        output = self._order_by(
+            self._rows("donations"), "reported_date", descending=True
+        )
         for entry in output:
             detail = {
                 "recipient": {
-                    "name": entry["donr.name"],
+                    "name": entry["name"],
                     "labels": entry["labels"],
-                    "recipient_type": entry["donr.recipient_type"],
+                    "recipient_type": entry["recipient_type"],
                     "details_url": None,
                     "api_url": None
                 },
-                "amount": self._convert_to_currency(entry["x.amount"]),
-                "amount_int": entry["x.amount"],
-                "donee_type": entry["donr.donee_type"],
-                "reported": entry["x.reported_date"],
-                "received": entry["x.received_date"],
-                "accepted": entry["x.accepted_date"],
-                "ec_reference": entry["x.ec_reference"],
-                "recd_by": entry["x.recd_by"],
-                "nature": entry["x.nature"],
-                "purpose": entry["x.purpose"]
+                "amount": self._convert_to_currency(entry["amount"]),
+                "amount_int": entry["amount"],
+                "donee_type": entry["donee_type"],
+                "reported": entry["reported_date"],
+                "received": entry["received_date"],
+                "accepted": entry["accepted_date"],
+                "ec_reference": entry["ec_reference"],
+                "recd_by": entry["recd_by"],
+                "nature": entry["nature"],
+                "purpose": entry["purpose"]
             }
             results.append(detail)
         return results
@@ -249,22 +241,10 @@ class Influencer(BaseDataModel):
         return ec
 
     def _donation_total(self):
-        query = u"""
-            MATCH (inf:`Named Entity` {{name: "{0}"}})
-            MATCH (inf)-[:REGISTERED_CONTRIBUTOR]-(rel)
-            MATCH (rel)-[:DONATION_RECEIVED]-(x)
-            RETURN sum(x.amount) as total
-        """.format(self.name)
-        return self.query(query)[0]["total"]
+        return self._sum(self._rows("donation_amounts"), "amount")
 
     def _donation_count(self):
-        query = u"""
-            MATCH (inf:`Named Entity` {{name: "{0}"}})
-            MATCH (inf)-[:REGISTERED_CONTRIBUTOR]-(rel)
-            MATCH (rel)-[:DONATION_RECEIVED]-(x)
-            RETURN count(x) as count
-        """.format(self.name)
-        return self.query(query)[0]["count"]
+        return len(self._rows("donation_amounts"))
 
 
 class Influencers(BaseDataModel):
@@ -276,13 +256,28 @@ class Influencers(BaseDataModel):
         search_string = u"""
             MATCH (inf) WHERE inf:Donor OR inf:`Registered Interest` OR inf:`Meeting Attendee`
                 OR inf:`LobbyAgency Client` OR inf:`Lobby Agency Client` with inf
-            MATCH (inf)<-[y:REGISTERED_CONTRIBUTOR|FUNDING_RELATIONSHIP|HIRED|ATTENDED_BY]-(x)
-            RETURN DISTINCT inf.name as influencer, inf.donor_type, labels(inf), count(y) as weight
+            WITH inf, {0} as weight WHERE weight > 0
+            RETURN inf.name as influencer, inf.donor_type, labels(inf), weight
             ORDER BY weight DESC
-        """
-        search_result = self.query(search_string)
+        """.format(degree("inf", *INFLUENCES))
+        search_result = self.query(search_string, "Influencers.get_all")
         return search_result
 
+    def stream_all(self, page_size=500):
+        search_string = u"""
+            MATCH (inf) WHERE (inf:Donor OR inf:`Registered Interest`
+                OR inf:`Meeting Attendee` OR inf:`LobbyAgency Client`
+                OR inf:`Lobby Agency Client`) AND id(inf) > {{after}}
+            WITH inf ORDER BY id(inf) LIMIT {{size}}
+            RETURN inf.name as influencer, inf.donor_type, labels(inf),
+                {0} as weight, id(inf) as id
+            ORDER BY id
+        """.format(degree("inf", *INFLUENCES))
+        output = self._paged(search_string, "Influencers.stream_all", page_size)
+        for entry in output:
+            if entry["weight"]:
+                yield entry
+
     def get_top(self, count):
         pass
 
@@ -292,29 +287,89 @@ class Influencers(BaseDataModel):
                 OR inf:`LobbyAgency Client` OR inf:`Lobby Agency Client` with inf
             RETURN count(inf)
         """
-        search_result = self.query(search_string)
+        search_result = self.query(search_string, "Influencers._get_count")
         return search_result[0][0]
 
 
 class LobbyAgency(NamedEntity):
-    def __init__(self, name=None):
+    label = "Lobby Agency"
+    primary_attribute = "name"
+    fetch_label = "Named Entity"
+    PROFILE = profile(
+        ProfileSection("clients", u"""
+            (n)-[:REGISTERED_LOBBYIST]-(r)-[:HIRED]-(c)
+                WHERE n:`Lobby Agency`
+        """, [
+            ("node", "id(c)"), ("registration", "id(r)"), ("name", "c.name"),
+            ("labels", "labels(c)"), ("weight", "length((c)--())"),
+            ("to_date", "r.to_date"), ("from_date", "r.from_date")
+        ]),
+        ProfileSection("employees", u"""
+            (n)-[:REGISTERED_LOBBYIST]-(r)-[:WORKS_FOR]-(e)
+                WHERE n:`Lobby Agency`
+        """, [
+            ("node", "id(e)"), ("registration", "id(r)"), ("name", "e.name"),
+            ("labels", "labels(e)"), ("to_date", "r.to_date"),
+            ("from_date", "r.from_date")
+        ]),
+        ProfileSection("meetings", [u"""
+            (m)-[:ATTENDED_BY]-(n)
+                WHERE n:`Lobby Agency`
+        """, u"""
+            (m)-[:ATTENDED_BY]-(g:`Government Office`)
+        """, u"""
+            (mp)-[:SERVED_IN]-(g)
+                WHERE mp.name = m.host_name
+        """], [
+            ("node", "id(m)"), ("meeting_id", "id(m)"), ("position", "g.name"),
+            ("host", "mp.name"), ("department", "g.name"),
+            ("meeting", "m.meeting"), ("purpose", "m.purpose"),
+            ("date", "m.date")
+        ])
+    )
+
+    def __init__(self, name=None, get_properties=True, prefetch=None):
         NamedEntity.__init__(self)
         self.exists = False
-        self.label = "Lobby Agency"
-        self.primary_attribute = "name"
         self.name = name
+        self._fetch_properties = get_properties
         self.exists = self.fetch(
-            "Named Entity", self.primary_attribute, self.name
+            self.fetch_label, self.primary_attribute, self.name
         )
-        if self.exists:
-            self.contact_details = self._get_contact_details()
-            self.clients = self._get_clients()
-            self.employees = self._get_employees()
-            count = self._get_counts()
-            self.client_count = count[0]
-            self.employee_count = count[1]
-            self.meetings = self._get_meetings()
-            self.meetings_summary = self._get_meetings_summary()
+        if self.exists and self._fetch_properties and prefetch:
+            self.prefetch(prefetch)
+
+    @lazy()
+    def contact_details(self):
+        return self._get_contact_details()
+
+    @lazy("clients")
+    def clients(self):
+        return self._get_clients()
+
+    @lazy("employees")
+    def employees(self):
+        return self._get_employees()
+
+    @lazy("clients", "employees")
+    def _counts(self):
+        return self._get_counts()
+
+    @lazy("clients", "employees")
+    def client_count(self):
+        return self._counts[0]
+
+    @lazy("clients", "employees")
+    def employee_count(self):
+        return self._counts[1]
+
+    @lazy("meetings")
+    def meetings(self):
+        return self._get_meetings()
+
+    @lazy("meetings")
+    def meetings_summary(self):
+        return self._get_meetings_summary()
 
     def set_lobbyist_details(self, properties=None):
         properties = self._add_namedentity_properties(properties)
@@ -322,34 +377,19 @@ class LobbyAgency(NamedEntity):
         self.set_node_properties(properties, labels)
 
     def _get_contact_details(self):
-        query = u"""
-            MATCH (f:`Lobby Agency` {{name: "{0}"}})
-            RETURN f.contact_details
-        """.format(self.name)
-        results = self.query(query)
-        if results:
-            return results[0][0]
-        else:
+        if "Lobby Agency" not in self.vertex.labels:
             return None
+        return self.vertex["contact_details"]
 
     def _get_clients(self):
         results = []
-        search_string = u"""
-            MATCH (f:`Lobby Agency` {{name: "{0}"}})
-            MATCH (f)-[:REGISTERED_LOBBYIST]-(r) with f, r
-            MATCH (r)-[:HIRED]-(c) with f, r, c
-            MATCH (c)-[x]-() with f, r, c, x
-            RETURN c.name as name, labels(c) as labels,
-                count(x) as weight, r.to_date, r.from_date
-                ORDER BY weight DESC
-        """.format(self.name)
-        output = self.query(search_string)
+        output = self._order_by(self._rows("clients"), "weight", descending=True)
         for entry in output:
             detail = {
                 "name": entry["name"],
                 "weight": entry["weight"],
-                "to_date": entry["r.to_date"],
-                "from_date": entry["r.from_date"],
+                "to_date": entry["to_date"],
+                "from_date": entry["from_date"],
                 "labels": entry["labels"],
                 "source_url": None,
                 "source_linked_from": None
@@ -359,19 +399,11 @@ class LobbyAgency(NamedEntity):
 
     def _get_employees(self):
         results = []
-        search_string = u"""
-            MATCH (f:`Lobby Agency` {{name: "{0}"}})
-            MATCH (f)-[:REGISTERED_LOBBYIST]-(r) with f, r
-            MATCH (r)-[:WORKS_FOR]-(e) with f, r, e
-            RETURN e.name as name, labels(e) as labels,
-                r.to_date, r.from_date
-        """.format(self.name)
-        output = self.query(search_string)
-        for entry in output:
+        for entry in self._rows("employees"):
             detail = {
                 "name": entry["name"],
-                "to_date": entry["r.to_date"],
-                "from_date": entry["r.from_date"],
+                "to_date": entry["to_date"],
+                "from_date": entry["from_date"],
                 "labels": entry["labels"],
                 "source_url": None,
                 "source_linked_from": None
@@ -380,76 +412,37 @@ class LobbyAgency(NamedEntity):
         return results
 
     def _get_counts(self):
-        search_string = u"""
-            MATCH (f:`Lobby Agency` {{name: "{0}"}})
-            MATCH (f)-[:REGISTERED_LOBBYIST]-(r) with f, r
-            OPTIONAL MATCH (r)-[:HIRED]-(c) with f, r, c
-            OPTIONAL MATCH (r)-[:WORKS_FOR]-(e) with f, r, c, e
-            RETURN count(c) as clients, count(e) as employees
-        """.format(self.name)
-        output = self.query(search_string)
-        return output[0]["clients"], output[0]["employees"]
+        # clients and employees of one registration multiply each other's
+        # rows, as the two OPTIONAL MATCHes did
+        clients, employees = {}, {}
+        for entry in self._rows("clients"):
+            key = entry["registration"]
+            clients[key] = clients.get(key, 0) + 1
+        for entry in self._rows("employees"):
+            key = entry["registration"]
+            employees[key] = employees.get(key, 0) + 1
+        client_count = sum(
+            count * max(1, employees.get(key, 0))
+            for key, count in clients.items()
+        )
+        employee_count = sum(
+            count * max(1, clients.get(key, 0))
+            for key, count in employees.items()
+        )
+        return client_count, employee_count
 
     def _get_meetings_summary(self):
-        return {
-            "meeting_count": self._meetings_total_count(),
-            "politician_count": len(self._politicians_met()),
-            "department_count": len(self._departments_met()),
-            "politicians_met": self._politicians_met(),
-            "departments_met": self._departments_met()
-        }
-
-    def _meetings_total_count(self):
-        query = u"""
-            MATCH (f:`Lobby Agency` {{name: "{0}"}})
-            MATCH (m)-[:ATTENDED_BY]-(f) with m, f
-            RETURN count(m) as total
-        """.format(self.vertex["name"])
-        return self.query(query)[0]["total"]
-
-    def _politicians_met(self):
-        results = []
-        query = u"""
-            MATCH (f:`Lobby Agency` {{name: "{0}"}})
-            MATCH (m)-[:ATTENDED_BY]-(f) with m, f
-            MATCH (m)-[:ATTENDED_BY]-(g:`Government Office`) with f, m, g
-                OPTIONAL MATCH (mp)-[:SERVED_IN]-(g) with f, m, g, mp
-                    WHERE mp.name = m.host_name
-            RETURN DISTINCT mp.name as mp
-        """.format(self.vertex["name"])
-        output = self.query(query)
-        for entry in output:
-            if entry[0]:
-                results.append(entry[0])
-        return results
-
-    def _departments_met(self):
-        results = []
-        query = u"""
-            MATCH (f:`Lobby Agency` {{name: "{0}"}})
-            MATCH (m)-[:ATTENDED_BY]-(f) with m, f
-            MATCH (m)-[:ATTENDED_BY]-(g:`Government Office`) with f, m, g
-            RETURN DISTINCT g.name
-        """.format(self.vertex["name"])
-        output = self.query(query)
-        for entry in output:
-            if entry[0]:
-                results.append(entry[0])
-        return results
+        # meetings with no government office still count, as they did
+        # when meeting_count was counted on its own
+        summary = summarise_meetings(self._rows("meetings"))
+        summary["meeting_count"] = summary.pop("meetings_count")
+        return summary
 
     def _get_meetings(self):
         results = []
-        query = u"""
-            MATCH (f:`Lobby Agency` {{name: "{0}"}})
-            MATCH (m)-[:ATTENDED_BY]-(f) with m, f
-            MATCH (m)-[:ATTENDED_BY]-(g:`Government Office`) with f, m, g
-                OPTIONAL MATCH (mp)-[:SERVED_IN]-(g) with f, m, g, mp
-                    WHERE mp.name = m.host_name
-            RETURN g.name as position, mp.name as host, m.meeting as meeting,
-                m.purpose as purpose, m.date as date
-        """.format(self.vertex["name"])
-        output = self.query(query)
-        for entry in output:
+        for entry in self._rows("meetings"):
+            if entry["position"] is None:
+                continue
             meeting = {
                 "position": entry["position"],
                 "host": entry["host"],
@@ -475,27 +468,46 @@ class LobbyAgencies(BaseDataModel):
             RETURN f.name, count(c) as clients, count(e) as employees, labels(f)
             ORDER BY clients DESC
         """
-        search_result = self.query(search_string)
+        search_result = self.query(search_string, "LobbyAgencies.get_all")
         return search_result
 
+    def stream_all(self, page_size=500):
+        # agencies with no registrations are skipped as get_all() skips them
+        search_string = u"""
+            MATCH (f:`Lobby Agency`) WHERE id(f) > {after}
+            WITH f ORDER BY id(f) LIMIT {size}
+            OPTIONAL MATCH (f)-[:REGISTERED_LOBBYIST]-(r) with f, r
+            OPTIONAL MATCH (r)-[:HIRED]-(c) with f, r, c
+            OPTIONAL MATCH (r)-[:WORKS_FOR]-(e) with f, r, c, e
+            RETURN f.name, count(c) as clients, count(e) as employees,
+                labels(f), count(r) as registrations, id(f) as id
+            ORDER BY id
+        """
+        output = self._paged(search_string, "LobbyAgencies.stream_all", page_size)
+        for entry in output:
+            if entry["registrations"]:
+                yield entry
+
     def _get_count(self):
         search_string = u"""
             MATCH (f:`Lobby Agency`)
             RETURN count(f)
         """
-        search_result = self.query(search_string)
+        search_result = self.query(search_string, "LobbyAgencies._get_count")
         return search_result[0][0]
 
 
 class LobbyEmployee(NamedEntity):
+    label = "Lobby Employee"
+    primary_attribute = "name"
+    fetch_label = "Named Entity"
+
     def __init__(self, name=None):
         NamedEntity.__init__(self)
         self.exists = False
-        self.label = "Lobby Employee"
-        self.primary_attribute = "name"
         self.name = name
         self.exists = self.fetch(
-            "Named Entity", self.primary_attribute, self.name
+            self.fetch_label, self.primary_attribute, self.name
         )
 
     def set_employee_details(self, properties=None):
@@ -505,14 +517,16 @@ class LobbyEmployee(NamedEntity):
 
 
 class LobbyingClient(NamedEntity):
+    label = "Lobby Agency Client"
+    primary_attribute = "name"
+    fetch_label = "Named Entity"
+
     def __init__(self, name=None):
         NamedEntity.__init__(self)
         self.exists = False
-        self.label = "Lobby Agency Client"
-        self.primary_attribute = "name"
         self.name = name
         self.exists = self.fetch(
-            "Named Entity", self.primary_attribute, self.name
+            self.fetch_label, self.primary_attribute, self.name
         )
 
     def set_client_details(self, properties=None):
@@ -522,11 +536,12 @@ class LobbyingClient(NamedEntity):
 
 
 class LobbyRelationship(BaseDataModel):
+    label = "Lobby Relationship"
+    primary_attribute = "relationship"
+
     def __init__(self, relationship=None):
         BaseDataModel.__init__(self)
         self.exists = False
-        self.label = "Lobby Relationship"
-        self.primary_attribute = "relationship"
         self.relationship = relationship
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.relationship
@@ -547,8 +562,7 @@ class LobbyRelationship(BaseDataModel):
             new = u"{}\n---\n\n{}".format(existing, raw_record)
         else:
             new = raw_record
-        self.vertex["raw_record"] = new
-        self.vertex.push()
+        self.set_node_properties({"raw_record": new})
 
     def link_firm(self, firm):
         self.create_relationship(
@@ -571,10 +585,9 @@ class LobbyRelationship(BaseDataModel):
         if existing and len(existing) > 0:
             existing_datetime = self._make_datetime(existing)
             if new_datetime < existing_datetime:
-                self.vertex["from_date"] = new_date
+                self.set_node_properties({"from_date": new_date})
         else:
-            self.vertex["from_date"] = new_date
-        self.vertex.push()
+            self.set_node_properties({"from_date": new_date})
 
     def set_to_date(self, new_date):
         new_datetime = self._make_datetime(new_date)
@@ -582,10 +595,9 @@ class LobbyRelationship(BaseDataModel):
         if existing and len(existing) > 0:
             existing_datetime = self._make_datetime(existing)
             if new_datetime > existing_datetime:
-                self.vertex["to_date"] = new_date
+                self.set_node_properties({"to_date": new_date})
         else:
-            self.vertex["to_date"] = new_date
-        self.vertex.push()
+            self.set_node_properties({"to_date": new_date})
 
     @staticmethod
     def _make_datetime(date):
@@ -595,14 +607,16 @@ class LobbyRelationship(BaseDataModel):
 
 
 class Donor(NamedEntity):
+    label = "Donor"
+    primary_attribute = "name"
+    fetch_label = "Named Entity"
+
     def __init__(self, name=None):
         NamedEntity.__init__(self)
         self.exists = False
-        self.label = "Donor"
-        self.primary_attribute = "name"
         self.name = name
         self.exists = self.fetch(
-            "Named Entity", self.primary_attribute, self.name
+            self.fetch_label, self.primary_attribute, self.name
         )
 
     def set_donor_details(self, properties=None):
@@ -612,11 +626,12 @@ class Donor(NamedEntity):
 
 
 class FundingRelationship(BaseDataModel):
+    label = "Funding Relationship"
+    primary_attribute = "relationship"
+
     def __init__(self, relationship=None):
         BaseDataModel.__init__(self)
         self.exists = False
-        self.label = "Funding Relationship"
-        self.primary_attribute = "relationship"
         self.relationship = relationship
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.relationship
@@ -637,8 +652,7 @@ class FundingRelationship(BaseDataModel):
             new = u"{}\n,\n{}".format(existing, raw_record)
         else:
             new = raw_record
-        self.vertex["raw_record"] = new
-        self.vertex.push()
+        self.set_node_properties({"raw_record": new})
 
     def link_contributor(self, donor):
         self.create_relationship(
@@ -665,14 +679,16 @@ class FundingRelationship(BaseDataModel):
 
 
 class MeetingAttendee(NamedEntity):
+    label = "Meeting Attendee"
+    primary_attribute = "name"
+    fetch_label = "Named Entity"
+
     def __init__(self, name=None):
         NamedEntity.__init__(self)
         self.exists = False
-        self.label = "Meeting Attendee"
-        self.primary_attribute = "name"
         self.name = name
         self.exists = self.fetch(
-            "Named Entity", self.primary_attribute, self.name
+            self.fetch_label, self.primary_attribute, self.name
         )
 
     def set_attendee_details(self, properties=None):
@@ -682,11 +698,12 @@ class MeetingAttendee(NamedEntity):
 
 
 class InterestCategory(BaseDataModel):
+    label = "Interest Category"
+    primary_attribute = "name"
+
     def __init__(self, name=None):
         BaseDataModel.__init__(self)
         self.exists = False
-        self.label = "Interest Category"
-        self.primary_attribute = "name"
         self.name = name
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.name
@@ -708,14 +725,16 @@ class InterestCategory(BaseDataModel):
 
 
 class RegisteredInterest(NamedEntity):
+    label = "Registered Interest"
+    primary_attribute = "name"
+    fetch_label = "Named Entity"
+
     def __init__(self, name=None):
         NamedEntity.__init__(self)
         self.exists = False
-        self.label = "Registered Interest"
-        self.primary_attribute = "name"
         self.name = name
         self.exists = self.fetch(
-            "Named Entity", self.primary_attribute, self.name
+            self.fetch_label, self.primary_attribute, self.name
         )
 
     def set_interest_details(self, properties=None):
@@ -725,11 +744,12 @@ class RegisteredInterest(NamedEntity):
 
 
 class RegisteredDonation(BaseDataModel):
+    label = "Donation"
+    primary_attribute = "donation"
+
     def __init__(self, donation=None):
         BaseDataModel.__init__(self)
         self.exists = False
-        self.label = "Donation"
-        self.primary_attribute = "donation"
         self.donation = donation
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.donation
@@ -764,11 +784,12 @@ class RegisteredDonation(BaseDataModel):
 
 
 class InterestDetail(BaseDataModel):
+    label = "Interest Detail"
+    primary_attribute = "summary"
+
     def __init__(self, summary=None):
         BaseDataModel.__init__(self)
         self.exists = False
-        self.label = "Interest Detail"
-        self.primary_attribute = "summary"
         self.summary = summary
         self.exists = self.fetch(
             self.label, self.primary_attribute, self.summary
@@ -789,8 +810,7 @@ class InterestDetail(BaseDataModel):
             new = u"{},{}".format(existing, date)
         else:
             new = date
-        self.vertex["recorded date"] = new
-        self.vertex.push()
+        self.set_node_properties({"recorded date": new})
 
     def update_raw_record(self, raw_record):
         existing = self.vertex["raw_record"]
@@ -798,8 +818,7 @@ class InterestDetail(BaseDataModel):
             new = u"{}\n---\n\n{}".format(existing, raw_record)
         else:
             new = raw_record
-        self.vertex["raw_record"] = new
-        self.vertex.push()
+        self.set_node_properties({"raw_record": new})
 
     def set_interest_details(self, properties=None):
         labels = ["Interest Detail", "Contributions"]
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import inspect
+from py2neo.cypher import CypherError, CypherTransactionError
+from data_models import core
+from data_models import government_models
+from data_models import influencers_models
+
+
+MODEL_MODULES = [core, government_models, influencers_models]
+
+core.templates.register("create_constraint", u"""
+    CREATE CONSTRAINT ON (n:`{0}`) ASSERT n.`{1}` IS UNIQUE
+""")
+core.templates.register("create_index", u"""
+    CREATE INDEX ON :`{0}`(`{1}`)
+""")
+core.templates.register("relationship_types", u"""
+    MATCH ()-[r]->() RETURN DISTINCT type(r) AS type
+""")
+core.templates.register("recompute_weights", u"""
+    MATCH (n) WHERE id(n) > {{after}}
+        AND NOT (n:Calendar OR n:Year OR n:Month OR n:Day)
+    WITH n ORDER BY id(n) LIMIT {{size}}
+    OPTIONAL MATCH (n)-[r]-(o) WHERE NOT o:Day
+    WITH n, count(r) AS weight, collect(type(r)) AS types
+    SET n.weight = weight{0}
+    RETURN id(n) AS id
+    ORDER BY id
+""")
+
+# the root every calendar day hangs off, merged by core.DateIndex
+CALENDAR_KEYS = [
+    ("Calendar", "name"),
+]
+
+# properties the listings sort on, maintained by core.count_relationship
+SORT_KEYS = [
+    ("Member of Parliament", "weight"),
+    ("Lord", "weight"),
+]
+
+
+class GraphSchema(core.BaseDataModel):
+    @staticmethod
+    def model_keys():
+        # the (label, primary_attribute) pair each model merges on, and the
+        # label it is fetched on when that differs
+        keys = set()
+        for module in MODEL_MODULES:
+            for _, model in inspect.getmembers(module, inspect.isclass):
+                if model.__module__ != module.__name__:
+                    continue
+                if not issubclass(model, core.BaseDataModel):
+                    continue
+                if not model.label or not model.primary_attribute:
+                    continue
+                keys.add((model.label, model.primary_attribute))
+                fetch_label = getattr(model, "fetch_label", None)
+                if fetch_label:
+                    keys.add((fetch_label, model.primary_attribute))
+        return sorted(keys)
+
+    def create(self):
+        for label, key in self.missing():
+            if (label, key) not in SORT_KEYS:
+                try:
+                    statement = core.templates.statement(
+                        "create_constraint", label, key
+                    )
+                    self.query(statement, "create_constraint")
+                    self._logger.debug("constraint: %s.%s" % (label, key))
+                    continue
+                except (CypherError, CypherTransactionError):
+                    # secondary labels can share a name, so fall back to
+                    # an index. py2neo 2.0 raises CypherTransactionError
+                    # from the transactional endpoint
+                    pass
+            statement = core.templates.statement("create_index", label, key)
+            self.query(statement, "create_index")
+            self._logger.debug("index: %s.%s" % (label, key))
+        return self.missing()
+
+    def missing(self):
+        missing = []
+        schema = self.g.graph.schema
+        for label, key in self.model_keys() + CALENDAR_KEYS + SORT_KEYS:
+            if key in schema.get_uniqueness_constraints(label):
+                continue
+            if key in schema.get_indexes(label):
+                continue
+            missing.append((label, key))
+        return missing
+
+
+class GraphWeights(core.BaseDataModel):
+    # rebuilds the `weight` and `degree_<TYPE>` counters from the
+    # relationships themselves, for graphs loaded around the graphers
+    def recompute(self, page_size=1000):
+        types = [
+            entry["type"] for entry in
+            self.query(
+                core.templates.statement("relationship_types"),
+                "relationship_types"
+            )
+        ]
+        degrees = u"".join(
+            u""",
+        n.`degree_{0}` = CASE WHEN "{0}" IN types
+            THEN length(filter(t IN types WHERE t = "{0}")) END""".format(
+                relationship
+            )
+            for relationship in types
+        )
+        statement = core.templates.statement("recompute_weights", degrees)
+        count = 0
+        for _ in self._paged(statement, "recompute_weights", page_size):
+            count += 1
+        self._logger.debug(
+            "weights: %s nodes over %s relationship types" % (count, len(types))
+        )
+        return count
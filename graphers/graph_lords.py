@@ -2,19 +2,26 @@
 import logging
 from utils import mongo
 from data_models import government_models
+from data_models.core import BaseDataModel
 
 
 class GraphLords():
     def __init__(self):
         self._logger = logging.getLogger('spud')
         self.db = mongo.MongoInterface()
+        self.SHARD_KEY = "full_name"
         self.data_models = government_models
         self.PREFIX = "lords"
 
-    def run(self):
-        all_lords = self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+    def fetch(self):
+        return self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+
+    def run(self, docs=None):
+        all_lords = self.fetch() if docs is None else docs
+        session = BaseDataModel.begin_session()
         for doc in all_lords:
-            self._import(doc)
+            session.run(self._import, doc)
+        session.commit()
 
     def _import(self, node):
         terms = node["terms"]
@@ -33,7 +40,9 @@ class GraphLords():
         return self._create_lord(node)
 
     def _create_lord(self, lord_details):
-        new_lord = self.data_models.Lord(lord_details["full_name"])
+        new_lord = self.data_models.Lord(
+            lord_details["full_name"], get_properties=False
+        )
         if not new_lord.exists:
             new_lord.create()
 
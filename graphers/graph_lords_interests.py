@@ -7,19 +7,26 @@ from data_models.influencers_models import RegisteredInterest
 from data_models.influencers_models import InterestDetail
 from utils import mongo
 from data_models import government_models
+from data_models.core import BaseDataModel
 
 
 class GraphLordsInterests():
     def __init__(self):
         self._logger = logging.getLogger('spud')
         self.db = mongo.MongoInterface()
+        self.SHARD_KEY = "lord"
         self.data_models = government_models
         self.PREFIX = "lords_interests"
 
-    def run(self):
-        all_lords = self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+    def fetch(self):
+        return self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+
+    def run(self, docs=None):
+        all_lords = self.fetch() if docs is None else docs
+        session = BaseDataModel.begin_session()
         for doc in all_lords:
-            self._graph_interests(doc)
+            session.run(self._graph_interests, doc)
+        session.commit()
 
     def _graph_interests(self, node):
         self._logger.debug("\n..................")
@@ -130,7 +137,7 @@ class GraphLordsInterests():
         return entry
 
     def _find_lord(self, lord):
-        new_lord = self.data_models.Lord(lord)
+        new_lord = self.data_models.Lord(lord, get_properties=False)
         if not new_lord.exists:
             self._logger.debug("%s *not found*" % lord)
             new_lord.create()
@@ -7,40 +7,50 @@ from data_models.government_models import GovernmentOffice
 from data_models.government_models import GovernmentMeeting
 from data_models.government_models import MemberOfParliament
 from data_models.government_models import Lord
+from data_models.core import BaseDataModel
 
 
 class GraphMeetings():
     def __init__(self):
         self._logger = logging.getLogger('spud')
         self.db = mongo.MongoInterface()
+        self.SHARD_KEY = "host_name"
         self.COLLECTION_NAME = "meetings_parse"
         self.lords_titles = config.lords_titles
 
-    def run(self):
+    def fetch(self):
+        return self.db.fetch_all(self.COLLECTION_NAME, paged=False)
+
+    def run(self, docs=None):
         self._logger.info("\n\nGraphing Meetings")
-        all_meetings = self.db.fetch_all(self.COLLECTION_NAME, paged=False)
+        all_meetings = self.fetch() if docs is None else docs
+        session = BaseDataModel.begin_session()
         for doc in all_meetings:
-            self._logger.debug("attendee:\t%s" % doc["organisation"])
-            self._logger.debug("purpose:\t%s" % doc["purpose"])
-            self._logger.debug("host_name:\t%s" % doc["host_name"])
-            self._logger.debug("---\n")
-            host = self._create_host(doc["host_name"])
-            office = self._create_office(host, doc["host_position"])
-            department = self._create_department(office, doc["department"])
-            attendee = self._create_attendee(doc["organisation"])
-            meeting = self._create_meeting(doc)
-            meeting.link_participant(office)
-            meeting.link_participant(attendee)
+            session.run(self._graph_meeting, doc)
+        session.commit()
+
+    def _graph_meeting(self, doc):
+        self._logger.debug("attendee:\t%s" % doc["organisation"])
+        self._logger.debug("purpose:\t%s" % doc["purpose"])
+        self._logger.debug("host_name:\t%s" % doc["host_name"])
+        self._logger.debug("---\n")
+        host = self._create_host(doc["host_name"])
+        office = self._create_office(host, doc["host_position"])
+        department = self._create_department(office, doc["department"])
+        attendee = self._create_attendee(doc["organisation"])
+        meeting = self._create_meeting(doc)
+        meeting.link_participant(office)
+        meeting.link_participant(attendee)
 
     def _create_host(self, name):
         if name:
             if any(title in name for title in self.lords_titles):
-                politician = Lord(name)
+                politician = Lord(name, get_properties=False)
                 if not politician.exists:
                     politician.create()
                     politician.set_lord_details()
             else:
-                politician = MemberOfParliament(name)
+                politician = MemberOfParliament(name, get_properties=False)
                 if not politician.exists:
                     politician.create()
                     politician.set_mp_details()
@@ -48,7 +58,7 @@ class GraphMeetings():
         return None
 
     def _create_office(self, host, office):
-        new_office = GovernmentOffice(office)
+        new_office = GovernmentOffice(office, get_properties=False)
         new_office.create()
         new_office.is_position(office_type="Ministerial Meeting")
         if host:
@@ -56,7 +66,7 @@ class GraphMeetings():
         return new_office
 
     def _create_department(self, office, department):
-        new_dept = GovernmentOffice(department)
+        new_dept = GovernmentOffice(department, get_properties=False)
         new_dept.create()
         new_dept.is_department(office_type="Ministerial Meeting")
         office.link_department(new_dept)
@@ -2,26 +2,33 @@
 import logging
 from utils import mongo
 from data_models import government_models
+from data_models.core import BaseDataModel
 
 
 class GraphMPs():
     def __init__(self):
         self._logger = logging.getLogger('spud')
         self.db = mongo.MongoInterface()
+        self.SHARD_KEY = "full_name"
         self.data_models = government_models
         self.PREFIX = "mps"
 
-    def run(self):
-        all_mps = self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+    def fetch(self):
+        return self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+
+    def run(self, docs=None):
+        all_mps = self.fetch() if docs is None else docs
+        session = BaseDataModel.begin_session()
         for doc in all_mps:
-            self._import(doc)
+            session.run(self._import, doc)
+        session.commit()
 
     def _import(self, node):
         terms = node["terms"]
         mp = self.graph_mp(node)
         if terms:
             self.import_terms(mp, terms)
-            mp.set_membership()
+            mp.set_membership([term["left_reason"] for term in terms])
 
     def graph_mp(self, node):
         self._logger.debug("\n..................")
@@ -113,11 +120,15 @@ class GraphMPs():
         self._logger.debug(office)
         new_office = None
         if create_as == "committee":
-            new_office = self.data_models.GovernmentOffice(office)
+            new_office = self.data_models.GovernmentOffice(
+                office, get_properties=False
+            )
             new_office.create()
             new_office.is_committee()
         elif create_as == "position":
-            new_office = self.data_models.GovernmentOffice(office)
+            new_office = self.data_models.GovernmentOffice(
+                office, get_properties=False
+            )
             new_office.create()
             new_office.is_position()
         if new_office.exists:
@@ -14,6 +14,7 @@ class GraphMPsInterests():
     def __init__(self):
         self._logger = logging.getLogger('spud')
         self.db = mongo.MongoInterface()
+        self.SHARD_KEY = "mp"
         self.core = BaseDataModel()
         self.data_models = government_models
         self.PREFIX = "mps_interests"
@@ -27,11 +28,18 @@ class GraphMPsInterests():
             "accepted",
             "nature"
         ]
+        self.imported = set()
 
-    def run(self):
-        all_mps = self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+    def fetch(self):
+        return self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+
+    def run(self, docs=None):
+        self.imported = self._load_imported()
+        all_mps = self.fetch() if docs is None else docs
+        session = BaseDataModel.begin_session()
         for doc in all_mps:
-            self._graph_interests(doc)
+            session.run(self._graph_interests, doc)
+        session.commit()
 
     def _graph_interests(self, node):
         self.current_detail = {"mp": node["mp"]}
@@ -162,17 +170,21 @@ class GraphMPsInterests():
                             interest_detail = InterestDetail(summary)
                             if not interest_detail.exists:
                                 interest_detail.create()
-                                interest_detail.set_interest_details({"amount": int_amount})
-                                interest_detail.set_interest_details(meta)
+                                details = dict(meta, amount=int_amount)
+                                received = "received" in entry and entry["received"] != u"Unknown"
+                                registered = "registered" in entry and entry["registered"] != u"Unknown"
+                                if received:
+                                    details["registered"] = entry["received"]
+                                if registered:
+                                    details["registered"] = entry["registered"]
+                                interest_detail.set_interest_details(details)
                                 # interest_detail.update_raw_record(record["raw_record"])
 
                                 funding_relationship.link_interest_detail(interest_detail)
 
-                                if "received" in entry and entry["received"] != u"Unknown":
-                                    interest_detail.set_interest_details({"registered": entry["received"]})
+                                if received:
                                     interest_detail.set_received_date(entry["received"])
-                                if "registered" in entry and entry["registered"] != u"Unknown":
-                                    interest_detail.set_interest_details({"registered": entry["registered"]})
+                                if registered:
                                     interest_detail.set_registered_date(entry["registered"])
                             else:
                                 interest_detail.update_recorded_dates(self.current_detail["recorded_date"])
@@ -228,13 +240,15 @@ class GraphMPsInterests():
                 interest_detail = InterestDetail(summary)
                 if not interest_detail.exists:
                     interest_detail.create()
-                    interest_detail.set_interest_details(meta)
+                    details = dict(meta)
+                    if date:
+                        details["registered"] = date
+                    interest_detail.set_interest_details(details)
                     # interest_detail.update_raw_record(record["raw_record"])
 
                     funding_relationship.link_interest_detail(interest_detail)
 
                     if date:
-                        interest_detail.set_interest_details({"registered": date})
                         interest_detail.set_registered_date(date)
                 else:
                     interest_detail.update_recorded_dates(self.current_detail["recorded_date"])
@@ -286,14 +300,15 @@ class GraphMPsInterests():
                         interest_detail = InterestDetail(summary)
                         if not interest_detail.exists:
                             interest_detail.create()
-                            interest_detail.set_interest_details({"amount": int_amount})
-                            interest_detail.set_interest_details(meta)
+                            details = dict(meta, amount=int_amount)
+                            if date:
+                                details["registered"] = date
+                            interest_detail.set_interest_details(details)
                             # interest_detail.update_raw_record(record["raw_record"])
 
                             funding_relationship.link_interest_detail(interest_detail)
 
                             if date:
-                                interest_detail.set_interest_details({"registered": date})
                                 interest_detail.set_registered_date(date)
                         else:
                             interest_detail.update_recorded_dates(self.current_detail["recorded_date"])
@@ -310,13 +325,15 @@ class GraphMPsInterests():
                     interest_detail = InterestDetail(summary)
                     if not interest_detail.exists:
                         interest_detail.create()
-                        interest_detail.set_interest_details(meta)
+                        details = dict(meta)
+                        if date:
+                            details["registered"] = date
+                        interest_detail.set_interest_details(details)
                         # interest_detail.update_raw_record(record["raw_record"])
 
                         funding_relationship.link_interest_detail(interest_detail)
 
                         if date:
-                            interest_detail.set_interest_details({"registered": date})
                             interest_detail.set_registered_date(date)
                     else:
                         interest_detail.update_recorded_dates(self.current_detail["recorded_date"])
@@ -371,14 +388,15 @@ class GraphMPsInterests():
                         interest_detail = InterestDetail(summary)
                         if not interest_detail.exists:
                             interest_detail.create()
-                            interest_detail.set_interest_details({"amount": int_amount})
-                            interest_detail.set_interest_details(meta)
+                            details = dict(meta, amount=int_amount)
+                            if date:
+                                details["registered"] = date
+                            interest_detail.set_interest_details(details)
                             # interest_detail.update_raw_record(record["raw_record"])
 
                             funding_relationship.link_interest_detail(interest_detail)
 
                             if date:
-                                interest_detail.set_interest_details({"registered": date})
                                 interest_detail.set_registered_date(date)
                         else:
                             interest_detail.update_recorded_dates(self.current_detail["recorded_date"])
@@ -393,13 +411,15 @@ class GraphMPsInterests():
                     interest_detail = InterestDetail(summary)
                     if not interest_detail.exists:
                         interest_detail.create()
-                        interest_detail.set_interest_details(meta)
+                        details = dict(meta)
+                        if date:
+                            details["registered"] = date
+                        interest_detail.set_interest_details(details)
                         # interest_detail.update_raw_record(record["raw_record"])
 
                         funding_relationship.link_interest_detail(interest_detail)
 
                         if date:
-                            interest_detail.set_interest_details({"registered": date})
                             interest_detail.set_registered_date(date)
                     else:
                         interest_detail.update_recorded_dates(self.current_detail["recorded_date"])
@@ -468,14 +488,15 @@ class GraphMPsInterests():
                         interest_detail = InterestDetail(summary)
                         if not interest_detail.exists:
                             interest_detail.create()
-                            interest_detail.set_interest_details({"amount": int_amount})
-                            interest_detail.set_interest_details(meta)
+                            details = dict(meta, amount=int_amount)
+                            if registered:
+                                details["registered"] = registered
+                            interest_detail.set_interest_details(details)
                             # interest_detail.update_raw_record(record["raw_record"])
 
                             funding_relationship.link_interest_detail(interest_detail)
 
                             if registered:
-                                interest_detail.set_interest_details({"registered": registered})
                                 interest_detail.set_registered_date(registered)
                         else:
                             interest_detail.update_recorded_dates(self.current_detail["recorded_date"])
@@ -490,13 +511,15 @@ class GraphMPsInterests():
                     interest_detail = InterestDetail(summary)
                     if not interest_detail.exists:
                         interest_detail.create()
-                        interest_detail.set_interest_details(meta)
+                        details = dict(meta)
+                        if registered:
+                            details["registered"] = registered
+                        interest_detail.set_interest_details(details)
                         # interest_detail.update_raw_record(record["raw_record"])
 
                         funding_relationship.link_interest_detail(interest_detail)
 
                         if registered:
-                            interest_detail.set_interest_details({"registered": registered})
                             interest_detail.set_registered_date(registered)
                     else:
                         interest_detail.update_recorded_dates(self.current_detail["recorded_date"])
@@ -537,10 +560,11 @@ class GraphMPsInterests():
                         for entry in record["registered"]:
                             funding_relationship.set_registered_date(entry)
 
+                    extra_details = {}
                     for detail in self.extra_details:
                         if detail in record:
-                            funding_relationship.vertex[detail] = record[detail]
-                    funding_relationship.vertex.push()
+                            extra_details[detail] = record[detail]
+                    funding_relationship.set_relationship_details(extra_details)
                 else:
                     self.current_detail["contributor"] = "Unknown"
                     self._logger.debug("** NO CONTRIBUTOR ** ")
@@ -590,9 +614,10 @@ class GraphMPsInterests():
             payment = InterestDetail(summary)
             payment.create()
 
-            payment.set_interest_details(payment_details)
-            payment.set_interest_details({"amount": int_amount})
-            payment.set_interest_details(meta)
+            details = dict(payment_details)
+            details.update(meta)
+            details["amount"] = int_amount
+            payment.set_interest_details(details)
             relationship.link_interest_detail(payment)
 
             if payment_details["received"] != u"Unknown":
@@ -610,8 +635,7 @@ class GraphMPsInterests():
                 payment.create()
 
                 relationship.link_interest_detail(payment)
-                payment.set_interest_details({"amount": int_amount})
-                payment.set_interest_details(meta)
+                payment.set_interest_details(dict(meta, amount=int_amount))
         else:
             summary = u"{} - £{} - {}".format(
                 context, payment_details, u"Unknown"
@@ -621,26 +645,29 @@ class GraphMPsInterests():
             payment.create()
 
             relationship.link_interest_detail(payment)
-            payment.set_interest_details({"amount": int_amount})
-            payment.set_interest_details(meta)
+            payment.set_interest_details(dict(meta, amount=int_amount))
 
     def _print_out(self, key, value):
         self._logger.debug("  %-25s%-25s" % (key, value))
 
     def _is_previously_imported(self, mp, date):
-        result = False
+        return (mp, date) in self.imported
+
+    def _load_imported(self):
+        # every (recipient, recorded date) pair already in the graph,
+        # loaded once so the check per scraped register is a set lookup
+        imported = set()
         query = u"""
             MATCH (n:`Interest Detail`)
-            WHERE n.recipient = "{0}"
-            RETURN distinct collect(n.`recorded date`) as dates
-        """.format(mp)
-        dates = self.core.query(query)[0]["dates"]
-        if date in dates:
-            result = True
-        for entry in dates:
-            if date in entry:
-                result = True
-        return result
+            WHERE has(n.recipient) AND has(n.`recorded date`)
+            RETURN n.recipient AS recipient, n.`recorded date` AS dates
+        """
+        for result in self.core.query(
+            query, "GraphMPsInterests._load_imported"
+        ):
+            for date in result["dates"].split(","):
+                imported.add((result["recipient"], date))
+        return imported
 
     @staticmethod
     def _is_remuneration(record):
@@ -7,6 +7,7 @@ from data_models.influencers_models import FundingRelationship
 from data_models.influencers_models import RegisteredDonation
 from utils import mongo
 from data_models import government_models
+from data_models.core import BaseDataModel
 
 
 class GraphPartyFunding():
@@ -14,30 +15,38 @@ class GraphPartyFunding():
         self._logger = logging.getLogger('spud')
         self.data_models = government_models
         self.db = mongo.MongoInterface()
+        self.SHARD_KEY = "donor_name"
         self.PREFIX = "party_funding"
 
-    def run(self):
-        all_donations = self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+    def fetch(self):
+        return self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+
+    def run(self, docs=None):
+        all_donations = self.fetch() if docs is None else docs
+        session = BaseDataModel.begin_session()
         for doc in all_donations:
+            session.run(self._graph_donation, doc)
+        session.commit()
 
-            name = doc["recipient"]
-            donor = doc["donor_name"]
+    def _graph_donation(self, doc):
+        name = doc["recipient"]
+        donor = doc["donor_name"]
 
-            recipient = self._get_recipient(name, doc)
-            funding_relationship = self._create_relationship(name, donor)
+        recipient = self._get_recipient(name, doc)
+        funding_relationship = self._create_relationship(name, donor)
 
-            self.current = {
-                "source_url": doc["source"]["url"],
-                "source_linked_from": doc["source"]["linked_from_url"],
-                "source_fetched": str(doc["source"]["fetched"]),
-            }
+        self.current = {
+            "source_url": doc["source"]["url"],
+            "source_linked_from": doc["source"]["linked_from_url"],
+            "source_fetched": str(doc["source"]["fetched"]),
+        }
 
-            donor = self._get_donor(donor, doc)
-            donation = self._create_donation(doc)
+        donor = self._get_donor(donor, doc)
+        donation = self._create_donation(doc)
 
-            recipient.link_funding_category(funding_relationship)
-            funding_relationship.link_contributor(donor)
-            funding_relationship.link_funding(donation)
+        recipient.link_funding_category(funding_relationship)
+        funding_relationship.link_contributor(donor)
+        funding_relationship.link_funding(donation)
 
     def _get_recipient(self, name, entry):
         new_recipient = DonationRecipient(name)
@@ -6,44 +6,53 @@ from data_models.influencers_models import LobbyAgency
 from data_models.influencers_models import LobbyingClient
 from data_models.influencers_models import LobbyRelationship
 from data_models.influencers_models import LobbyEmployee
+from data_models.core import BaseDataModel
 
 
 class GraphPrca():
     def __init__(self):
         self._logger = logging.getLogger('spud')
         self.db = mongo.MongoInterface()
+        self.SHARD_KEY = "name"
         self.PREFIX = "prca"
 
-    def run(self):
+    def fetch(self):
+        return self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+
+    def run(self, docs=None):
         self._logger.debug("\n\nGraphing PRCA")
-        all_lobbyists = self.db.fetch_all("%s_parse" % self.PREFIX, paged=False)
+        all_lobbyists = self.fetch() if docs is None else docs
+        session = BaseDataModel.begin_session()
         for doc in all_lobbyists:
+            session.run(self._graph_agency, doc)
+        session.commit()
 
-            name = doc["name"]
-            self._logger.debug("\nLobby Agency: %s" % name)
+    def _graph_agency(self, doc):
+        name = doc["name"]
+        self._logger.debug("\nLobby Agency: %s" % name)
 
-            lobby_firm = LobbyAgency(name)
-            if not lobby_firm.exists:
-                lobby_firm.create()
+        lobby_firm = LobbyAgency(name, get_properties=False)
+        if not lobby_firm.exists:
+            lobby_firm.create()
 
-            lobby_props = {
-                "pa_contact": doc["pa_contact"],
-                "contact_details": doc["contact_details"]
-            }
-            lobby_firm.set_lobbyist_details(lobby_props)
+        lobby_props = {
+            "pa_contact": doc["pa_contact"],
+            "contact_details": doc["contact_details"]
+        }
+        lobby_firm.set_lobbyist_details(lobby_props)
 
-            self.d = {
-                "lobby_agency": doc["name"],
-                "source_url": doc["source"]["url"],
-                "source_linked_from": doc["source"]["linked_from_url"],
-                "source_fetched": doc["source"]["fetched"],
-                "meta": doc["meta"],
-                "from_date": doc["date_range"][0],
-                "to_date": doc["date_range"][1]
-            }
+        self.d = {
+            "lobby_agency": doc["name"],
+            "source_url": doc["source"]["url"],
+            "source_linked_from": doc["source"]["linked_from_url"],
+            "source_fetched": doc["source"]["fetched"],
+            "meta": doc["meta"],
+            "from_date": doc["date_range"][0],
+            "to_date": doc["date_range"][1]
+        }
 
-            self._create_clients(lobby_firm, doc["clients"])
-            self._create_staff(lobby_firm, doc["staff"])
+        self._create_clients(lobby_firm, doc["clients"])
+        self._create_staff(lobby_firm, doc["staff"])
 
     def _create_clients(self, firm, clients):
         if clients:
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import logging
+import multiprocessing
+import zlib
+from data_models import core
+from data_models.schema import GraphWeights
+from data_interfaces.query_cache import GraphVersion
+from data_interfaces.change_log import ChangeLog
+
+
+def shard_of(doc, key, count):
+    # documents sharing a key always land in the same shard, so two
+    # workers never graph the same source entity
+    value = doc.get(key) or u""
+    if isinstance(value, unicode):
+        value = value.encode("utf-8")
+    return zlib.crc32(value) % count
+
+
+def in_shard(doc, key, shard):
+    index, count = shard
+    return shard_of(doc, key, count) == index
+
+
+def split(docs, key, count):
+    shards = [[] for _ in range(count)]
+    for doc in docs:
+        shards[shard_of(doc, key, count)].append(doc)
+    return shards
+
+
+def run_grapher(grapher, docs=None, commit_every=100, batch=None,
+                vertex_cache=10000):
+    _graph(grapher, docs, commit_every, batch, vertex_cache)
+    GraphVersion().bump()
+
+
+def run_sharded(grapher, workers, **settings):
+    # the parent fetches and splits the documents once and each shard
+    # only graphs its slice. Vertices several shards link to (recipients,
+    # interest categories, parties, days) are still MERGEd concurrently:
+    # the unique constraints from --schema make those MERGEs lock rather
+    # than duplicate, and days missing from a --calendar preload are
+    # merged under a lock on the calendar root. Shards leave the weight
+    # and degree counters alone; they are recomputed once at the end
+    logger = logging.getLogger('spud')
+    count = workers * 4
+    source = grapher()
+    shards = split(source.fetch(), source.SHARD_KEY, count)
+    jobs = [(grapher, docs, settings) for docs in shards if docs]
+    logger.debug(
+        "graphing %s in %s shards on %s workers" %
+        (grapher.__name__, len(jobs), workers)
+    )
+    pool = multiprocessing.Pool(workers)
+    try:
+        pool.map(_run_shard, jobs, chunksize=1)
+        GraphWeights().recompute()
+    finally:
+        pool.close()
+        pool.join()
+        # once for the whole run, after every shard has flushed its changes
+        GraphVersion().bump()
+
+
+def _run_shard(job):
+    grapher, docs, settings = job
+    # state forked from the parent belongs to the parent's connection
+    core.BaseDataModel.session = None
+    core.BaseDataModel.batch = None
+    core.BaseDataModel.counting = False
+    _graph(grapher, docs, **settings)
+
+
+def _graph(grapher, docs, commit_every=100, batch=None, vertex_cache=10000):
+    core.BaseDataModel.begin_session(commit_every)
+    if batch:
+        core.BaseDataModel.begin_batch(batch)
+    if vertex_cache:
+        core.BaseDataModel.vertex_cache = core.VertexCache(vertex_cache)
+    core.BaseDataModel.change_log = ChangeLog()
+    grapher().run(docs)
+    core.BaseDataModel.vertex_cache = None
+    core.BaseDataModel.end_batch()
+    core.BaseDataModel.end_session()
+    core.BaseDataModel.change_log.flush()
+    core.BaseDataModel.change_log = None
@@ -2,7 +2,9 @@
 import warnings
 warnings.simplefilter("ignore", UserWarning)
 import sys
+import os
 import argparse
+import datetime
 import logging
 
 from scrapers import appc, lords, lords_interests, meetings, mps, mps_interests, party_funding, prca
@@ -19,9 +21,14 @@ from graphers import graph_party_funding
 from graphers import graph_prca
 from graphers import graph_appc
 from graphers import graph_meetings
+from graphers import sharding
 
 from data_interfaces import api_data_gen
+from data_interfaces import change_log
+from data_interfaces import graph_export
+from data_interfaces import graph_database
 from data_models import core
+from data_models import schema
 
 
 choices = ["appc", "lords", "lords_interests", "meetings", "mps", "mps_interests", "party_funding", "prca"]
@@ -34,7 +41,18 @@ arg_parser.add_argument("--scrape", nargs="+", choices=choices, help="Specify th
 arg_parser.add_argument("--master", nargs="+", choices=["mps", "lords", "positions"], help="Parse master entities")
 arg_parser.add_argument("--parse", nargs="+", choices=choices, help="Specify the parser(s) to run")
 arg_parser.add_argument("--graph", nargs="+", choices=choices, help="Specify the grapher(s) to run")
+arg_parser.add_argument("--schema", action="store_true", help="Create the constraints and indexes the graphers merge on")
+arg_parser.add_argument("--recompute-weights", action="store_true", help="Rebuild the weight and per-type degree counters the listings sort on")
+arg_parser.add_argument("--batch", type=int, metavar="SIZE", help="Queue grapher writes and flush them in batches of SIZE")
+arg_parser.add_argument("--commit-every", type=int, default=100, metavar="N", help="Statements per grapher transaction")
+arg_parser.add_argument("--workers", type=int, default=1, metavar="N", help="Graph in N worker processes, each on its own shard of the documents; with --api_gen, build each collection on N workers")
+arg_parser.add_argument("--vertex-cache", type=int, default=10000, metavar="SIZE", help="Vertices remembered per grapher run, 0 to disable")
+arg_parser.add_argument("--calendar", type=int, nargs=2, metavar=("FIRST", "LAST"), help="Preload calendar day nodes for years FIRST to LAST before graphing")
+arg_parser.add_argument("--graph-export", nargs="+", choices=["mps", "mps_interests", "party_funding", "prca", "appc", "meetings"], help="Write the grapher output as neo4j-import CSV files instead of graphing")
+arg_parser.add_argument("--export-dir", default="graph_export", help="Directory for --graph-export CSV files")
 arg_parser.add_argument("--api_gen", nargs="+", choices=["politicians", "lobbyists", "government", "influencers", "parties"], help="Create mongo database for API")
+arg_parser.add_argument("--incremental", action="store_true", help="With --api_gen, only rebuild the documents for entities graphed since the last incremental run")
+arg_parser.add_argument("--api-rollback", nargs="+", choices=["politicians", "lobbyists", "government", "influencers", "parties"], help="Restore the API collections from before the last --api_gen")
 arg_parser.add_argument("--export", nargs="+", choices=["named_entities"], help="Specify the export to run")
 args = arg_parser.parse_args()
 
@@ -84,36 +102,76 @@ if args.parse is not None:
     for parser in args.parse:
         sys.modules["parsers.%s" % parser].parse(**parser_args)
 
+# create graph constraints and indexes
+if args.schema:
+    for label, key in schema.GraphSchema().create():
+        logger.error("Could not create schema for %s.%s" % (label, key))
+
+# repair the relationship counters the graphers maintain
+if args.recompute_weights:
+    schema.GraphWeights().recompute()
+
+exec_grapher = {
+    "mps": graph_mps.GraphMPs,
+    "lords": graph_lords.GraphLords,
+    "mps_interests": graph_mps_interests.GraphMPsInterests,
+    "lords_interests": graph_lords_interests.GraphLordsInterests,
+    "party_funding": graph_party_funding.GraphPartyFunding,
+    "prca": graph_prca.GraphPrca,
+    "appc": graph_appc.GraphAppc,
+    "meetings": graph_meetings.GraphMeetings,
+}
+
 # run graphers
 if args.graph is not None:
-    exec_grapher = {
-        "mps": graph_mps.GraphMPs,
-        "lords": graph_lords.GraphLords,
-        "mps_interests": graph_mps_interests.GraphMPsInterests,
-        "lords_interests": graph_lords_interests.GraphLordsInterests,
-        "party_funding": graph_party_funding.GraphPartyFunding,
-        "prca": graph_prca.GraphPrca,
-        "appc": graph_appc.GraphAppc,
-        "meetings": graph_meetings.GraphMeetings,
+    # batched and sharded runs MERGE the same keys from many rows or
+    # processes at once, which is only safe and fast on a full schema.
+    # Plain runs skip the check and its two schema requests per key
+    if args.batch or args.workers > 1:
+        missing = schema.GraphSchema().missing()
+        for label, key in missing:
+            logger.error("No constraint or index on %s.%s" % (label, key))
+        if missing:
+            logger.error("Graph schema incomplete, run with --schema first")
+            sys.exit(1)
+    core.BaseDataModel.load_calendar(*(args.calendar or []))
+    grapher_settings = {
+        "commit_every": args.commit_every,
+        "batch": args.batch,
+        "vertex_cache": args.vertex_cache,
     }
     for grapher in args.graph:
-        exec_grapher[grapher]().run()
+        if args.workers > 1:
+            sharding.run_sharded(exec_grapher[grapher], args.workers, **grapher_settings)
+        else:
+            sharding.run_grapher(exec_grapher[grapher], **grapher_settings)
+
+# write graph bulk-import files
+if args.graph_export is not None:
+    graph_export.export(
+        [exec_grapher[grapher] for grapher in args.graph_export],
+        args.export_dir
+    )
 
 # populate node stat lists for api
 if args.api_gen is not None:
-    if "politicians" in args.api_gen:
-        api_data_gen.PopulatePoliticiansApi().run()
-        api_data_gen.PopulateMpsApi().run()
-        api_data_gen.PopulateLordsApi().run()
-    if "influencers" in args.api_gen:
-        api_data_gen.PopulateInfluencersApi().run()
-    if "government" in args.api_gen:
-        api_data_gen.PopulateCommitteesApi().run()
-        api_data_gen.PopulateDepartmentsApi().run()
-    if "parties" in args.api_gen:
-        api_data_gen.PopulatePoliticalPartyApi().run()
-    if "lobbyists" in args.api_gen:
-        api_data_gen.PopulateLobbyAgenciesApi().run()
+    names = None
+    if args.incremental:
+        changes = change_log.ChangeLog()
+        until = datetime.datetime.utcnow()
+        names = api_data_gen.changed_names(changes.pending(until))
+        logger.debug("%s entities changed" % len(names))
+    for group in args.api_gen:
+        for populator in api_data_gen.API_GROUPS[group]:
+            populator().run(args.workers, names=names)
+    if args.incremental:
+        changes.clear(until)
+
+# swap the previous api collections back in
+if args.api_rollback is not None:
+    for group in args.api_rollback:
+        for populator in api_data_gen.API_GROUPS[group]:
+            populator().rollback()
 
 
 # run export
@@ -122,3 +180,19 @@ if args.export is not None:
     if "named_entities" in args.export:
         model.named_entity_export()
 
+
+# write the ranked cypher profile
+if core.profiler.enabled:
+    core.profiler.write(
+        os.environ.get("SPUD_CYPHER_PROFILE_REPORT", "cypher_profile.txt")
+    )
+
+# report graph connection reuse
+logger.debug("graph pool: %s" % graph_database.GraphInterface.pool.stats())
+
+# report cypher statement reuse per template
+for entry in core.templates.report():
+    logger.debug(
+        "%-50s calls: %-8s reused: %-8s statements: %s" %
+        (entry["template"], entry["calls"], entry["reused"], entry["statements"])
+    )
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import unittest
+from data_models import core
+
+
+class FakeCypher:
+    def __init__(self):
+        self.statements = []
+        self.results = []
+
+    def execute(self, statement, parameters=None):
+        # answers with the queued results in order, then with no rows
+        self.statements.append((statement, parameters))
+        if self.results:
+            return self.results.pop(0)
+        return []
+
+
+class FakeSchema:
+    def __init__(self):
+        self.constraints = {}
+        self.indexes = {}
+
+    def get_uniqueness_constraints(self, label):
+        return self.constraints.get(label, [])
+
+    def get_indexes(self, label):
+        return self.indexes.get(label, [])
+
+
+class FakeGraph:
+    # stands in for a py2neo Graph, recording the statements it is sent
+    def __init__(self):
+        self.cypher = FakeCypher()
+        self.schema = FakeSchema()
+
+
+class FakeInterface:
+    def __init__(self, graph):
+        self.graph = graph
+
+
+class StoredNode:
+    # a vertex already in the graph, as py2neo hands it back
+    def __init__(self, node_id, labels=None, **properties):
+        self._id = node_id
+        self.labels = set(labels or [])
+        self.properties = properties
+
+    def __getitem__(self, item):
+        return self.properties.get(item)
+
+
+class FakeMongo:
+    # the parts of utils.mongo.MongoInterface the tests go through, over
+    # in-memory lists of documents
+    def __init__(self):
+        self.collections = {}
+        self.bulks = []
+
+    def count(self, _collection):
+        return len(self.collections.get(_collection, []))
+
+    def find(self, _collection, query):
+        return [
+            doc for doc in self.collections.get(_collection, [])
+            if self._matches(doc, query)
+        ]
+
+    def find_one(self, _collection, query):
+        for doc in self.collections.get(_collection, []):
+            if self._matches(doc, query):
+                return doc
+        return None
+
+    def save(self, _collection, doc):
+        self.remove(_collection, {"_id": doc["_id"]})
+        self.collections.setdefault(_collection, []).append(doc)
+
+    def update(self, _collection, query, update, upsert=False):
+        doc = self.find_one(_collection, query)
+        if doc is None:
+            if not upsert:
+                return
+            doc = dict(query)
+            self.collections.setdefault(_collection, []).append(doc)
+        if not any(key.startswith("$") for key in update):
+            # a plain document replaces everything but the _id
+            for key in list(doc):
+                if key != "_id":
+                    del doc[key]
+            doc.update(update)
+            return
+        doc.update(update.get("$set", {}))
+        for key, step in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + step
+
+    def insert_many(self, _collection, documents, write_concern=None):
+        self.bulks.append((_collection, len(documents), write_concern))
+        self.collections.setdefault(_collection, []).extend(documents)
+
+    def upsert_many(self, _collection, key, documents, write_concern=None):
+        self.bulks.append((_collection, len(documents), write_concern))
+        for document in documents:
+            self.update(
+                _collection, {key: document[key]}, document, upsert=True
+            )
+
+    def remove(self, _collection, query):
+        self.collections[_collection] = [
+            doc for doc in self.collections.get(_collection, [])
+            if not self._matches(doc, query)
+        ]
+
+    def drop(self, _collection):
+        self.collections.pop(_collection, None)
+
+    def exists(self, _collection):
+        return _collection in self.collections
+
+    def copy(self, _collection, new_name):
+        self.collections[new_name] = list(self.collections[_collection])
+
+    def rename(self, _collection, new_name):
+        self.collections[new_name] = self.collections.pop(_collection)
+
+    def create_index(self, _collection, key):
+        pass
+
+    @staticmethod
+    def _matches(doc, query):
+        for key, condition in query.items():
+            if isinstance(condition, dict):
+                if "$lte" in condition and not doc.get(key) <= condition["$lte"]:
+                    return False
+            elif doc.get(key) != condition:
+                return False
+        return True
+
+
+class GraphTestCase(unittest.TestCase):
+    # models built in a test talk to a FakeGraph, and the class-wide
+    # BaseDataModel state starts and ends empty
+    def setUp(self):
+        self.graph = FakeGraph()
+        self._interface = core.graph_database.GraphInterface
+        core.graph_database.GraphInterface = lambda: FakeInterface(self.graph)
+        self._reset()
+
+    def tearDown(self):
+        core.graph_database.GraphInterface = self._interface
+        self._reset()
+
+    @staticmethod
+    def _reset():
+        core.BaseDataModel.batch = None
+        core.BaseDataModel.session = None
+        core.BaseDataModel.vertex_cache = None
+        core.BaseDataModel.query_cache = None
+        core.BaseDataModel.change_log = None
+        core.BaseDataModel.counting = True
+
+    def statements(self, fragment):
+        return [
+            (statement, parameters)
+            for statement, parameters in self.graph.cypher.statements
+            if fragment in statement
+        ]
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+import unittest
+from data_interfaces import api_data_gen
+from tests.fakes import FakeMongo, GraphTestCase
+
+
+class PopulatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.interface = api_data_gen.mongo.MongoInterface
+        self.min_ratio = api_data_gen.config.api_min_ratio
+        api_data_gen.mongo.MongoInterface = FakeMongo
+        api_data_gen.config.api_min_ratio = 0.9
+        self.populator = api_data_gen.PopulateInfluencersApi()
+
+    def tearDown(self):
+        api_data_gen.mongo.MongoInterface = self.interface
+        api_data_gen.config.api_min_ratio = self.min_ratio
+
+
+class ValidateTest(PopulatorTestCase):
+    def _build(self, built, live, written=None):
+        self.populator.db.collections = {
+            self.populator.staging: [{}] * built,
+            self.populator.collection: [{}] * live,
+        }
+        self.populator.written = built if written is None else written
+
+    def test_accepts_a_build_as_large_as_live(self):
+        self._build(100, 100)
+        self.assertTrue(self.populator.validate())
+
+    def test_accepts_a_build_within_the_ratio(self):
+        self._build(90, 100)
+        self.assertTrue(self.populator.validate())
+
+    def test_rejects_a_build_below_the_ratio(self):
+        self._build(89, 100)
+        self.assertFalse(self.populator.validate())
+
+    def test_rejects_an_empty_build(self):
+        self._build(0, 0)
+        self.assertFalse(self.populator.validate())
+
+    def test_accepts_a_first_build(self):
+        self._build(10, 0)
+        self.assertTrue(self.populator.validate())
+
+    def test_rejects_lost_writes(self):
+        self._build(100, 100, written=101)
+        self.assertFalse(self.populator.validate())
+
+
+
+class PublishTest(PopulatorTestCase):
+    def test_publish_keeps_the_old_collection_aside(self):
+        self.populator.db.collections = {
+            self.populator.staging: [{"build": "new"}],
+            self.populator.collection: [{"build": "old"}],
+        }
+        self.populator.publish()
+        collections = self.populator.db.collections
+        self.assertEqual(
+            collections[self.populator.collection], [{"build": "new"}]
+        )
+        self.assertEqual(
+            collections[self.populator.previous], [{"build": "old"}]
+        )
+        self.assertNotIn(self.populator.staging, collections)
+
+    def test_rollback_swaps_the_previous_build_back(self):
+        self.populator.db.collections = {
+            self.populator.collection: [{"build": "new"}],
+            self.populator.previous: [{"build": "old"}],
+        }
+        self.assertTrue(self.populator.rollback())
+        collections = self.populator.db.collections
+        self.assertEqual(
+            collections[self.populator.collection], [{"build": "old"}]
+        )
+        self.assertEqual(
+            collections[self.populator.previous], [{"build": "new"}]
+        )
+
+    def test_nothing_to_roll_back_to(self):
+        self.populator.db.collections = {
+            self.populator.collection: [{"build": "new"}]
+        }
+        self.assertFalse(self.populator.rollback())
+
+
+class NamedPopulator(api_data_gen.PopulateApi):
+    collection = "api_test"
+
+
+class IncrementalTest(PopulatorTestCase):
+    def setUp(self):
+        PopulatorTestCase.setUp(self)
+        self.populator = NamedPopulator()
+        self.populator.records = lambda: iter([[u"a"], [u"b"], [u"c"]])
+        self.populator._get_stats = lambda record: self.populator.save(
+            {"name": record[0], "build": "new"}
+        )
+
+    def test_only_the_named_documents_are_rebuilt_in_place(self):
+        live = self.populator.collection
+        self.populator.db.collections = {live: [
+            {"name": u"a", "build": "old"}, {"name": u"c", "build": "old"}
+        ]}
+        self.populator.run(names=set([u"a", u"b"]))
+        documents = dict(
+            (doc["name"], doc["build"])
+            for doc in self.populator.db.collections[live]
+        )
+        self.assertEqual(documents, {u"a": "new", u"b": "new", u"c": "old"})
+        self.assertEqual(self.populator.written, 2)
+        self.assertNotIn(self.populator.staging, self.populator.db.collections)
+
+    def test_incremental_writes_are_one_bulk_of_upserts(self):
+        self.populator.bulk_size = 10
+        self.populator.run(names=set([u"a", u"b"]))
+        self.assertEqual(
+            self.populator.db.bulks,
+            [("api_test", 2, self.populator.write_concern)]
+        )
+
+    def test_no_names_builds_nothing(self):
+        self.populator.run(names=set())
+        self.assertEqual(self.populator.written, 0)
+        self.assertEqual(self.populator.db.collections, {})
+
+
+class BulkWriteTest(PopulatorTestCase):
+    def setUp(self):
+        PopulatorTestCase.setUp(self)
+        self.populator = NamedPopulator()
+        self.populator.bulk_size = 2
+        self.populator.records = lambda: iter(
+            [[u"doc %s" % i] for i in range(5)]
+        )
+        self.populator._get_stats = lambda record: self.populator.save(
+            {"name": record[0]}
+        )
+
+    def test_full_build_inserts_in_bulks_of_bulk_size(self):
+        self.populator.run()
+        self.assertEqual(
+            [size for _, size, _ in self.populator.db.bulks], [2, 2, 1]
+        )
+        self.assertEqual(
+            set(target for target, _, _ in self.populator.db.bulks),
+            set([self.populator.staging])
+        )
+        self.assertEqual(
+            self.populator.db.count(self.populator.collection), 5
+        )
+
+
+class PoliticianProfilesTest(PopulatorTestCase):
+    def setUp(self):
+        PopulatorTestCase.setUp(self)
+        self.populator = api_data_gen.PopulatePoliticianProfilesApi()
+        self.populator.begin()
+
+    def staged(self, projection):
+        return projection.db.collections.get(projection.staging, [])
+
+    def test_projections_write_to_their_own_staging(self):
+        self.populator.politicians.save({"name": u"a"})
+        self.populator.mps.save({"name": u"a"})
+        self.populator.flush()
+        self.assertEqual(len(self.staged(self.populator.politicians)), 1)
+        self.assertEqual(len(self.staged(self.populator.mps)), 1)
+        self.assertEqual(len(self.staged(self.populator.lords)), 0)
+
+    def test_worker_documents_are_tagged_and_routed_back(self):
+        sent = []
+        self.populator.sink = sent.append
+        self.populator.lords.save({"name": u"b"})
+        self.assertEqual(sent, [("api_lords", {"name": u"b"})])
+        self.populator.sink = None
+        self.populator.write(sent[0])
+        self.populator.flush()
+        self.assertEqual(self.populator.written, 1)
+        self.assertEqual(self.staged(self.populator.lords), [{"name": u"b"}])
+        self.assertEqual(self.staged(self.populator.mps), [])
+
+    def test_each_projection_validates_and_publishes_alone(self):
+        self.populator.politicians.save({"name": u"a"})
+        self.populator.finish()
+        collections = self.populator.politicians.db.collections
+        self.assertEqual(collections["api_politicians"], [{"name": u"a"}])
+        self.assertNotIn("api_mps", self.populator.mps.db.collections)
+
+
+class ChangedNamesTest(GraphTestCase):
+    def test_touched_nodes_add_the_entities_they_hang_off(self):
+        self.graph.cypher.results = [[[u"Acme"]]]
+        names = api_data_gen.changed_names({
+            ("Named Entity", "name"): set([u"Lord Acme"]),
+            ("Donation", "donation"): set([u"d1"])
+        })
+        self.assertEqual(names, set([u"Lord Acme", u"Acme"]))
+        statements = self.graph.cypher.statements
+        self.assertEqual(len(statements), 1)
+        self.assertIn(u"MATCH (x:`Donation`) WHERE x.`donation` IN",
+                      statements[0][0])
+        self.assertEqual(statements[0][1], {"values": [u"d1"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
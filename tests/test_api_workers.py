@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import unittest
+from data_interfaces import api_workers
+from data_interfaces import api_data_gen
+from tests.fakes import FakeMongo
+
+
+class FakePopulator(api_data_gen.PopulateApi):
+    # twelve records in pages of five; the page holding "bad" fails
+    collection = "api_fake"
+    page_size = 5
+    records_list = [[u"doc %s" % i] for i in range(12)]
+
+    def records(self):
+        return iter(self.records_list)
+
+    def build(self, docs):
+        for doc in docs:
+            if doc[0] == u"bad":
+                raise ValueError(doc[0])
+            self.save({"_id": doc[0]})
+
+
+class FailingPopulator(FakePopulator):
+    records_list = FakePopulator.records_list + [[u"bad"]]
+
+
+class RunParallelTest(unittest.TestCase):
+    def setUp(self):
+        self.interface = api_data_gen.mongo.MongoInterface
+        api_data_gen.mongo.MongoInterface = FakeMongo
+
+    def tearDown(self):
+        api_data_gen.mongo.MongoInterface = self.interface
+
+    def written(self, populator):
+        return sorted(
+            doc["_id"] for doc in
+            populator.db.collections.get(populator.collection, [])
+        )
+
+    def test_workers_documents_are_written_by_the_parent(self):
+        populator = FakePopulator()
+        written = api_workers.run_parallel(populator, 3, queue_size=2)
+        self.assertEqual(written, 12)
+        populator.flush()
+        self.assertEqual(
+            self.written(populator),
+            sorted(doc[0] for doc in FakePopulator.records_list)
+        )
+
+    def test_a_failed_page_raises_after_the_rest_are_built(self):
+        populator = FailingPopulator()
+        self.assertRaises(
+            RuntimeError, api_workers.run_parallel, populator, 2
+        )
+        populator.flush()
+        # documents built before the failure on that page still arrive
+        self.assertEqual(len(self.written(populator)), 12)
+
+    def test_serial_run_builds_every_page(self):
+        populator = FakePopulator()
+        populator.run()
+        self.assertEqual(len(self.written(populator)), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
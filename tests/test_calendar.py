@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from data_models import core
+from tests.fakes import FakeCypher, GraphTestCase, StoredNode
+
+
+class CalendarCypher(FakeCypher):
+    # answers the calendar_days MERGE with an id per day, as Neo4j would
+    def __init__(self):
+        FakeCypher.__init__(self)
+        self.ids = {}
+
+    def execute(self, statement, parameters=None):
+        if u"UNWIND {years}" not in statement:
+            return FakeCypher.execute(self, statement, parameters)
+        self.statements.append((statement, parameters))
+        rows = []
+        for year in parameters["years"]:
+            for month in year["months"]:
+                for day in month["days"]:
+                    key = (year["year"], month["month"], day)
+                    node_id = self.ids.setdefault(key, len(self.ids) + 1)
+                    rows.append({
+                        "year": key[0], "month": key[1], "day": key[2],
+                        "id": node_id
+                    })
+        return rows
+
+
+class DateIndexTest(GraphTestCase):
+    def setUp(self):
+        GraphTestCase.setUp(self)
+        self.graph.cypher = CalendarCypher()
+        core.BaseDataModel.date_index = core.DateIndex(self.graph)
+
+    def tearDown(self):
+        core.BaseDataModel.date_index = None
+        GraphTestCase.tearDown(self)
+
+    def calendar_statements(self):
+        return self.statements(u"UNWIND {years}")
+
+    def test_each_day_is_merged_once(self):
+        index = core.BaseDataModel.date_index
+        first = index.day(2014, 3, 1)
+        self.assertEqual(index.day(2014, 3, 1)._id, first._id)
+        self.assertEqual(len(self.calendar_statements()), 1)
+
+    def test_preload_merges_a_year_per_statement(self):
+        index = core.BaseDataModel.date_index
+        index.preload(2012, 2013)
+        self.assertEqual(len(index), 366 + 365)
+        self.assertEqual(len(self.calendar_statements()), 2)
+        index.day(2013, 12, 31)
+        self.assertEqual(len(self.calendar_statements()), 2)
+
+    def test_invalid_dates_are_skipped(self):
+        index = core.BaseDataModel.date_index
+        self.assertEqual(index.day(2014, 2, 30), None)
+        self.assertEqual(self.calendar_statements(), [])
+
+    def test_days_outside_the_preload_are_merged_on_demand(self):
+        index = core.BaseDataModel.date_index
+        index.preload(2014, 2014)
+        self.assertTrue(index.day(2015, 3, 1) is not None)
+        statements = self.calendar_statements()
+        self.assertEqual(len(statements), 2)
+        self.assertEqual(statements[1][1], {"years": [
+            {"year": 2015, "months": [{"month": 3, "days": [1]}]}
+        ]})
+
+    def test_the_calendar_root_is_locked_before_days_are_merged(self):
+        core.BaseDataModel.date_index.day(2014, 3, 1)
+        statement = self.calendar_statements()[0][0]
+        lock = statement.index(u"SET calendar._lock = true")
+        self.assertTrue(lock < statement.index(u"MERGE (calendar)-[:YEAR]"))
+
+    def test_set_date_links_the_cached_day(self):
+        core.BaseDataModel.batch = core.BatchWriter(self.graph)
+        model = core.BaseDataModel()
+        model.vertex = StoredNode(1, ["Donation"])
+        model.set_date("2014-03-01", "RECEIVED")
+        model.set_date("03/01/2014", "REPORTED")
+        relationships = core.BaseDataModel.batch._relationships
+        self.assertEqual(
+            [(relationship, day._id, counted)
+             for _, relationship, day, counted in relationships],
+            [("RECEIVED", 1, False), ("REPORTED", 1, False)]
+        )
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import datetime
+import unittest
+from data_interfaces.change_log import ChangeLog
+from data_models import core
+from tests.fakes import FakeGraph, FakeMongo, StoredNode
+
+
+class ChangeLogTest(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeMongo()
+        self.log = ChangeLog(self.db)
+
+    def test_pending_groups_values_by_label_and_key(self):
+        writer = core.BatchWriter(FakeGraph())
+        self.log.touch(writer.merge_vertex("Donor", "name", "a"))
+        self.log.touch(writer.merge_vertex("Donation", "donation", "d1"))
+        donor = StoredNode(3)
+        self.log.record(donor, "Donor", "name", "b")
+        self.log.touch(donor)
+        self.log.flush()
+        pending = self.log.pending(datetime.datetime.utcnow())
+        self.assertEqual(pending, {
+            ("Donor", "name"): set(["a", "b"]),
+            ("Donation", "donation"): set(["d1"])
+        })
+
+    def test_unknown_vertices_are_not_logged(self):
+        self.log.touch(core.NodeRef(7, "Day"))
+        self.log.flush()
+        self.assertEqual(self.db.count(ChangeLog.COLLECTION), 0)
+
+    def test_touching_twice_logs_once(self):
+        writer = core.BatchWriter(FakeGraph())
+        vertex = writer.merge_vertex("Donor", "name", "a")
+        self.log.touch(vertex)
+        self.log.touch(vertex)
+        self.log.flush()
+        self.assertEqual(self.db.count(ChangeLog.COLLECTION), 1)
+
+    def test_clear_keeps_later_changes(self):
+        writer = core.BatchWriter(FakeGraph())
+        self.log.touch(writer.merge_vertex("Donor", "name", "a"))
+        self.log.flush()
+        until = datetime.datetime.utcnow()
+        self.db.update(
+            ChangeLog.COLLECTION, {"_id": u"Donor:name:b"},
+            {"$set": {
+                "label": "Donor", "key": "name", "value": "b",
+                "touched": until + datetime.timedelta(seconds=1)
+            }},
+            upsert=True
+        )
+        self.log.clear(until)
+        self.assertEqual(self.log.pending(until), {})
+        later = until + datetime.timedelta(seconds=2)
+        self.assertEqual(
+            self.log.pending(later), {("Donor", "name"): set(["b"])}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+import unittest
+from data_models import core
+from tests.fakes import FakeGraph, GraphTestCase, StoredNode
+
+
+class BatchWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = FakeGraph()
+        self.writer = core.BatchWriter(self.graph, batch_size=100)
+
+    def statements(self, fragment):
+        return [
+            (statement, parameters["rows"])
+            for statement, parameters in self.graph.cypher.statements
+            if fragment in statement
+        ]
+
+    def test_merging_the_same_vertex_twice_queues_it_once(self):
+        first = self.writer.merge_vertex("Donor", "name", "a")
+        second = self.writer.merge_vertex("Donor", "name", "a")
+        self.assertIs(first, second)
+        self.assertEqual(self.writer.pending(), 1)
+
+    def test_vertices_of_one_label_go_out_in_one_statement(self):
+        for name in ["a", "b", "c"]:
+            self.writer.merge_vertex("Donor", "name", name)
+        self.writer.merge_vertex("Lord", "name", "d")
+        self.writer.flush()
+        merges = self.statements("MERGE (v:")
+        self.assertEqual(len(merges), 2)
+        self.assertIn(
+            [{"value": "a"}, {"value": "b"}, {"value": "c"}],
+            [rows for _, rows in merges]
+        )
+        self.assertEqual(self.writer.pending(), 0)
+
+    def test_relationships_between_queued_and_stored_vertices(self):
+        donor = self.writer.merge_vertex("Donor", "name", "a")
+        party = StoredNode(7, ["Political Party"], name="p")
+        self.writer.merge_relationship(donor, "FUNDED", party)
+        self.writer.merge_relationship(
+            self.writer.merge_vertex("Donor", "name", "b"), "FUNDED", party
+        )
+        self.writer.flush()
+        relationships = self.statements("MERGE (a)-[")
+        self.assertEqual(len(relationships), 1)
+        statement, rows = relationships[0]
+        self.assertIn(u"MATCH (a:`Donor` {`name`: row.a})", statement)
+        self.assertIn(u"MATCH (b) WHERE id(b) = row.b", statement)
+        self.assertEqual(rows, [{"a": "a", "b": 7}, {"a": "b", "b": 7}])
+
+    def test_resolve_reapplies_queued_writes_to_a_stored_node(self):
+        node = StoredNode(3, ["Donor"], name="a")
+        self.writer.set_properties(node, {"donor_type": "Company"}, "Named Entity")
+        fetched = StoredNode(3, ["Donor"], name="a")
+        self.writer.resolve(fetched)
+        self.assertEqual(fetched["donor_type"], "Company")
+        self.assertIn("Named Entity", fetched.labels)
+
+    def test_property_writes_to_one_vertex_coalesce(self):
+        vertex = self.writer.merge_vertex("Donor", "name", "a")
+        self.writer.set_properties(vertex, {"x": 1}, "Named Entity")
+        self.writer.set_properties(vertex, {"y": 2}, ["Donor"])
+        self.assertEqual(self.writer.pending(), 2)
+        self.writer.flush()
+        sets = self.statements("SET v += row.properties")
+        self.assertEqual(len(sets), 1)
+        statement, rows = sets[0]
+        self.assertIn(u"SET v:`Donor`:`Named Entity`", statement)
+        self.assertEqual(rows, [{"v": "a", "properties": {"x": 1, "y": 2}}])
+
+    def test_flushes_when_full(self):
+        writer = core.BatchWriter(self.graph, batch_size=2)
+        writer.merge_vertex("Donor", "name", "a")
+        self.assertEqual(self.graph.cypher.statements, [])
+        writer.merge_vertex("Donor", "name", "b")
+        self.assertEqual(len(self.graph.cypher.statements), 1)
+        self.assertEqual(writer.pending(), 0)
+
+
+class SetNodePropertiesTest(GraphTestCase):
+    def test_one_parameterised_statement_per_call(self):
+        model = core.BaseDataModel()
+        model.vertex = StoredNode(5, ["Donor"], name="a")
+        model.set_node_properties({"donor_type": "Company"}, "Named Entity")
+        statement, parameters = self.graph.cypher.statements[-1]
+        self.assertIn(u"SET v:`Named Entity`", statement)
+        self.assertEqual(
+            parameters, {"id": 5, "properties": {"donor_type": "Company"}}
+        )
+        self.assertEqual(model.vertex["donor_type"], "Company")
+        self.assertIn("Named Entity", model.vertex.labels)
+
+    def test_batched_calls_are_queued(self):
+        core.BaseDataModel.batch = core.BatchWriter(self.graph)
+        model = core.BaseDataModel()
+        model.vertex = core.BaseDataModel.batch.merge_vertex("Donor", "name", "a")
+        model.set_node_properties({"x": 1})
+        model.set_node_properties({"y": 2})
+        self.assertEqual(self.graph.cypher.statements, [])
+        self.assertEqual(core.BaseDataModel.batch.pending(), 2)
+
+
+class BatchedCreateVertexTest(GraphTestCase):
+    def setUp(self):
+        GraphTestCase.setUp(self)
+        core.BaseDataModel.batch = core.BatchWriter(self.graph)
+
+    def test_merges_are_queued(self):
+        model = core.BaseDataModel()
+        vertex = model.create_vertex("Donor", "name", u"a")
+        self.assertTrue(isinstance(vertex, core.VertexRef))
+        self.assertEqual(core.BaseDataModel.batch.pending(), 1)
+
+    def test_plain_creates_are_refused(self):
+        model = core.BaseDataModel()
+        self.assertRaises(
+            ValueError, model.create_vertex, "Donation", "donation", u"d1",
+            merge=False
+        )
+        self.assertEqual(core.BaseDataModel.batch.pending(), 0)
+        self.assertEqual(self.graph.cypher.statements, [])
+
+
+class VertexCacheTest(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = core.VertexCache(size=2)
+        cache.put("Donor", "name", "a", "vertex a")
+        cache.put("Donor", "name", "b", "vertex b")
+        cache.get("Donor", "name", "a")
+        cache.put("Donor", "name", "c", "vertex c")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("Donor", "name", "a"), "vertex a")
+        self.assertIsNone(cache.get("Donor", "name", "b"))
+        self.assertEqual(cache.get("Donor", "name", "c"), "vertex c")
+
+    def test_put_refreshes_an_existing_entry(self):
+        cache = core.VertexCache(size=2)
+        cache.put("Donor", "name", "a", "old a")
+        cache.put("Donor", "name", "b", "vertex b")
+        cache.put("Donor", "name", "a", "new a")
+        cache.put("Donor", "name", "c", "vertex c")
+        self.assertEqual(cache.get("Donor", "name", "a"), "new a")
+        self.assertIsNone(cache.get("Donor", "name", "b"))
+
+    def test_invalidate_by_label_and_key(self):
+        cache = core.VertexCache()
+        cache.put("Donor", "name", "a", "donor a")
+        cache.put("Donor", "ec_id", "1", "donor 1")
+        cache.put("Lord", "name", "a", "lord a")
+        cache.invalidate("Donor", "name")
+        self.assertIsNone(cache.get("Donor", "name", "a"))
+        self.assertEqual(cache.get("Donor", "ec_id", "1"), "donor 1")
+        cache.invalidate("Donor")
+        self.assertIsNone(cache.get("Donor", "ec_id", "1"))
+        self.assertEqual(cache.get("Lord", "name", "a"), "lord a")
+
+
+class CachedMergeTest(GraphTestCase):
+    def setUp(self):
+        GraphTestCase.setUp(self)
+        core.BaseDataModel.vertex_cache = core.VertexCache()
+
+    def test_merging_a_cached_key_skips_the_round_trip(self):
+        self.graph.cypher.results = [[[StoredNode(1)]]]
+        model = core.BaseDataModel()
+        first = model.create_vertex("Donor", "name", u"a")
+        self.assertTrue(model.create_vertex("Donor", "name", u"a") is first)
+        self.assertEqual(len(self.graph.cypher.statements), 1)
+
+    def test_plain_creates_always_reach_the_graph(self):
+        self.graph.cypher.results = [[[StoredNode(1)]], [[StoredNode(2)]]]
+        model = core.BaseDataModel()
+        model.create_vertex("Donation", "donation", u"d1", merge=False)
+        model.create_vertex("Donation", "donation", u"d1", merge=False)
+        self.assertEqual(len(self.graph.cypher.statements), 2)
+
+
+class PagesTest(unittest.TestCase):
+    def test_splits_into_pages(self):
+        self.assertEqual(
+            list(core.pages(range(7), 3)), [[0, 1, 2], [3, 4, 5], [6]]
+        )
+
+    def test_exact_multiple_has_no_empty_page(self):
+        self.assertEqual(list(core.pages(range(4), 2)), [[0, 1], [2, 3]])
+
+    def test_empty_iterable(self):
+        self.assertEqual(list(core.pages(iter([]), 5)), [])
+
+
+class KeysetPagingTest(GraphTestCase):
+    def test_pages_continue_after_the_last_id(self):
+        self.graph.cypher.results = [
+            [{"id": 3}, {"id": 8}], [{"id": 9}, {"id": 12}], [{"id": 15}]
+        ]
+        model = core.BaseDataModel()
+        rows = list(model._paged(u"MATCH (n) RETURN id(n) AS id", "t", 2))
+        self.assertEqual([row["id"] for row in rows], [3, 8, 9, 12, 15])
+        self.assertEqual(
+            [parameters for _, parameters in self.graph.cypher.statements],
+            [
+                {"after": -1, "size": 2}, {"after": 8, "size": 2},
+                {"after": 12, "size": 2}
+            ]
+        )
+
+    def test_a_full_last_page_costs_one_empty_query(self):
+        self.graph.cypher.results = [[{"id": 3}, {"id": 8}]]
+        model = core.BaseDataModel()
+        rows = list(model._paged(u"MATCH (n) RETURN id(n) AS id", "t", 2))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(len(self.graph.cypher.statements), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
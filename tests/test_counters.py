@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import re
+import unittest
+from data_models import core
+from tests.fakes import FakeCypher, GraphTestCase, StoredNode
+
+
+class MergingCypher(FakeCypher):
+    # runs create_relationship's MERGE and counter clauses against
+    # in-memory nodes, closely enough to tell whether a repeated MERGE
+    # counts twice or leaves its marker properties behind
+    FOREACH = re.compile(
+        r"FOREACH \(new IN CASE WHEN r\._new THEN \[1\] ELSE \[\] END "
+        r"\| (.*)\)"
+    )
+    ASSIGNMENT = re.compile(
+        r"(\w+)\.`?(\w+)`? = (?:coalesce\(\w+\.`?\w+`?, 0\) \+ 1|true)"
+    )
+
+    def __init__(self):
+        FakeCypher.__init__(self)
+        self.nodes = {}
+        self.relationships = set()
+
+    def execute(self, statement, parameters=None):
+        FakeCypher.execute(self, statement, parameters)
+        relationship = re.search(r"MERGE \(n\)-\[r:`(\w+)`\]-\(m\)", statement)
+        if relationship is None:
+            return []
+        bound = {
+            "n": self.nodes.setdefault(parameters["n"], {}),
+            "m": self.nodes.setdefault(parameters["m"], {}),
+            "r": {}
+        }
+        key = (relationship.group(1),
+               frozenset([parameters["n"], parameters["m"]]))
+        if key not in self.relationships:
+            self.relationships.add(key)
+            if u"ON CREATE SET r._new = true" in statement:
+                bound["r"]["_new"] = True
+        for body in self.FOREACH.findall(statement):
+            if not bound["r"].get("_new"):
+                continue
+            assignments, _, removals = body.partition(u" REMOVE ")
+            for name, prop in self.ASSIGNMENT.findall(assignments):
+                if prop == "_lock":
+                    bound[name][prop] = True
+                else:
+                    bound[name][prop] = bound[name].get(prop, 0) + 1
+            for name, prop in re.findall(r"(\w+)\.(\w+)", removals):
+                bound[name].pop(prop, None)
+        return []
+
+
+class CountRelationshipTest(unittest.TestCase):
+    def test_counters_only_change_when_the_relationship_is_new(self):
+        clause = core.count_relationship("a", "b", "FUNDED")
+        self.assertTrue(clause.startswith(u"ON CREATE SET r._new = true"))
+        self.assertNotIn(u"ON MATCH", clause)
+        self.assertIn(u"CASE WHEN r._new THEN [1] ELSE [] END", clause)
+        self.assertIn(u"REMOVE r._new, a._lock, b._lock", clause)
+        for counter in [
+            u"a.`weight` = coalesce(a.`weight`, 0) + 1",
+            u"a.`degree_FUNDED` = coalesce(a.`degree_FUNDED`, 0) + 1",
+            u"b.`weight` = coalesce(b.`weight`, 0) + 1",
+            u"b.`degree_FUNDED` = coalesce(b.`degree_FUNDED`, 0) + 1"
+        ]:
+            self.assertIn(counter, clause)
+
+    def test_endpoints_are_locked_before_the_counters_are_read(self):
+        clause = core.count_relationship("a", "b", "FUNDED")
+        lock = clause.index(u"SET a._lock = true, b._lock = true")
+        self.assertTrue(lock < clause.index(u"a.`weight` = coalesce"))
+
+    def test_degree_sums_the_named_types(self):
+        self.assertEqual(
+            core.degree("n", "HIRED", "MET"),
+            u"coalesce(n.`degree_HIRED`, 0) + coalesce(n.`degree_MET`, 0)"
+        )
+
+
+class CountedMergeTest(GraphTestCase):
+    def test_relationship_merges_carry_the_counters(self):
+        model = core.BaseDataModel()
+        a, b = StoredNode(1), StoredNode(2)
+        model.create_relationship(a, "FUNDED", b)
+        model.create_relationship(a, "FUNDED", b)
+        statements = self.statements(u"MERGE (n)-[r:`FUNDED`]-(m)")
+        self.assertEqual(len(statements), 2)
+        for statement, parameters in statements:
+            self.assertIn(core.count_relationship("n", "m", "FUNDED"),
+                          statement)
+            self.assertEqual(parameters, {"n": 1, "m": 2})
+
+    def test_merging_the_same_relationship_twice_counts_once(self):
+        self.graph.cypher = MergingCypher()
+        model = core.BaseDataModel()
+        a, b = StoredNode(1), StoredNode(2)
+        model.create_relationship(a, "FUNDED", b)
+        model.create_relationship(a, "FUNDED", b)
+        model.create_relationship(b, "FUNDED", a)
+        model.create_relationship(a, "HIRED", b)
+        for node_id in (1, 2):
+            self.assertEqual(self.graph.cypher.nodes[node_id], {
+                "weight": 2, "degree_FUNDED": 1, "degree_HIRED": 1
+            })
+
+    def test_shards_leave_the_counters_alone(self):
+        core.BaseDataModel.counting = False
+        core.BaseDataModel().create_relationship(
+            StoredNode(1), "FUNDED", StoredNode(2)
+        )
+        statement = self.statements(u"MERGE (n)-[r:`FUNDED`]-(m)")[0][0]
+        self.assertNotIn(u"_lock", statement)
+        self.assertNotIn(u"weight", statement)
+
+    def test_batched_merges_carry_the_counters(self):
+        writer = core.BatchWriter(self.graph)
+        writer.merge_relationship(StoredNode(1), "FUNDED", StoredNode(2))
+        writer.flush()
+        statements = self.statements(u"MERGE (a)-[r:`FUNDED`]-(b)")
+        self.assertEqual(len(statements), 1)
+        self.assertIn(core.count_relationship("a", "b", "FUNDED"),
+                      statements[0][0])
+
+    def test_uncounted_merges_leave_the_counters_alone(self):
+        writer = core.BatchWriter(self.graph)
+        writer.merge_relationship(StoredNode(1), "RECEIVED", StoredNode(2),
+                                  counted=False)
+        writer.flush()
+        statements = self.statements(u"MERGE (a)-[r:`RECEIVED`]-(b)")
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn(u"_lock", statements[0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
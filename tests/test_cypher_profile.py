@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import unittest
+from data_interfaces.graph_database import GraphInterface
+from data_models import core
+from tests.fakes import GraphTestCase
+
+
+class CypherProfileTest(unittest.TestCase):
+    def test_report_ranks_by_db_hits(self):
+        profile = core.CypherProfile(True)
+        profile.record("a", "m.f", u"MATCH (n)\n RETURN n", 10, 1, 0.5)
+        profile.record("b", "m.g", u"MATCH (n) RETURN n", 30, 2, 0.1)
+        profile.record("a", "m.f", u"MATCH (n)\n RETURN n", 5, 3, 0.25)
+        report = profile.report()
+        self.assertEqual([stats["template"] for stats in report], ["b", "a"])
+        self.assertEqual(report[1]["calls"], 2)
+        self.assertEqual(report[1]["db_hits"], 15)
+        self.assertEqual(report[1]["rows"], 4)
+        self.assertEqual(report[1]["statement"], u"MATCH (n) RETURN n")
+
+    def test_db_hits_are_summed_over_the_plan(self):
+        plan = {"dbHits": 2, "children": [
+            {"args": {"DbHits": 5}, "children": []},
+            {"dbHits": 1, "children": [{"dbHits": 4}]}
+        ]}
+        self.assertEqual(GraphInterface._db_hits(plan), 12)
+        self.assertEqual(GraphInterface._db_hits(None), 0)
+
+
+class ProfiledQueryTest(GraphTestCase):
+    def setUp(self):
+        GraphTestCase.setUp(self)
+        self._profiler = core.profiler
+        core.profiler = core.CypherProfile(True)
+
+    def tearDown(self):
+        core.profiler = self._profiler
+        GraphTestCase.tearDown(self)
+
+    def test_reads_run_under_profile_and_record_the_caller(self):
+        model = core.BaseDataModel()
+        profiled = []
+
+        def profile(statement, parameters):
+            profiled.append(statement)
+            return [[u"Acme"]], 7
+        model.g.profile = profile
+        output = model.query(u"MATCH (n) RETURN n.name", "names")
+        self.assertEqual(output, [[u"Acme"]])
+        self.assertEqual(profiled, [u"MATCH (n) RETURN n.name"])
+        stats = core.profiler.report()[0]
+        self.assertEqual(stats["template"], "names")
+        self.assertEqual(stats["db_hits"], 7)
+        self.assertEqual(stats["rows"], 1)
+        self.assertEqual(
+            stats["caller"].split(".")[0], "test_cypher_profile"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import unittest
+from data_interfaces.graph_export import ExportWriter
+from data_models import core
+from tests.fakes import GraphTestCase
+
+
+class CapturingWriter(ExportWriter):
+    # keeps what would be written to each CSV file
+    def __init__(self):
+        ExportWriter.__init__(self)
+        self.files = {}
+
+    def _write(self, directory, kind, name, header, rows):
+        self.files[(kind, name)] = [header] + list(rows)
+        return name
+
+
+class ExportWriterTest(GraphTestCase):
+    def setUp(self):
+        GraphTestCase.setUp(self)
+        self.writer = CapturingWriter()
+
+    def test_node_ids_are_stable_across_exports(self):
+        first = self.writer.merge_vertex("Donor", "name", u"Ó Cuív")
+        second = ExportWriter().merge_vertex("Donor", "name", u"Ó Cuív")
+        self.assertEqual(
+            ExportWriter.node_id(first), ExportWriter.node_id(second)
+        )
+        self.assertEqual(len(ExportWriter.node_id(first)), 40)
+
+    def test_node_ids_differ_by_label_and_value(self):
+        ids = set(
+            ExportWriter.node_id(self.writer.merge_vertex(label, "name", v))
+            for label in ["Donor", "Lord"] for v in [u"a", u"b"]
+        )
+        self.assertEqual(len(ids), 4)
+
+    def test_relationships_are_written_once_in_either_direction(self):
+        a = self.writer.merge_vertex("Donor", "name", u"a")
+        b = self.writer.merge_vertex("Donor", "name", u"b")
+        self.writer.merge_relationship(a, "FUNDED", b)
+        self.writer.merge_relationship(b, "FUNDED", a)
+        self.writer.merge_relationship(a, "MET", b)
+        self.writer.write("unused")
+        funded = self.writer.files[("relationships", "FUNDED")]
+        self.assertEqual(funded[0], [u":START_ID", u":END_ID", u":TYPE"])
+        self.assertEqual(
+            funded[1:], [(ExportWriter.node_id(a), ExportWriter.node_id(b),
+                          "FUNDED")]
+        )
+        self.assertEqual(len(self.writer.files[("relationships", "MET")]), 2)
+
+    def test_nodes_carry_labels_and_typed_columns(self):
+        a = self.writer.merge_vertex("Donor", "name", u"a")
+        self.writer.set_properties(a, {"amount": 5}, ["Named Entity"])
+        self.writer.write("unused")
+        header, row = self.writer.files[("nodes", "Donor")]
+        self.assertEqual(header, [u"id:ID", u":LABEL", u"amount:long",
+                                  u"name"])
+        self.assertEqual(
+            row, [ExportWriter.node_id(a), u"Donor;Named Entity", u"5", u"a"]
+        )
+
+    def test_reads_return_nothing_while_exporting(self):
+        core.BaseDataModel.batch = self.writer
+        output = core.BaseDataModel().query(u"MATCH (n) RETURN n", "read")
+        self.assertEqual(output, [])
+        self.assertEqual(self.graph.cypher.statements, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
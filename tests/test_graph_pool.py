@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import unittest
+from data_interfaces import graph_database
+from data_interfaces.graph_database import ConnectionPuddle, GraphPool
+
+http = graph_database.http
+
+
+class GraphPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.puddle_class = http.ConnectionPuddle
+        self.puddles = http.ConnectionPool._puddles
+        self.pool = GraphPool("http://localhost:7474/db/data/", size=2)
+
+    def tearDown(self):
+        http.ConnectionPuddle = self.puddle_class
+        http.ConnectionPool._puddles = self.puddles
+
+    def test_one_handle_per_process(self):
+        self.assertTrue(self.pool.acquire() is self.pool.acquire())
+
+    def test_a_new_process_drops_inherited_connections(self):
+        parent = self.pool.acquire()
+        http.ConnectionPool._puddles = {"h": object()}
+        # as seen from a forked child
+        self.pool._pid = -1
+        child = self.pool.acquire()
+        self.assertFalse(child is parent)
+        self.assertEqual(http.ConnectionPool._puddles, {})
+
+    def test_httpstream_connections_come_from_the_pool(self):
+        self.pool.acquire()
+        connection = http.ConnectionPool.acquire("http", "localhost:7474")
+        puddle = http.ConnectionPool._puddles[("http", "localhost:7474")]
+        self.assertTrue(isinstance(puddle, ConnectionPuddle))
+        self.assertEqual(puddle.active, [connection])
+        self.assertEqual(self.pool.stats()["connections"], 1)
+
+    def test_an_unknown_httpstream_is_left_alone(self):
+        patched = graph_database.PATCHED_HTTPSTREAM
+        graph_database.PATCHED_HTTPSTREAM = patched + [(http, "Missing")]
+        try:
+            http.ConnectionPuddle = self.puddle_class
+            self.pool.acquire()
+        finally:
+            graph_database.PATCHED_HTTPSTREAM = patched
+        self.assertTrue(http.ConnectionPuddle is self.puddle_class)
+
+
+class HttpstreamContractTest(unittest.TestCase):
+    # the pinned py2neo's httpstream still has everything GraphPool patches
+    def test_patched_attributes_exist(self):
+        for owner, name in graph_database.PATCHED_HTTPSTREAM:
+            self.assertTrue(hasattr(owner, name), name)
+        self.assertTrue(graph_database.httpstream_patchable())
+
+    def test_puddles_are_kept_per_scheme_and_host(self):
+        self.assertTrue(isinstance(http.ConnectionPool._puddles, dict))
+
+
+class ConnectionPuddleTest(unittest.TestCase):
+    def setUp(self):
+        ConnectionPuddle.idle = 1
+        ConnectionPuddle.opened = 0
+        ConnectionPuddle.reused = 0
+        self.puddle = ConnectionPuddle("http", "localhost:7474")
+
+    def test_released_connections_are_reused(self):
+        first = self.puddle.acquire()
+        self.puddle.release(first)
+        self.assertTrue(self.puddle.acquire() is first)
+        self.assertEqual(
+            (ConnectionPuddle.opened, ConnectionPuddle.reused), (1, 1)
+        )
+
+    def test_idle_connections_are_capped(self):
+        first, second = self.puddle.acquire(), self.puddle.acquire()
+        self.puddle.release(first)
+        self.puddle.release(second)
+        self.assertEqual(self.puddle.size, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import unittest
+from py2neo.cypher import CypherTransactionError
+from data_interfaces.graph_database import GraphSession
+
+
+def cypher_error(code):
+    error = CypherTransactionError.__new__(CypherTransactionError)
+    error.code = code
+    return error
+
+
+class FakeTransaction:
+    def __init__(self, graph):
+        self.graph = graph
+        self.statements = []
+
+    def append(self, statement, parameters):
+        self.statements.append(statement)
+
+    def process(self):
+        return [[]]
+
+    def commit(self):
+        if self.graph.failures:
+            raise self.graph.failures.pop(0)
+        self.graph.committed.append(self.statements)
+
+    def rollback(self):
+        self.graph.rolled_back.append(self.statements)
+
+
+class TransactionalCypher:
+    def __init__(self, graph):
+        self.graph = graph
+
+    def begin(self):
+        return FakeTransaction(self.graph)
+
+
+class TransactionalGraph:
+    def __init__(self, *failures):
+        self.cypher = TransactionalCypher(self)
+        self.failures = list(failures)
+        self.committed = []
+        self.rolled_back = []
+
+
+class GraphSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.discarded = 0
+
+    def _session(self, graph, size=100):
+        def discard():
+            self.discarded += 1
+        return GraphSession(graph, size, backoff=0, on_rollback=discard)
+
+    def test_commits_every_size_statements(self):
+        graph = TransactionalGraph()
+        session = self._session(graph, size=2)
+        for doc in ["a", "b", "c"]:
+            session.run(session.execute, doc)
+        session.close()
+        self.assertEqual(graph.committed, [["a", "b"], ["c"]])
+
+    def test_transient_failure_replays_work_since_last_commit(self):
+        graph = TransactionalGraph(
+            cypher_error("Neo.TransientError.Transaction.DeadlockDetected")
+        )
+        session = self._session(graph)
+        session.run(session.execute, "a")
+        session.run(session.execute, "b")
+        session.close()
+        self.assertEqual(graph.rolled_back, [["a", "b"]])
+        self.assertEqual(graph.committed, [["a", "b"]])
+        self.assertEqual(self.discarded, 1)
+        self.assertEqual((session.commits, session.rollbacks), (1, 1))
+
+    def test_other_failures_roll_back_and_raise(self):
+        graph = TransactionalGraph(
+            cypher_error("Neo.ClientError.Statement.InvalidSyntax")
+        )
+        session = self._session(graph)
+        session.run(session.execute, "a")
+        self.assertRaises(CypherTransactionError, session.close)
+        self.assertEqual(graph.rolled_back, [["a"]])
+        self.assertEqual(graph.committed, [])
+
+    def test_gives_up_after_retries(self):
+        deadlock = "Neo.TransientError.Transaction.DeadlockDetected"
+        graph = TransactionalGraph(*[cypher_error(deadlock)] * 3)
+        session = GraphSession(graph, retries=2, backoff=0)
+        session.run(session.execute, "a")
+        self.assertRaises(CypherTransactionError, session.close)
+        self.assertEqual(len(graph.rolled_back), 3)
+        self.assertEqual(graph.committed, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import threading
+import unittest
+from data_models import core
+from data_models.government_models import Lord
+from tests.fakes import GraphTestCase, StoredNode
+
+
+class IdentityMapTest(GraphTestCase):
+    def setUp(self):
+        GraphTestCase.setUp(self)
+        self.graph.cypher.results = [
+            [[StoredNode(1, ["Lord"], name=u"Lord Acme")]]
+        ]
+
+    def tearDown(self):
+        core.BaseDataModel.end_unit()
+        GraphTestCase.tearDown(self)
+
+    def test_instance_is_built_once_per_unit(self):
+        core.BaseDataModel.begin_unit()
+        first = Lord.instance(u"Lord Acme")
+        second = Lord.instance(u"Lord Acme")
+        self.assertTrue(first is second)
+        self.assertEqual(len(self.statements(u"MATCH (v:`Named Entity`")), 1)
+
+    def test_different_arguments_build_different_instances(self):
+        core.BaseDataModel.begin_unit()
+        first = Lord.instance(u"Lord Acme")
+        second = Lord.instance(u"Lord Acme", get_properties=False)
+        self.assertFalse(first is second)
+
+    def test_vertices_are_fetched_once_per_unit(self):
+        core.BaseDataModel.begin_unit()
+        Lord(u"Lord Acme")
+        lord = Lord(u"Lord Acme")
+        self.assertEqual(lord.vertex._id, 1)
+        self.assertEqual(len(self.statements(u"MATCH (v:`Named Entity`")), 1)
+
+    def test_without_a_unit_every_instance_is_new(self):
+        self.graph.cypher.results.append(self.graph.cypher.results[0])
+        self.assertFalse(
+            Lord.instance(u"Lord Acme") is Lord.instance(u"Lord Acme")
+        )
+
+    def test_end_unit_forgets_instances(self):
+        core.BaseDataModel.begin_unit()
+        first = Lord.instance(u"Lord Acme")
+        core.BaseDataModel.end_unit()
+        self.graph.cypher.results.append([[first.vertex]])
+        core.BaseDataModel.begin_unit()
+        self.assertFalse(first is Lord.instance(u"Lord Acme"))
+
+    def test_units_are_per_thread(self):
+        unit = core.BaseDataModel.begin_unit()
+        seen = []
+        thread = threading.Thread(
+            target=lambda: seen.append(core.BaseDataModel.unit())
+        )
+        thread.start()
+        thread.join()
+        self.assertEqual(seen, [None])
+        self.assertTrue(core.BaseDataModel.unit() is unit)
+
+
+if __name__ == "__main__":
+    unittest.main()
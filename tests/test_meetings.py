@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import unittest
+from data_models.core import summarise_meetings
+
+
+def row(meeting_id, position, host=None, department=None):
+    return {
+        "meeting_id": meeting_id, "position": position, "host": host,
+        "department": department
+    }
+
+
+class SummariseMeetingsTest(unittest.TestCase):
+    def setUp(self):
+        self.summary = summarise_meetings([
+            row(1, u"Chancellor", u"A. Minister", u"Treasury"),
+            row(1, u"Chancellor", u"B. Minister", u"Treasury"),
+            row(2, u"Chancellor", u"A. Minister", u"Treasury"),
+            row(3, u"Whip", None, u"Cabinet Office")
+        ])
+
+    def test_meetings_with_several_hosts_count_once(self):
+        self.assertEqual(self.summary["meetings_count"], 3)
+
+    def test_politicians_and_departments_are_distinct(self):
+        self.assertEqual(
+            self.summary["politicians_met"], [u"A. Minister", u"B. Minister"]
+        )
+        self.assertEqual(self.summary["politician_count"], 2)
+        self.assertEqual(
+            self.summary["departments_met"], [u"Treasury", u"Cabinet Office"]
+        )
+        self.assertEqual(self.summary["department_count"], 2)
+
+    def test_meetings_per_position(self):
+        self.assertEqual(self.summary["meetings_per_position"], [
+            {
+                "position": u"Chancellor", "meetings_count": 2,
+                "politicians_met": [u"A. Minister", u"B. Minister"]
+            },
+            {"position": u"Whip", "meetings_count": 1, "politicians_met": []}
+        ])
+
+    def test_meetings_without_an_office_count_but_have_no_position(self):
+        summary = summarise_meetings([
+            row(1, u"Whip", u"A. Minister", u"Cabinet Office"),
+            row(2, None)
+        ])
+        self.assertEqual(summary["meetings_count"], 2)
+        self.assertEqual(
+            [entry["position"] for entry in summary["meetings_per_position"]],
+            [u"Whip"]
+        )
+
+    def test_no_rows(self):
+        summary = summarise_meetings([])
+        self.assertEqual(summary["meetings_count"], 0)
+        self.assertEqual(summary["meetings_per_position"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
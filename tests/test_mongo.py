@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import unittest
+from utils import mongo
+
+
+class FakeBulk:
+    def __init__(self, log):
+        self.log = log
+        self._query = None
+
+    def insert(self, document):
+        self.log.append(("insert", document))
+
+    def find(self, query):
+        self._query = query
+        return self
+
+    def upsert(self):
+        return self
+
+    def replace_one(self, document):
+        self.log.append(("upsert", self._query, document))
+
+    def execute(self, write_concern=None):
+        self.log.append(("execute", write_concern))
+
+
+class FakeCollection:
+    log = []
+
+    def __init__(self, db, name):
+        self.log.append(("collection", name))
+
+    def initialize_unordered_bulk_op(self):
+        return FakeBulk(self.log)
+
+
+class BulkWriteTest(unittest.TestCase):
+    def setUp(self):
+        self.collection = mongo.collection.Collection
+        mongo.collection.Collection = FakeCollection
+        FakeCollection.log = []
+        # no client; the bulk helpers only go through collection.Collection
+        self.interface = mongo.MongoInterface.__new__(mongo.MongoInterface)
+        self.interface.db = None
+
+    def tearDown(self):
+        mongo.collection.Collection = self.collection
+
+    def test_insert_many_is_one_bulk(self):
+        documents = [{"name": u"a"}, {"name": u"b"}]
+        self.interface.insert_many("api_mps", documents, {"w": 0})
+        self.assertEqual(FakeCollection.log, [
+            ("collection", "api_mps"),
+            ("insert", {"name": u"a"}),
+            ("insert", {"name": u"b"}),
+            ("execute", {"w": 0})
+        ])
+
+    def test_upsert_many_replaces_by_key(self):
+        documents = [{"name": u"a", "x": 1}, {"name": u"b", "x": 2}]
+        self.interface.upsert_many("api_mps", "name", documents, {"w": 1})
+        self.assertEqual(FakeCollection.log, [
+            ("collection", "api_mps"),
+            ("upsert", {"name": u"a"}, {"name": u"a", "x": 1}),
+            ("upsert", {"name": u"b"}, {"name": u"b", "x": 2}),
+            ("execute", {"w": 1})
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
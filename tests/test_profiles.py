@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+import unittest
+from data_models import core
+from data_models.government_models import Lord
+from tests.fakes import GraphTestCase, StoredNode
+
+
+def meeting(node, position, attendee, date, title=None):
+    return {
+        "node": node, "position": position, "title": title,
+        "attendee": attendee, "meeting": u"%s - %s" % (position, attendee),
+        "purpose": None, "date": date, "source_url": None,
+        "source_linked_from": None, "source_fetched": None
+    }
+
+
+def donation(node, name, amount, reported_date):
+    return {
+        "node": node, "name": name, "donee_type": None,
+        "recipient_type": None, "labels": [], "amount": amount,
+        "reported_date": reported_date, "received_date": None,
+        "nature": None, "purpose": None, "accepted_date": None,
+        "ec_reference": None, "recd_by": None, "source_url": None,
+        "source_linked_from": None
+    }
+
+
+# an OPTIONAL MATCH that finds nothing still collects one row of nulls
+NO_MATCH = {"node": None}
+ATTRIBUTES = [
+    "departments", "positions", "meetings", "meetings_summary",
+    "interest_categories", "interests", "interests_summary", "donations",
+    "donations_summary"
+]
+
+
+class ProfileStatementTest(unittest.TestCase):
+    def test_sections_are_collected_in_order_from_one_start(self):
+        statement = core.profile_statement(
+            u"START n=node({id})", Lord.PROFILE.values()
+        )
+        self.assertEqual(statement.count(u"START"), 1)
+        self.assertEqual(
+            statement.count(u"OPTIONAL MATCH"), len(Lord.PROFILE)
+        )
+        self.assertIn(
+            u"WITH n, departments, collect({node: id(a)", statement
+        )
+
+
+class LordProfileTest(GraphTestCase):
+    def setUp(self):
+        GraphTestCase.setUp(self)
+        sections = dict((name, [NO_MATCH]) for name in Lord.PROFILE)
+        sections["departments"] = [
+            {"node": 1, "department": u"Treasury", "position": u"Whip"},
+            {"node": 1, "department": u"Treasury", "position": u"Whip"},
+            {"node": 1, "department": u"Treasury", "position": u"Minister"}
+        ]
+        sections["meetings"] = [
+            meeting(2, u"Whip", u"Acme", u"2014-03-01"),
+            meeting(3, u"Whip", u"Acme", None),
+            meeting(4, u"Minister", u"Widgets", u"2013-01-01"),
+            meeting(5, u"Whip", u"Widgets", u"2012-06-01")
+        ]
+        sections["categories"] = [
+            {"node": 6, "category": u"Directorships"},
+            {"node": 7, "category": u"Land and Property"}
+        ]
+        sections["donations"] = [
+            donation(8, u"Acme", 500, u"2014-01-01"),
+            donation(9, u"Widgets", 200, None),
+            donation(10, u"Acme", 300, u"2015-01-01")
+        ]
+        sections["donation_amounts"] = [
+            {"node": 8, "amount": 500}, {"node": 9, "amount": 200},
+            {"node": 10, "amount": None}
+        ]
+        self.graph.cypher.results = [
+            [[StoredNode(1, ["Lord"], name=u"Lord Acme")]],
+            [sections]
+        ]
+        self.lord = Lord(u"Lord Acme", prefetch=ATTRIBUTES)
+
+    def test_profile_is_one_round_trip(self):
+        self.assertEqual(len(self.graph.cypher.statements), 2)
+        statement, parameters = self.graph.cypher.statements[1]
+        self.assertEqual(parameters, {"id": 1})
+
+    def test_departments_are_distinct_pairs(self):
+        self.assertEqual(self.lord.departments, [u"Treasury", u"Treasury"])
+        self.assertEqual(self.lord.positions, [u"Treasury"])
+
+    def test_meetings_summary_counts_per_position(self):
+        summary = self.lord.meetings_summary
+        self.assertEqual(summary["meetings_total"], 4)
+        per_position = dict(
+            (row["position"], row) for row in
+            summary["meetings_per_position"]
+        )
+        self.assertEqual(per_position[u"Whip"]["meetings_count"], 3)
+        self.assertEqual(
+            sorted(per_position[u"Whip"]["influencers_met"]),
+            [u"Acme", u"Widgets"]
+        )
+        self.assertEqual(per_position[u"Minister"]["meetings_count"], 1)
+
+    def test_meetings_order_by_date_with_nulls_last(self):
+        dates = [entry["date"] for entry in self.lord.meetings]
+        self.assertEqual(
+            dates, [u"2012-06-01", u"2013-01-01", u"2014-03-01", None]
+        )
+        self.assertEqual(self.lord.meetings[0]["title"], u"Whip")
+
+    def test_donations_order_by_date_descending_with_nulls_first(self):
+        dates = [entry["reported"] for entry in self.lord.donations]
+        self.assertEqual(dates, [None, u"2015-01-01", u"2014-01-01"])
+
+    def test_donation_totals_skip_nulls(self):
+        summary = self.lord.donations_summary
+        self.assertEqual(summary["donation_count"], 3)
+        self.assertEqual(summary["donation_total_int"], 700)
+
+    def test_empty_sections_have_no_rows(self):
+        self.assertEqual(self.lord.interests_summary, {
+            "interest_relationships": 0, "interest_categories": 1
+        })
+        self.assertEqual(self.lord.interest_categories, [u"Directorships"])
+        self.assertEqual(
+            self.lord.interests,
+            [{"category": u"Directorships", "interests": []}]
+        )
+
+
+class LazyProfileTest(GraphTestCase):
+    def setUp(self):
+        GraphTestCase.setUp(self)
+        self.graph.cypher.results = [
+            [[StoredNode(1, ["Lord"], name=u"Lord Acme")]]
+        ]
+
+    def profile_statements(self):
+        return self.statements(u"OPTIONAL MATCH")
+
+    def test_nothing_is_loaded_until_read(self):
+        Lord(u"Lord Acme")
+        self.assertEqual(self.profile_statements(), [])
+
+    def test_attributes_load_only_their_sections_once(self):
+        lord = Lord(u"Lord Acme")
+        self.graph.cypher.results.append([{"donation_amounts": [
+            {"node": 2, "amount": 5}
+        ]}])
+        self.assertEqual(lord.donations_summary["donation_total_int"], 5)
+        lord.donations_summary
+        statements = self.profile_statements()
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(statements[0][0].count(u"OPTIONAL MATCH"), 1)
+
+    def test_prefetch_loads_the_named_attributes_in_one_query(self):
+        Lord(u"Lord Acme", prefetch=["meetings_summary", "interests"])
+        statements = self.profile_statements()
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(statements[0][0].count(u"OPTIONAL MATCH"), 3)
+
+
+class LoadManyTest(GraphTestCase):
+    def row(self, node_id, name):
+        return {
+            "name": name, "vertex": StoredNode(node_id, ["Lord"], name=name),
+            "departments": [
+                {"node": 9, "department": u"Treasury", "position": u"Whip"}
+            ]
+        }
+
+    def test_a_chunk_is_one_query_on_the_model_label(self):
+        self.graph.cypher.results = [[
+            self.row(2, u"Lord B"), self.row(1, u"Lord A")
+        ]]
+        lords = list(Lord.load_many(
+            [u"Lord A", u"Lord B"], sections=["departments"]
+        ))
+        self.assertEqual([lord.vertex._id for lord in lords], [1, 2])
+        self.assertEqual(lords[0].departments, [u"Treasury"])
+        statements = self.graph.cypher.statements
+        self.assertEqual(len(statements), 1)
+        self.assertIn(u"MATCH (n:`Lord` {name: name})", statements[0][0])
+        self.assertEqual(getattr(core._units, "preloaded", None), None)
+
+    def test_duplicate_names_raise(self):
+        self.graph.cypher.results = [[
+            self.row(1, u"Lord A"), self.row(2, u"Lord A")
+        ]]
+        loading = Lord.load_many([u"Lord A"], sections=["departments"])
+        self.assertRaises(ValueError, list, loading)
+        self.assertEqual(getattr(core._units, "preloaded", None), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import unittest
+from data_interfaces.query_cache import GraphVersion, QueryCache
+from data_models import core
+from tests.fakes import FakeMongo, GraphTestCase
+
+
+class Result(list):
+    # a py2neo RecordList as far as the cache reads it
+    columns = ("name", "total")
+
+
+class QueryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeMongo()
+        self.version = GraphVersion(self.db)
+        self.executed = 0
+
+    def execute(self):
+        self.executed += 1
+        return Result([[u"Acme", 5]])
+
+    def fetch(self, cache, parameters=None):
+        return cache.fetch(
+            "Influencer.profile", u"MATCH (n) RETURN n",
+            parameters or {"name": u"Acme"}, self.execute
+        )
+
+    def test_repeated_reads_are_served_from_memory(self):
+        cache = QueryCache(version=self.version)
+        first = self.fetch(cache)
+        self.assertTrue(self.fetch(cache) is first)
+        self.assertEqual(self.executed, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_parameters_are_part_of_the_key(self):
+        cache = QueryCache(version=self.version)
+        self.fetch(cache)
+        self.fetch(cache, {"name": u"Widgets"})
+        self.assertEqual(self.executed, 2)
+
+    def test_version_bump_invalidates_cached_results(self):
+        cache = QueryCache(refresh=0, version=self.version)
+        self.fetch(cache)
+        self.version.bump()
+        self.fetch(cache)
+        self.assertEqual(self.executed, 2)
+        self.assertEqual(self.version.current(), 1)
+
+    def test_results_are_kept_until_the_stamp_is_reread(self):
+        cache = QueryCache(refresh=3600, version=self.version)
+        self.fetch(cache)
+        self.version.bump()
+        self.fetch(cache)
+        self.assertEqual(self.executed, 1)
+
+    def test_shared_tier_serves_other_processes(self):
+        QueryCache(shared=True, version=self.version).fetch(
+            "t", u"MATCH (n) RETURN n", {}, self.execute
+        )
+        other = QueryCache(shared=True, version=GraphVersion(self.db))
+        result = other.fetch("t", u"MATCH (n) RETURN n", {}, self.execute)
+        self.assertEqual(self.executed, 1)
+        self.assertEqual(result[0]["total"], 5)
+        self.assertEqual(result[0][0], u"Acme")
+
+    def test_version_bump_drops_the_shared_tier(self):
+        cache = QueryCache(shared=True, refresh=0, version=self.version)
+        self.fetch(cache)
+        self.assertEqual(len(self.db.collections[QueryCache.COLLECTION]), 1)
+        self.version.bump()
+        self.assertNotIn(QueryCache.COLLECTION, self.db.collections)
+        self.fetch(QueryCache(shared=True, version=GraphVersion(self.db)))
+        self.assertEqual(self.executed, 2)
+
+
+class CachedModelReadTest(GraphTestCase):
+    def setUp(self):
+        GraphTestCase.setUp(self)
+        core.BaseDataModel.query_cache = QueryCache(
+            version=GraphVersion(FakeMongo())
+        )
+
+    def test_reads_go_through_the_cache(self):
+        model = core.BaseDataModel()
+        model.query(u"MATCH (n) RETURN n", "read")
+        model.query(u"MATCH (n) RETURN n", "read")
+        self.assertEqual(len(self.graph.cypher.statements), 1)
+
+    def test_writes_bypass_the_cache(self):
+        model = core.BaseDataModel()
+        model.query(u"MERGE (n) RETURN n", "merge_vertex")
+        model.query(u"MERGE (n) RETURN n", "merge_vertex")
+        self.assertEqual(len(self.graph.cypher.statements), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import unittest
+from py2neo.cypher import CypherTransactionError
+from data_models.influencers_models import Donor, LobbyAgency
+from data_models.schema import CALENDAR_KEYS, GraphSchema, SORT_KEYS
+from tests.fakes import FakeCypher, GraphTestCase
+
+
+class RefusingCypher(FakeCypher):
+    # the server refuses a uniqueness constraint, as it does when
+    # existing nodes share a value
+    def execute(self, statement, parameters=None):
+        result = FakeCypher.execute(self, statement, parameters)
+        if u"CREATE CONSTRAINT" in statement:
+            raise CypherTransactionError.__new__(CypherTransactionError)
+        return result
+
+
+class GraphSchemaTest(GraphTestCase):
+    def test_model_keys_come_from_the_models(self):
+        keys = GraphSchema.model_keys()
+        self.assertIn(("Member of Parliament", "name"), keys)
+        self.assertIn(("Lord", "name"), keys)
+        self.assertEqual(keys, sorted(set(keys)))
+
+    def test_models_fetched_on_another_label_add_it(self):
+        for model in (Donor, LobbyAgency):
+            self.assertEqual(model.fetch_label, "Named Entity")
+        keys = GraphSchema.model_keys()
+        self.assertIn(("Donor", "name"), keys)
+        self.assertIn(("Named Entity", "name"), keys)
+
+    def test_missing_skips_constrained_and_indexed_keys(self):
+        self.graph.schema.constraints["Member of Parliament"] = ["name"]
+        self.graph.schema.indexes["Lord"] = ["name"]
+        missing = GraphSchema().missing()
+        self.assertNotIn(("Member of Parliament", "name"), missing)
+        self.assertNotIn(("Lord", "name"), missing)
+        self.assertIn(("Named Entity", "name"), missing)
+
+    def test_the_calendar_root_gets_a_constraint(self):
+        self.assertIn(("Calendar", "name"), GraphSchema().missing())
+        GraphSchema().create()
+        constraints = " ".join(
+            statement for statement, _ in self.statements("CREATE CONSTRAINT")
+        )
+        for label, key in CALENDAR_KEYS:
+            self.assertIn(
+                u"(n:`%s`) ASSERT n.`%s` IS UNIQUE" % (label, key), constraints
+            )
+
+    def test_create_adds_a_constraint_per_missing_key(self):
+        expected = GraphSchema().missing()
+        GraphSchema().create()
+        constraints = self.statements("CREATE CONSTRAINT")
+        self.assertEqual(len(constraints), len(expected) - len(SORT_KEYS))
+        self.assertIn(
+            "(n:`Member of Parliament`) ASSERT n.`name` IS UNIQUE",
+            " ".join(statement for statement, _ in constraints)
+        )
+
+    def test_a_refused_constraint_falls_back_to_an_index(self):
+        self.graph.cypher = RefusingCypher()
+        expected = GraphSchema().missing()
+        GraphSchema().create()
+        indexes = self.statements("CREATE INDEX")
+        self.assertEqual(len(indexes), len(expected))
+        self.assertIn(
+            u"ON :`Member of Parliament`(`name`)",
+            " ".join(statement for statement, _ in indexes)
+        )
+
+    def test_sort_keys_get_plain_indexes(self):
+        GraphSchema().create()
+        indexes = " ".join(
+            statement for statement, _ in self.statements("CREATE INDEX")
+        )
+        for label, key in SORT_KEYS:
+            self.assertIn(u"ON :`%s`(`%s`)" % (label, key), indexes)
+
+
+if __name__ == "__main__":
+    unittest.main()
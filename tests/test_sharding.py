@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import unittest
+from graphers import sharding
+
+
+class ShardingTest(unittest.TestCase):
+    def setUp(self):
+        self.docs = [{"name": u"donor %s" % i} for i in range(50)]
+        self.docs.append({"name": u"Lord Ó Cuív"})
+        self.docs.append({"name": None})
+
+    def test_every_document_is_in_exactly_one_shard(self):
+        for doc in self.docs:
+            shards = [
+                index for index in range(4)
+                if sharding.in_shard(doc, "name", (index, 4))
+            ]
+            self.assertEqual(len(shards), 1)
+
+    def test_split_agrees_with_in_shard(self):
+        shards = sharding.split(self.docs, "name", 4)
+        self.assertEqual(sum(len(shard) for shard in shards), len(self.docs))
+        for index, shard in enumerate(shards):
+            for doc in shard:
+                self.assertTrue(sharding.in_shard(doc, "name", (index, 4)))
+
+    def test_same_key_lands_in_the_same_shard(self):
+        first = {"name": u"donor 7", "amount": 1}
+        second = {"name": u"donor 7", "amount": 2}
+        self.assertEqual(
+            sharding.shard_of(first, "name", 8),
+            sharding.shard_of(second, "name", 8)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import unittest
+from data_models import core
+from data_models.government_models import Lords
+from tests.fakes import GraphTestCase
+
+
+class QueryTemplatesTest(unittest.TestCase):
+    def setUp(self):
+        self.templates = core.QueryTemplates()
+        self.templates.register("find", u"""
+            MATCH (v:`{0}` {{`{1}`: {{value}}}}) RETURN v
+        """)
+        self.templates.register("names", u"""
+            MATCH (n:`Named Entity`) WHERE n.name IN {names} RETURN n
+        """)
+
+    def test_structure_is_formatted_and_values_stay_parameters(self):
+        statement = self.templates.statement("find", "Donor", "name")
+        self.assertIn(u"MATCH (v:`Donor` {`name`: {value}})", statement)
+
+    def test_a_template_without_structure_is_left_as_registered(self):
+        statement = self.templates.statement("names")
+        self.assertIn(u"WHERE n.name IN {names}", statement)
+
+    def test_statement_reuse_is_counted_per_template(self):
+        donor = self.templates.statement("find", "Donor", "name")
+        lord = self.templates.statement("find", "Lord", "name")
+        for statement in [donor, donor, lord, donor]:
+            self.templates.record("find", statement)
+        self.assertEqual(self.templates.report(), [{
+            "template": "find", "calls": 4, "reused": 2, "statements": 2
+        }])
+
+
+class ModelStatementTest(GraphTestCase):
+    def setUp(self):
+        GraphTestCase.setUp(self)
+        core.templates._stats = {}
+
+    def test_model_statements_are_counted_under_their_names(self):
+        self.graph.cypher.results = [[[3]], [[3]]]
+        Lords()
+        Lords()
+        self.assertEqual(core.templates.report(), [{
+            "template": "Lords._get_lord_count", "calls": 2, "reused": 1,
+            "statements": 1
+        }])
+
+
+if __name__ == "__main__":
+    unittest.main()
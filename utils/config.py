@@ -1,5 +1,20 @@
 # -*- coding: utf-8 -*-
 
+# idle Neo4j HTTP connections kept per thread, and the socket timeout in
+# seconds
+graph_pool_size = 4
+graph_timeout = 30
+
+# documents api_gen workers may have in flight to the writer
+api_queue_size = 1000
+
+# smallest fraction of the live api collection a rebuild may publish
+api_min_ratio = 0.9
+
+# api_gen documents per bulk write, and the write concern for them
+api_bulk_size = 500
+api_write_concern = {"w": 1}
+
 prefixes = [
     u"Sir ",
     u"Mr ",
@@ -38,7 +38,9 @@ class CentralNodes(DataProfiler):
                 ORDER BY degree DESC
                 LIMIT 5
             """.format(node[0], left, right, node[1])
-        output = self.core_model.query(search_string)
+        output = self.core_model.query(
+            search_string, "CentralNodes._get_node_centrality"
+        )
         for result in output:
             result_node, relationship, count = result[0], result[1], result[2]
             self._print_count(direction, relationship, count, result_node)
@@ -24,7 +24,9 @@ class InOutDegree(DataProfiler):
                         RETURN type(rel) as rel_type, count(rel) as degree
                         ORDER BY degree DESC
                         """.format(node_type, left, right)
-        output = self.core_model.query(search_string)
+        output = self.core_model.query(
+            search_string, "InOutDegree._get_connection_degrees"
+        )
         for result in output:
             self._print_count(direction, result[0], result[1])
 
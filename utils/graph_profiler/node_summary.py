@@ -16,17 +16,19 @@ class NodeCount(DataProfiler):
 
     def _get_total(self):
         search_string = "MATCH (n) RETURN count(n) as count"
-        result = self.core_model.query(search_string)
+        result = self.core_model.query(search_string, "NodeCount._get_total")
         self._print_count("TOTAL NODES", result[0][0])
 
     def _get_relationships(self):
         search_string = "MATCH ()-[n]-() RETURN count(n) as count"
-        result = self.core_model.query(search_string)
+        result = self.core_model.query(
+            search_string, "NodeCount._get_relationships"
+        )
         self._print_count("TOTAL RELATIONSHIPS", result[0][0])
 
     def _get_count(self, node_type):
         search_string = "MATCH (n:`%s`) RETURN count(n) as count" % node_type
-        result = self.core_model.query(search_string)
+        result = self.core_model.query(search_string, "NodeCount._get_count")
         return result[0][0]
 
     @staticmethod
@@ -24,6 +24,11 @@ class MongoInterface:
         q = collection.Collection(self.db, _collection)
         return q.find_one(query)
 
+    # iterate over every document matching a query
+    def find(self, _collection, query):
+        q = collection.Collection(self.db, _collection)
+        return q.find(query)
+
     # return specific documents in a collection
     def query(self, _collection, **kwargs):
         query = kwargs.get('query', None)
@@ -77,10 +82,44 @@ class MongoInterface:
     def save(self, _collection, document, **kwargs):
         return collection.Collection(self.db, _collection).save(document, **kwargs)
 
+    # insert documents in one unordered bulk write
+    def insert_many(self, _collection, documents, write_concern=None):
+        bulk = collection.Collection(self.db, _collection).initialize_unordered_bulk_op()
+        for document in documents:
+            bulk.insert(document)
+        return bulk.execute(write_concern)
+
+    # replace or insert documents by key in one unordered bulk write
+    def upsert_many(self, _collection, key, documents, write_concern=None):
+        bulk = collection.Collection(self.db, _collection).initialize_unordered_bulk_op()
+        for document in documents:
+            bulk.find({key: document[key]}).upsert().replace_one(document)
+        return bulk.execute(write_concern)
+
     # update a document in a collection
     def update(self, _collection, spec, document, **kwargs):
         return collection.Collection(self.db, _collection).update(spec, document, **kwargs)
 
+    # replace new_name, if it exists, in a single atomic rename
+    def rename(self, _collection, new_name):
+        self._logger.debug("Renaming collection '%s' to '%s'" % (_collection, new_name))
+        q = collection.Collection(self.db, _collection)
+        return q.rename(new_name, dropTarget=True)
+
+    # replace new_name with a copy of a collection
+    def copy(self, _collection, new_name):
+        q = collection.Collection(self.db, _collection)
+        return q.aggregate([{'$out': new_name}])
+
+    def create_index(self, _collection, key, **kwargs):
+        return collection.Collection(self.db, _collection).create_index(key, **kwargs)
+
+    def exists(self, _collection):
+        return _collection in self.db.collection_names()
+
+    def remove(self, _collection, spec):
+        return collection.Collection(self.db, _collection).remove(spec)
+
     def drop(self, _collection):
         self._logger.debug("Dropping collection '%s'" % _collection)
         q = collection.Collection(self.db, _collection)
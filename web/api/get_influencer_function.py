@@ -15,7 +15,9 @@ class InfluencerApi(BaseAPI):
         name = args["name"]
         result, _ = self._db.query(self._db_table, query=args)
         if len(result) > 0:
-            influencer = Influencer(name)
+            influencer = Influencer.instance(name, prefetch=[
+                "interests", "donations", "lobbyists", "meetings"
+            ])
             register = self._nest_category(self._interest_urls(influencer.interests))
             ec = self._recipient_urls(influencer.donations)
             lobby = self._lobby_urls(influencer.lobbyists)
@@ -13,7 +13,6 @@ class InfluencersApi(BaseAPI):
         self._remuneration = "influences.register_of_interests.remuneration_total_int"
         self._funding = "influences.electoral_commission.donation_total_int"
         self._lobbyists = "influences.lobby_registers.lobbyist_hired"
-        #TODO update this search to use meetings_count once updated in api_gen
         self._meetings = "influences.meetings.meetings_count"
         self.query = {}
 
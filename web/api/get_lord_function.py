@@ -13,7 +13,9 @@ class LordApi(BaseAPI):
         name = args["name"]
         result, _ = self._db.query(self._db_table, query=args)
         if len(result) > 0:
-            lord = government_models.Lord(name)
+            lord = government_models.Lord.instance(name, prefetch=[
+                "meetings", "interests", "donations"
+            ])
             result = {
                 'name': result[0]['name'],
                 'influences_summary': result[0]['influences'],
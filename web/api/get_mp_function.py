@@ -15,7 +15,9 @@ class MpApi(BaseAPI):
         result, _ = self._db.query(self._db_table, query=args)
 
         if len(result) > 0:
-            mp = government_models.MemberOfParliament(name)
+            mp = government_models.MemberOfParliament.instance(name, prefetch=[
+                "meetings", "interests", "donations"
+            ])
             meetings = self._influencer_urls(mp.meetings)
             #interests = self._nest_category(self._interest_urls(mp.interests))
             interests = self._interest_urls(mp.interests)
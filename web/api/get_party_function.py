@@ -21,7 +21,7 @@ class PoliticalPartyApi(BaseAPI):
         result, _ = self._db.query(self._db_table, query=query, page=page)
 
         if len(result) > 0:
-            party = government_models.PoliticalParty(name)
+            party = government_models.PoliticalParty.instance(name)
             detail = {
                 "electoral_commission": self._donor_urls(party.donations)
             }
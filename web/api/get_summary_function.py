@@ -17,7 +17,7 @@ class SummaryApi(BaseAPI):
             "remuneration_total_int": "$influences.register_of_interests.remuneration_total_int",
             "lobbyists_hired": "$influences.lobby_registers.lobbyist_hired",
             "meetings_total": "$influences.meetings.meetings_total",
-            "meetings_influencers": "$influences.meetings.meeting_count",
+            "meetings_influencers": "$influences.meetings.meetings_count",
             "politician_count": "$influences.meetings.politician_count",
             "department_count": "$influences.meetings.department_count"
         }